@@ -250,18 +250,14 @@ app.post("/claims/verify", (req, res) => {
   return res.json(verifyClaim(req.body || {}));
 });
 
-app.post("/claims/queue", authMiddleware, (req, res) => {
-  const { channel_id, amount_drops, signature, pubkey, device_id } = req.body || {};
+// Queue one cumulative claim; returns [httpStatus, body]
+function queueClaim(body) {
+  const { channel_id, amount_drops, signature, pubkey, device_id } = body || {};
   const amt = Number(amount_drops);
-  if (!channel_id || !Number.isFinite(amt)) return res.status(400).json({ accepted: false, reason: "bad_request" });
+  if (!channel_id || !Number.isFinite(amt)) return [400, { accepted: false, reason: "bad_request" }];
 
   const v = verifyClaim({ channel_id, amount_drops: amt, signature, pubkey });
-  if (!v.valid) return res.status(400).json({ accepted: false, reason: v.reason || "invalid_signature" });
-  if (!v.valid) {
-    console.error("[verify] failed:", v);
-    return res.status(400).json({ accepted: false, reason: "verify_error", detail: v.reason });
-  }
-
+  if (!v.valid) return [400, { accepted: false, reason: v.reason || "invalid_signature" }];
 
   let ch = mem.channels.get(channel_id);
   if (!ch) { ch = { channel_id, dest_address: "(unknown)", dest_tag: 0, last_settled_drops: 0, last_seen_drops: 0 }; mem.channels.set(channel_id, ch); }
@@ -271,12 +267,23 @@ app.post("/claims/queue", authMiddleware, (req, res) => {
 
   const lastSeen = Number(ch.last_seen_drops || 0);
   const settled = Number(ch.last_settled_drops || 0);
-  if (amt <= lastSeen) return res.status(409).json({ accepted: false, reason: "stale_or_lower_amount" });
-  if ((amt - settled) > cap) return res.status(402).json({ accepted: false, reason: "exposure_cap_exceeded" });
+  if (amt <= lastSeen) return [409, { accepted: false, reason: "stale_or_lower_amount" }];
+  if ((amt - settled) > cap) return [402, { accepted: false, reason: "exposure_cap_exceeded" }];
 
   ch.last_seen_drops = amt;
   mem.claims.set(channel_id, { channel_id, amount_drops: amt, signature, pubkey, seenAt: new Date().toISOString() });
-  return res.json({ accepted: true });
+  return [200, { accepted: true }];
+}
+
+// Body is one claim, or { claims: [...] } for a batch (kiosk outbox flush)
+app.post("/claims/queue", authMiddleware, (req, res) => {
+  const body = req.body || {};
+  if (Array.isArray(body.claims)) {
+    const results = body.claims.map((c) => { const [status, out] = queueClaim(c); return { status, ...out }; });
+    return res.json({ results });
+  }
+  const [status, out] = queueClaim(body);
+  return res.status(status).json(out);
 });
 
 // Settlement (simulated by default)
@@ -369,10 +376,14 @@ app.post("/claims/settle", authMiddleware, async (req, res) => {
 
 });
 
-// Receipts listing
+// Receipts listing. ?since=N returns only receipts after the first N (append-only
+// list); X-Receipts-Total lets clients advance their cursor.
 app.get("/receipts", authMiddleware, (req, res) => {
-  const { channel_id } = req.query || {};
-  const list = channel_id ? mem.receipts.filter(r => r.channel_id === channel_id) : mem.receipts;
+  const { channel_id, since } = req.query || {};
+  const from = Math.max(0, Number.parseInt(since, 10) || 0);
+  let list = from ? mem.receipts.slice(from) : mem.receipts;
+  if (channel_id) list = list.filter(r => r.channel_id === channel_id);
+  res.set("X-Receipts-Total", String(mem.receipts.length));
   return res.json(list);
 });
 
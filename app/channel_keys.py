@@ -0,0 +1,109 @@
+"""
+Persistent channel_id -> PayChannel PublicKey cache.
+
+Entries are stored in the kiosk KV store as {"pk": HEX, "ts": unix_time} under
+"chan_pk:<CHANNEL>". Fresh entries are served without network; stale ones are
+still served (a channel's key never changes while it exists) and refreshed in
+the background. Concurrent lookups for the same channel share one request.
+
+A channel the ledger no longer has (closed: ledger_entry says entryNotFound,
+or the snapshot saw it deleted) is invalidated and remembered as missing
+for negative_ttl_s, so its old key is never served again and repeated
+claims on it do not each cost a lookup. A failed fetch (offline) changes
+nothing: fetch_fn raises for that and returns None only for "no such
+channel".
+"""
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Iterable, Optional
+
+KEY_PREFIX = "chan_pk:"
+
+
+class ChannelKeyCache:
+    def __init__(self, store, fetch_fn: Callable[[str], Optional[str]],
+                 ttl_s: float = 7 * 24 * 3600, workers: int = 4, clock=time.time,
+                 negative_ttl_s: float = 300.0):
+        self._store = store
+        self._fetch = fetch_fn
+        self.ttl_s = float(ttl_s)
+        self.negative_ttl_s = float(negative_ttl_s)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._inflight: dict[str, Future] = {}
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="chan-pk")
+        self.network_fetches = 0
+
+    @staticmethod
+    def _norm(channel_id: str) -> str:
+        return str(channel_id).strip().upper()
+
+    def cached(self, channel_id: str) -> Optional[dict]:
+        ent = self._store.get(KEY_PREFIX + self._norm(channel_id))
+        return ent if isinstance(ent, dict) and ent.get("pk") else None
+
+    def is_fresh(self, ent: Optional[dict]) -> bool:
+        return bool(ent) and (self._clock() - float(ent.get("ts", 0))) < self.ttl_s
+
+    def known_missing(self, channel_id: str) -> bool:
+        ent = self._store.get(KEY_PREFIX + self._norm(channel_id))
+        return (isinstance(ent, dict) and ent.get("missing", False)
+                and (self._clock() - float(ent.get("ts", 0))) < self.negative_ttl_s)
+
+    def get(self, channel_id: str, allow_network: bool = True) -> Optional[str]:
+        ch = self._norm(channel_id)
+        ent = self.cached(ch)
+        if ent:
+            if not self.is_fresh(ent) and allow_network:
+                self._start_fetch(ch)  # stale-while-revalidate
+            return ent["pk"]
+        if not allow_network or self.known_missing(ch):
+            return None
+        try:
+            return self._start_fetch(ch).result()
+        except Exception:
+            return None
+
+    def put(self, channel_id: str, pubkey_hex: str):
+        self._store.set(KEY_PREFIX + self._norm(channel_id),
+                        {"pk": str(pubkey_hex).strip().upper(), "ts": self._clock()}, wait=False)
+
+    def invalidate(self, channel_id: str):
+        """Channel closed/missing: stop serving its key and remember the miss for negative_ttl_s."""
+        self._store.set(KEY_PREFIX + self._norm(channel_id),
+                        {"pk": None, "missing": True, "ts": self._clock()}, wait=False)
+
+    def warm(self, channel_ids: Iterable[str]) -> int:
+        """Queue background fetches for missing/stale channels; returns how many."""
+        n = 0
+        for ch in channel_ids:
+            ch = self._norm(ch)
+            if not self.is_fresh(self.cached(ch)) and not self.known_missing(ch):
+                self._start_fetch(ch)
+                n += 1
+        return n
+
+    def _start_fetch(self, ch: str) -> Future:
+        with self._lock:
+            fut = self._inflight.get(ch)
+            if fut is not None:
+                return fut  # single-flight: join the request already running
+            fut = self._pool.submit(self._do_fetch, ch)
+            self._inflight[ch] = fut
+        return fut
+
+    def _do_fetch(self, ch: str) -> Optional[str]:
+        try:
+            self.network_fetches += 1
+            pk = self._fetch(ch)  # raises when offline: cached entry stays as it is
+            if pk:
+                self.put(ch, pk)
+            else:
+                self.invalidate(ch)
+            return pk
+        finally:
+            with self._lock:
+                self._inflight.pop(ch, None)
@@ -0,0 +1,197 @@
+"""
+Local snapshot of the PayChannels that pay the merchant.
+
+A full sync pages through account_objects(type=payment_channel) on the
+merchant account; later syncs only replay account_tx since the last synced
+ledger and apply the PayChannel nodes from each transaction's metadata. The
+snapshot lives in the kiosk KV store under "paychan:<CHANNEL>", so capacity
+and expiry prechecks run offline in a dict lookup.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Optional
+
+KEY_PREFIX = "paychan:"
+SYNC_KEY = "paychan_sync"
+RIPPLE_EPOCH = 946684800  # 2000-01-01T00:00:00Z in unix seconds
+
+
+def _entry_from_fields(fields: dict, ledger_index: int) -> dict:
+    def _opt_int(name):
+        v = fields.get(name)
+        return int(v) if v is not None else None
+
+    return {
+        "account": fields.get("Account"),
+        "destination": fields.get("Destination"),
+        "amount": int(fields.get("Amount", 0)),
+        "balance": int(fields.get("Balance", 0)),  # omitted in CreatedNode when 0
+        "expiration": _opt_int("Expiration"),
+        "cancel_after": _opt_int("CancelAfter"),
+        "settle_delay": _opt_int("SettleDelay"),
+        "public_key": (fields.get("PublicKey") or "").upper() or None,
+        "ledger": int(ledger_index or 0),
+    }
+
+
+class ChannelSnapshot:
+    def __init__(self, store, rpc: Callable[[str, dict], dict], merchant_address: str,
+                 key_cache=None, page_limit: int = 200, max_incremental_ledgers: int = 50_000):
+        self._store = store
+        self._rpc = rpc  # rpc(method, params) -> "result" dict
+        self.merchant = merchant_address
+        self._key_cache = key_cache
+        self.page_limit = int(page_limit)
+        self.max_incremental_ledgers = int(max_incremental_ledgers)
+        self._sync_lock = threading.Lock()
+
+    # ----------- lookups (offline) -----------
+    def get(self, channel_id: str) -> Optional[dict]:
+        ent = self._store.get(KEY_PREFIX + str(channel_id).strip().upper())
+        return ent if isinstance(ent, dict) else None
+
+    @property
+    def synced_ledger(self) -> int:
+        meta = self._store.get(SYNC_KEY) or {}
+        return int(meta.get("ledger", 0)) if meta.get("merchant") == self.merchant else 0
+
+    def precheck(self, channel_id: str, amount_drops: int, now: Optional[float] = None,
+                 expiry_margin_s: float = 0, refresh: bool = False):
+        """(ok, reason). Unknown channels pass: the snapshot can only rule claims out.
+
+        With refresh=True a claim above the cached amount re-reads the channel
+        first (the buyer may have funded it since the last sync); the cached
+        amount is used only if that lookup fails (offline).
+        """
+        ent = self.get(channel_id)
+        if ent is None:
+            return True, ""
+        if amount_drops > ent["amount"] and refresh:
+            try:
+                fresh = self.refresh_channel(channel_id)
+            except Exception:
+                fresh = None  # offline: decide on the cached entry
+            if fresh is not None:
+                ent = fresh
+            elif self.get(channel_id) is None:
+                return False, "channel_closed"  # ledger_entry says it is gone
+        if amount_drops > ent["amount"]:
+            return False, "exceeds_channel_amount"
+        if amount_drops <= ent["balance"]:
+            return False, "already_claimed_on_ledger"
+        deadline = (time.time() if now is None else now) - RIPPLE_EPOCH + expiry_margin_s
+        for field in ("expiration", "cancel_after"):
+            if ent.get(field) is not None and ent[field] <= deadline:
+                return False, "channel_expired"
+        return True, ""
+
+    # ----------- sync (online) -----------
+    def sync(self, full: bool = False) -> int:
+        """Bring the snapshot up to the latest validated ledger; returns channels touched."""
+        if not self.merchant:
+            return 0
+        with self._sync_lock:
+            last = self.synced_ledger
+            if full or not last:
+                return self._full_sync()
+            return self._incremental_sync(last)
+
+    def refresh_channel(self, channel_id: str) -> Optional[dict]:
+        """Single-channel ledger_entry lookup (e.g. for a channel not yet in the snapshot)."""
+        ch = str(channel_id).strip().upper()
+        res = self._rpc("ledger_entry", {"index": ch, "ledger_index": "validated"})
+        node = (res or {}).get("node")
+        if not node:
+            if (res or {}).get("error") == "entryNotFound":
+                self._drop(ch)
+            return None
+        if node.get("Destination") != self.merchant:
+            return None
+        return self._put(ch, node, res.get("ledger_index", 0))
+
+    def _full_sync(self) -> int:
+        params = {"account": self.merchant, "type": "payment_channel",
+                  "ledger_index": "validated", "limit": self.page_limit}
+        seen = set()
+        ledger = 0
+        while True:
+            res = self._rpc("account_objects", params) or {}
+            if "account_objects" not in res:
+                raise RuntimeError(f"account_objects failed: {res.get('error', res)}")
+            ledger = ledger or int(res.get("ledger_index", 0))
+            for node in res["account_objects"]:
+                if node.get("LedgerEntryType") != "PayChannel" or node.get("Destination") != self.merchant:
+                    continue
+                ch = str(node.get("index", "")).upper()
+                if ch:
+                    self._put(ch, node, ledger)
+                    seen.add(ch)
+            marker = res.get("marker")
+            if not marker:
+                break
+            # later pages must read the same ledger as the first one
+            params = dict(params, marker=marker, ledger_index=ledger or "validated")
+        for key in self._store.keys(KEY_PREFIX):
+            if key[len(KEY_PREFIX):] not in seen and self._store.get(key) is not None:
+                self._drop(key[len(KEY_PREFIX):])  # channel closed since last sync
+        self._mark_synced(ledger)
+        return len(seen)
+
+    def _incremental_sync(self, last: int) -> int:
+        params = {"account": self.merchant, "ledger_index_min": last + 1, "ledger_index_max": -1,
+                  "forward": True, "limit": self.page_limit}
+        touched = 0
+        upto = last
+        while True:
+            res = self._rpc("account_tx", params) or {}
+            if "transactions" not in res:
+                raise RuntimeError(f"account_tx failed: {res.get('error', res)}")
+            upto = max(upto, int(res.get("ledger_index_max", upto) or upto))
+            if upto - last > self.max_incremental_ledgers:
+                return self._full_sync()  # too far behind: a fresh snapshot is cheaper
+            for item in res["transactions"]:
+                if item.get("validated") is False:
+                    continue
+                tx_ledger = int(item.get("ledger_index") or (item.get("tx") or item.get("tx_json") or {}).get("ledger_index") or 0)
+                touched += self._apply_meta(item.get("meta") or {}, tx_ledger)
+            marker = res.get("marker")
+            if not marker:
+                break
+            params = dict(params, marker=marker)
+        self._mark_synced(upto)
+        return touched
+
+    def _apply_meta(self, meta: dict, ledger_index: int) -> int:
+        n = 0
+        for node in meta.get("AffectedNodes") or []:
+            kind, body = next(iter(node.items()))
+            if body.get("LedgerEntryType") != "PayChannel":
+                continue
+            ch = str(body.get("LedgerIndex", "")).upper()
+            if kind == "DeletedNode":
+                self._drop(ch)
+            else:
+                fields = body.get("NewFields") if kind == "CreatedNode" else body.get("FinalFields")
+                if not fields or fields.get("Destination") != self.merchant:
+                    continue
+                self._put(ch, fields, ledger_index)
+            n += 1
+        return n
+
+    def _put(self, ch: str, fields: dict, ledger_index) -> dict:
+        ent = _entry_from_fields(fields, ledger_index)
+        self._store.set(KEY_PREFIX + ch, ent, wait=False)
+        if self._key_cache is not None and ent["public_key"]:
+            self._key_cache.put(ch, ent["public_key"])
+        return ent
+
+    def _drop(self, ch: str):
+        if self._store.get(KEY_PREFIX + ch) is not None:
+            self._store.set(KEY_PREFIX + ch, None, wait=False)
+        if self._key_cache is not None:
+            self._key_cache.invalidate(ch)  # closed: its key must not verify new claims
+
+    def _mark_synced(self, ledger: int):
+        self._store.set(SYNC_KEY, {"merchant": self.merchant, "ledger": int(ledger), "at": time.time()})
@@ -0,0 +1,104 @@
+"""
+Kiosk-side caches for repeated claims.
+
+VerdictCache remembers signature-check results per (channel_id, amount,
+signature, pubkey) so a retransmitted claim skips the crypto; the key the
+signature was checked against is part of the entry, so the same bytes
+presented with another key are verified afresh. SeenFilter is a
+two-generation Bloom filter over signatures used to spot retransmits in O(1).
+"""
+from __future__ import annotations
+
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+class VerdictCache:
+    """LRU of verify verdicts with a max size and a max age (seconds)."""
+
+    def __init__(self, max_size: int = 4096, ttl_s: float = 600.0, clock=time.monotonic):
+        self.max_size = int(max_size)
+        self.ttl_s = float(ttl_s)
+        self._clock = clock
+        self._d: "OrderedDict[tuple, tuple[float, bool]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(channel_id: str, amount_drops, signature: str, pubkey: str) -> tuple:
+        return (str(channel_id).strip().upper(), int(str(amount_drops).strip()),
+                str(signature).strip().upper(), str(pubkey).strip().upper())
+
+    def get(self, key: tuple) -> Optional[bool]:
+        now = self._clock()
+        with self._lock:
+            item = self._d.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            stamp, verdict = item
+            if now - stamp > self.ttl_s:
+                del self._d[key]
+                self.misses += 1
+                return None
+            self._d.move_to_end(key)
+            self.hits += 1
+            return verdict
+
+    def put(self, key: tuple, verdict: bool):
+        with self._lock:
+            self._d[key] = (self._clock(), bool(verdict))
+            self._d.move_to_end(key)
+            while len(self._d) > self.max_size:
+                self._d.popitem(last=False)
+
+    def __len__(self):
+        return len(self._d)
+
+
+class SeenFilter:
+    """Bloom filter of seen signatures; rotates generations so it never saturates.
+
+    A hit only means "probably seen" (false-positive rate ~fp_rate), so callers
+    must pair it with an exact check before declining.
+    """
+
+    def __init__(self, capacity: int = 100_000, fp_rate: float = 0.001):
+        self.capacity = max(1, int(capacity))
+        bits = int(-self.capacity * math.log(fp_rate) / (math.log(2) ** 2))
+        self._nbits = max(64, bits)
+        self._k = max(1, round(self._nbits / self.capacity * math.log(2)))
+        self._cur = bytearray((self._nbits + 7) // 8)
+        self._old = bytearray(len(self._cur))
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def _positions(self, signature: str):
+        digest = hashlib.blake2b(str(signature).strip().upper().encode("ascii", "ignore"),
+                                 digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        n = self._nbits
+        return [(h1 + i * h2) % n for i in range(self._k)]
+
+    def add(self, signature: str):
+        pos = self._positions(signature)
+        with self._lock:
+            if self._count >= self.capacity:
+                # Keep the previous generation so recent entries stay visible
+                self._old, self._cur = self._cur, bytearray(len(self._cur))
+                self._count = 0
+            for p in pos:
+                self._cur[p >> 3] |= 1 << (p & 7)
+            self._count += 1
+
+    def might_contain(self, signature: str) -> bool:
+        pos = self._positions(signature)
+        cur, old = self._cur, self._old
+        return (all(cur[p >> 3] & (1 << (p & 7)) for p in pos)
+                or all(old[p >> 3] & (1 << (p & 7)) for p in pos))
@@ -0,0 +1,197 @@
+"""
+Durable outbox for /claims/queue uploads.
+
+Claims are cumulative, so only the highest claim per channel is kept
+("outbox:<CHANNEL>" in the kiosk KV store); storage and traffic stay bounded
+by the number of channels however long the kiosk is offline. A background
+thread uploads pending claims in batches. Backoff is per entry, so one
+channel the server keeps refusing does not hold up the rest; only a failed
+request (API unreachable) backs off the whole outbox. Batches take the
+entries attempted longest ago first, so every channel gets its turn.
+
+The store is scanned for outbox keys once, at startup; after that an
+in-memory index (channel -> backoff state) is kept in step by put() and
+acks, so the flusher's work is bounded by pending channels, not by the
+size of the whole KV store.
+"""
+from __future__ import annotations
+
+import heapq
+import random
+import threading
+import time
+from typing import Callable, Optional
+
+KEY_PREFIX = "outbox:"
+
+# send_batch(payloads) -> one verdict per payload, or None if uploads are
+# paused (API disabled): the outbox then waits for kick() without backing off.
+# PARK: refused for now (e.g. exposure cap); retried only every backoff_max_s
+# or as soon as a higher claim for the channel replaces it.
+SENT, DROP, RETRY, PARK = "sent", "drop", "retry", "park"
+
+
+class ClaimOutbox:
+    def __init__(self, store, send_batch: Callable[[list], list], batch_size: int = 50,
+                 backoff_base_s: float = 2.0, backoff_max_s: float = 300.0,
+                 on_status: Optional[Callable[[str], None]] = None, quiet_failures: int = 3):
+        self._store = store
+        self._send = send_batch
+        self.batch_size = int(batch_size)
+        self.backoff_base_s = float(backoff_base_s)
+        self.backoff_max_s = float(backoff_max_s)
+        self._on_status = on_status or (lambda msg: None)
+        self.quiet_failures = int(quiet_failures)  # failed flushes before status is reported
+        self._cond = threading.Condition()
+        self._failures = 0    # consecutive failed requests (whole outbox)
+        self._next_try = 0.0
+        # Index of pending channels: channel -> [failures, next_try, last_attempt] (in memory only)
+        self._entries = {k[len(KEY_PREFIX):]: [0, 0.0, 0.0] for k in store.keys(KEY_PREFIX)
+                         if isinstance(store.get(k), dict)}
+        self._stopped = False
+        self.uploaded = 0
+        self._thr = threading.Thread(target=self._run, name="claim-outbox", daemon=True)
+        self._thr.start()
+
+    # ----------- producer side -----------
+    def put(self, claim: dict) -> bool:
+        """Store claim unless a same-or-higher claim for its channel is already pending."""
+        ch = str(claim.get("channel_id", "")).strip().upper()
+        amt = int(str(claim.get("amount_drops", "0")).strip())
+        key = KEY_PREFIX + ch
+        with self._cond:
+            cur = self._store.get(key)
+            if isinstance(cur, dict) and int(cur.get("amount_drops", 0)) >= amt:
+                return False
+            self._store.set(key, dict(claim))
+            # a new/raised claim is worth trying now, whatever the old one hit
+            self._entries[ch] = [0, 0.0, 0.0]
+            self._next_try = 0.0
+            self._cond.notify_all()
+        return True
+
+    def kick(self):
+        """Retry now (e.g. API re-enabled) instead of waiting out the backoff."""
+        with self._cond:
+            self._next_try = 0.0
+            self._cond.notify_all()
+
+    def pending(self) -> list:
+        with self._cond:
+            channels = list(self._entries)
+        out = []
+        for ch in channels:
+            val = self._store.get(KEY_PREFIX + ch)
+            if isinstance(val, dict):
+                out.append(val)
+        return out
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        self._thr.join(timeout=5)
+
+    # ----------- flusher -----------
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    wait = self._wait_s()
+                    if wait is not None and wait <= 0:
+                        break
+                    self._cond.wait(timeout=wait if wait is not None and wait < float("inf") else None)
+                if self._stopped:
+                    return
+            self._flush_once()
+
+    def _wait_s(self) -> Optional[float]:
+        """Seconds until something is due (<= 0: now), None if nothing is pending."""
+        now = time.monotonic()
+        if self._next_try > now:
+            return self._next_try - now
+        if not self._entries:
+            return None
+        return min(e[1] for e in self._entries.values()) - now
+
+    def _entry(self, claim: dict) -> list:
+        ch = str(claim.get("channel_id", "")).strip().upper()
+        return self._entries.get(ch) or [0, 0.0, 0.0]
+
+    def _next_batch(self) -> list:
+        now = time.monotonic()
+        with self._cond:
+            # least recently attempted first: failing channels cannot starve the others
+            due = heapq.nsmallest(self.batch_size, ((e[2], ch) for ch, e in self._entries.items() if e[1] <= now))
+            batch = []
+            for _, ch in due:
+                val = self._store.get(KEY_PREFIX + ch)
+                if isinstance(val, dict):
+                    batch.append(val)
+                else:
+                    self._entries.pop(ch, None)  # cleared behind our back
+        return batch
+
+    def _delay(self, failures: int) -> float:
+        return min(self.backoff_max_s, self.backoff_base_s * (2 ** (failures - 1))) * random.uniform(0.8, 1.2)
+
+    def _flush_once(self):
+        batch = self._next_batch()
+        if not batch:
+            return
+        request_failed = False
+        try:
+            verdicts = self._send(batch)
+            if verdicts is None:
+                with self._cond:
+                    self._next_try = float("inf")
+                return
+            verdicts = list(verdicts)
+            if len(verdicts) != len(batch):
+                raise RuntimeError("verdict count mismatch")
+        except Exception as e:
+            verdicts = [RETRY] * len(batch)
+            request_failed = True
+            print("Outbox upload error:", e)
+        # every claim refused with RETRY: treat as the API failing, not the claims
+        request_failed = request_failed or all(v == RETRY for v in verdicts)
+        now = time.monotonic()
+        for claim, verdict in zip(batch, verdicts):
+            if verdict in (SENT, DROP):
+                self._remove_if_unchanged(claim)
+                if verdict == SENT:
+                    self.uploaded += 1
+                continue
+            with self._cond:
+                ch = str(claim.get("channel_id", "")).strip().upper()
+                if request_failed:
+                    # the API failed, not this claim: the outbox-wide backoff covers it, but
+                    # rotate so a batch that breaks the request is not resent as-is
+                    if ch in self._entries:
+                        self._entries[ch][2] = now
+                    continue
+                cur = self._store.get(KEY_PREFIX + ch)
+                if not (isinstance(cur, dict) and str(cur.get("amount_drops")) == str(claim.get("amount_drops"))):
+                    continue  # replaced by a higher claim meanwhile: that one is due now
+                failures = self._entry(claim)[0] + 1
+                delay = self.backoff_max_s if verdict == PARK else self._delay(failures)
+                self._entries[ch] = [failures, now + delay, now]
+        with self._cond:
+            if request_failed:
+                self._failures += 1
+                delay = self._delay(self._failures)
+                self._next_try = now + delay
+                if self._failures >= self.quiet_failures:
+                    self._on_status(f"Outbox: {len(self._entries)} pending, retry in {delay:.0f}s")
+            else:
+                self._failures = 0
+                self._next_try = 0.0
+
+    def _remove_if_unchanged(self, claim: dict):
+        key = KEY_PREFIX + str(claim.get("channel_id", "")).strip().upper()
+        with self._cond:
+            cur = self._store.get(key)
+            # A higher claim may have replaced this one while it was in flight
+            if isinstance(cur, dict) and str(cur.get("amount_drops")) == str(claim.get("amount_drops")):
+                self._store.set(key, None, wait=False)
+                self._entries.pop(key[len(KEY_PREFIX):], None)
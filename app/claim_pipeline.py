@@ -0,0 +1,72 @@
+"""
+Staged worker pipeline for the kiosk's verify -> vend -> queue flow.
+
+Each stage runs on its own thread and hands jobs to the next stage through a
+queue.Queue. A stage function returns the job (possibly updated) to pass it
+on, or None to stop it there. One thread per stage keeps each stage ordered,
+which the verify stage relies on for its last_seen check-and-set.
+"""
+from __future__ import annotations
+
+import queue
+import threading
+from typing import Callable, Optional
+
+_STOP = object()
+
+
+class ClaimPipeline:
+    def __init__(self, stages, on_error: Optional[Callable] = None, maxsize: int = 0):
+        """stages: [(name, fn(job) -> job | None), ...] in execution order."""
+        self._names = [name for name, _ in stages]
+        self._queues = [queue.Queue(maxsize=maxsize) for _ in stages]
+        self._on_error = on_error or (lambda stage, job, exc: None)
+        self._threads = []
+        self._busy = [0] * len(stages)
+        self._lock = threading.Lock()
+        for i, (name, fn) in enumerate(stages):
+            t = threading.Thread(target=self._run, args=(i, fn), name=f"pipeline-{name}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def submit(self, job) -> bool:
+        try:
+            self._queues[0].put_nowait(job)
+            return True
+        except queue.Full:
+            return False
+
+    def pending(self) -> dict:
+        """Jobs waiting or running per stage."""
+        with self._lock:
+            return {n: q.qsize() + b for n, q, b in zip(self._names, self._queues, self._busy)}
+
+    def stop(self, timeout: float = 5.0):
+        self._queues[0].put(_STOP)
+        for t in self._threads:
+            t.join(timeout)
+
+    def _run(self, idx: int, fn):
+        q = self._queues[idx]
+        nxt = self._queues[idx + 1] if idx + 1 < len(self._queues) else None
+        while True:
+            job = q.get()
+            if job is _STOP:
+                if nxt is not None:
+                    nxt.put(_STOP)
+                return
+            with self._lock:
+                self._busy[idx] += 1
+            try:
+                out = fn(job)
+            except Exception as e:
+                out = None
+                try:
+                    self._on_error(self._names[idx], job, e)
+                except Exception:
+                    pass
+            finally:
+                with self._lock:
+                    self._busy[idx] -= 1
+            if out is not None and nxt is not None:
+                nxt.put(out)
@@ -0,0 +1,231 @@
+"""
+Crash-safe key/value store for kiosk state (last_seen / settled per channel).
+
+Values live in an in-memory dict; every set is appended to a checksummed log
+(one JSON record per line). A single background writer batches pending
+records into one write+fsync (group commit) and rewrites the log as a compact
+snapshot once it has grown well past the live data. A legacy kv.json is
+imported on first start.
+"""
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import threading
+import time
+import zlib
+
+
+def _encode(key, value) -> bytes:
+    payload = json.dumps([key, value], separators=(",", ":")).encode("utf-8")
+    return b"%08x %s\n" % (zlib.crc32(payload), payload)
+
+
+def _decode(line: bytes):
+    """-> (key, value) or None for a torn/corrupt record."""
+    if len(line) < 10 or not line.endswith(b"\n") or line[8:9] != b" ":
+        return None
+    payload = line[9:-1]
+    try:
+        if int(line[:8], 16) != zlib.crc32(payload):
+            return None
+        key, value = json.loads(payload)
+        return key, value
+    except Exception:
+        return None
+
+
+class KVStore:
+    def __init__(self, path: str, legacy_json_path: str | None = None,
+                 commit_interval_s: float = 0.005, compact_min_bytes: int = 1 << 20):
+        self.path = path
+        self.commit_interval_s = float(commit_interval_s)
+        self.compact_min_bytes = int(compact_min_bytes)
+        self._data: dict = {}
+        self._cond = threading.Condition()
+        self._pending: list[bytes] = []
+        self._seq = 0           # last record handed to the writer
+        self._written_seq = 0   # last record the writer has dealt with (ok or failed)
+        self._durable_seq = 0   # last record in a batch that fsynced
+        self._failed = []       # (first_seq, last_seq, error) of recent failed batches
+        self._flush_checked = 0
+        self._closed = False
+        self._log_bytes = 0
+        self.commits = 0        # number of fsync batches (for diagnostics)
+        self.corrupt_records = 0  # mid-log records skipped on replay
+
+        if os.path.exists(path):
+            self._replay()
+        elif legacy_json_path and os.path.exists(legacy_json_path):
+            self._migrate(legacy_json_path)
+        self._fh = open(path, "ab")
+        self._thr = threading.Thread(target=self._run, name="kv-writer", daemon=True)
+        self._thr.start()
+        atexit.register(self.close)
+
+    # ----------- public API -----------
+    def get(self, key, default=None):
+        return self._data.get(key, default)
+
+    def set(self, key, value, wait: bool = True):
+        """Update in memory and log it; wait=True blocks until fsynced (OSError if that failed)."""
+        rec = _encode(key, value)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("KV store is closed")
+            self._data[key] = value
+            self._pending.append(rec)
+            self._seq += 1
+            seq = self._seq
+            self._cond.notify_all()
+            if wait:
+                self._wait_written(seq)
+                err = self._failure(seq, seq)
+                if err is not None:
+                    raise OSError(f"KV write of {key!r} not durable: {err}") from err
+
+    def keys(self, prefix: str = ""):
+        return [k for k in list(self._data) if k.startswith(prefix)]
+
+    def flush(self):
+        """Wait for everything set so far; OSError if a batch since the last flush failed."""
+        with self._cond:
+            seq = self._seq
+            self._cond.notify_all()
+            self._wait_written(seq)
+            err = self._failure(self._flush_checked + 1, seq)
+            self._flush_checked = seq
+            if err is not None:
+                raise OSError(f"KV writes not durable: {err}") from err
+
+    def _wait_written(self, seq: int):
+        while self._written_seq < seq and not self._closed:
+            self._cond.wait()
+
+    def _failure(self, lo: int, hi: int):
+        for first, last, err in self._failed:
+            if first <= hi and lo <= last:
+                return err
+        return None
+
+    def close(self):
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thr.join(timeout=5)
+        try:
+            self._fh.close()
+        except Exception:
+            pass
+
+    def __len__(self):
+        return len(self._data)
+
+    # ----------- startup -----------
+    def _replay(self):
+        with open(self.path, "rb") as f:
+            lines = f.readlines()
+        size = sum(len(line) for line in lines)
+        corrupt = 0
+        for i, line in enumerate(lines):
+            rec = _decode(line)
+            if rec is not None:
+                self._data[rec[0]] = rec[1]
+            elif i == len(lines) - 1:
+                # torn final record from a crash mid-write: the only thing safe to cut
+                print(f"KV: dropping {len(line)} bytes of torn log tail")
+                size -= len(line)
+                with open(self.path, "r+b") as f:
+                    f.truncate(size)
+                    f.flush()
+                    os.fsync(f.fileno())
+            else:
+                # later records are still valid; skip this one rather than lose them
+                corrupt += 1
+                print(f"KV: skipping corrupt record {i + 1} of {len(lines)} in {self.path}")
+        self.corrupt_records = corrupt
+        self._log_bytes = size
+
+    def _migrate(self, legacy_json_path: str):
+        try:
+            with open(legacy_json_path, "r", encoding="utf-8") as f:
+                self._data = dict(json.load(f) or {})
+        except Exception as e:
+            print("KV migrate error:", e)
+            return
+        self._write_snapshot(dict(self._data))
+        try:
+            os.replace(legacy_json_path, legacy_json_path + ".migrated")
+        except OSError as e:
+            print("KV migrate rename error:", e)
+
+    # ----------- writer thread -----------
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending and self._closed:
+                    return
+            if self.commit_interval_s > 0 and not self._closed:
+                time.sleep(self.commit_interval_s)  # let concurrent writers join the batch
+            with self._cond:
+                batch, self._pending = self._pending, []
+                first, upto = self._written_seq + 1, self._seq
+            err = None
+            try:
+                data = b"".join(batch)
+                self._fh.write(data)
+                self._fh.flush()
+                os.fsync(self._fh.fileno())
+                self._log_bytes += len(data)
+                self.commits += 1
+            except Exception as e:
+                err = e
+                print("KV save error:", e)
+            with self._cond:
+                self._written_seq = upto
+                if err is None:
+                    self._durable_seq = upto
+                else:
+                    self._failed = (self._failed + [(first, upto, err)])[-16:]
+                self._cond.notify_all()
+            if self._log_bytes > self.compact_min_bytes and self._log_bytes > 4 * self._live_bytes_estimate():
+                self._compact()
+
+    def _live_bytes_estimate(self) -> int:
+        return 48 * max(1, len(self._data))
+
+    def _compact(self):
+        with self._cond:
+            snap = dict(self._data)
+        try:
+            self._fh.close()
+            self._write_snapshot(snap)
+        except Exception as e:
+            print("KV compact error:", e)
+        finally:
+            self._fh = open(self.path, "ab")
+
+    def _write_snapshot(self, snap: dict):
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            for k, v in snap.items():
+                if v is not None:  # None marks an invalidated entry
+                    f.write(_encode(k, v))
+            f.flush()
+            os.fsync(f.fileno())
+            size = f.tell()
+        os.replace(tmp, self.path)
+        try:
+            dfd = os.open(os.path.dirname(os.path.abspath(self.path)), os.O_RDONLY)
+            try:
+                os.fsync(dfd)
+            finally:
+                os.close(dfd)
+        except OSError:
+            pass  # directory fsync unsupported (e.g. Windows)
+        self._log_bytes = size
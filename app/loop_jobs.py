@@ -0,0 +1,112 @@
+"""
+Job manager for coroutines submitted to a background asyncio loop.
+
+Every job gets a deadline (asyncio.wait_for, measured from submission, so it
+covers time spent waiting for a slot), at most `max_concurrent` jobs run at
+once, and submissions are refused outright once `max_pending` jobs are
+queued or running, so BLE work cannot pile up behind a hung write. The
+returned concurrent.futures.Future can be cancelled from any thread; that
+cancels the task on the loop.
+"""
+from __future__ import annotations
+
+import asyncio
+import inspect
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Optional
+
+
+class JobRejected(RuntimeError):
+    pass
+
+
+class LoopJobManager:
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_concurrent: int = 2,
+                 max_pending: int = 16, default_timeout: Optional[float] = 30.0):
+        self._loop = loop
+        self.max_concurrent = int(max_concurrent)
+        self.max_pending = int(max_pending)
+        self.default_timeout = default_timeout
+        self._sem = None  # created on the loop thread
+        self._lock = threading.Lock()
+        self._jobs = set()
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.cancelled = 0
+        self.rejected = 0
+
+    @property
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._jobs)
+
+    def submit(self, coro, timeout: Optional[float] = None, on_done: Optional[Callable] = None,
+               name: str = "") -> Future:
+        """Schedule coro; on_done(result, exc) runs once it settles (normally on the loop thread)."""
+        timeout = self.default_timeout if timeout is None else timeout
+        with self._lock:
+            if len(self._jobs) >= self.max_pending:
+                self.rejected += 1
+                coro.close()
+                fut = Future()
+                fut.set_exception(JobRejected(f"{len(self._jobs)} jobs in flight, refusing {name or 'job'}"))
+                return fut
+            fut = asyncio.run_coroutine_threadsafe(self._run(coro, timeout, time.monotonic()), self._loop)
+            self._jobs.add(fut)
+        fut.add_done_callback(lambda f: self._finished(f, coro, on_done))
+        return fut
+
+    def cancel_all(self) -> int:
+        with self._lock:
+            jobs = list(self._jobs)
+        return sum(1 for f in jobs if f.cancel())
+
+    async def _run(self, coro, timeout, submitted):
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self.max_concurrent)
+
+        async def guarded():
+            async with self._sem:
+                return await coro
+
+        try:
+            if not timeout:
+                return await guarded()
+            left = timeout - (time.monotonic() - submitted)
+            if left <= 0:
+                raise asyncio.TimeoutError()
+            return await asyncio.wait_for(guarded(), left)
+        finally:
+            _close_unstarted(coro)  # timed out or cancelled while waiting for a slot
+
+    def _finished(self, fut: Future, coro, on_done):
+        if fut.cancelled():
+            # cancelled before the loop ever ran the job
+            self._loop.call_soon_threadsafe(_close_unstarted, coro)
+        with self._lock:
+            self._jobs.discard(fut)
+            if fut.cancelled():
+                self.cancelled += 1
+            elif isinstance(fut.exception(), asyncio.TimeoutError):
+                self.timed_out += 1
+            elif fut.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+        if on_done is None:
+            return
+        try:
+            if fut.cancelled():
+                on_done(None, asyncio.CancelledError())
+            else:
+                on_done(fut.result() if fut.exception() is None else None, fut.exception())
+        except Exception as e:
+            print("Job callback error:", e)
+
+
+def _close_unstarted(coro):
+    if inspect.getcoroutinestate(coro) == inspect.CORO_CREATED:
+        coro.close()
@@ -1,9 +1,14 @@
 
 from __future__ import annotations
 
-import os, json, time, threading, asyncio
+import os, sys, json, time, threading, asyncio
 from typing import Optional
 
+# Shared helpers live in ../common (plain modules, not an installed package)
+_COMMON_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common")
+if _COMMON_DIR not in sys.path:
+    sys.path.insert(0, _COMMON_DIR)
+
 # --- Third-party (optional) ---
 try:
     from bleak import BleakClient, BleakScanner  # BLE helper
@@ -11,16 +16,8 @@ except Exception:
     BleakClient = None
     BleakScanner = None
 
-import requests
-
 # xrpl-py imports (supporting multiple versions)
 from xrpl.clients import JsonRpcClient
-from xrpl.core.binarycodec import encode_for_signing_claim as _enc_new
-try:
-    # older path fallback
-    from xrpl.core.binarycodec.main import encode_for_signing_claim as _enc_old  # type: ignore
-except Exception:
-    _enc_old = None
 
 try:
     # preferred verify if available
@@ -30,9 +27,29 @@ except Exception:
         from xrpl.core.keypairs.main import verify as xrpl_verify  # type: ignore
     except Exception:
         xrpl_verify = None
+try:
+    # xrpl-py >= 2.x name
+    from xrpl.core.keypairs import is_valid_message as xrpl_is_valid_message
+except Exception:
+    xrpl_is_valid_message = None
+
+import inspect
 
-from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
-from binascii import unhexlify
+from claim_codec import encode_for_signing_claim as _encode_claim_msg
+from merchant_api import MerchantApiClient, MerchantApiError, normalize_base_url
+from claim_cache import VerdictCache, SeenFilter
+from kv_store import KVStore
+from channel_keys import ChannelKeyCache
+from channel_snapshot import ChannelSnapshot
+from claim_pipeline import ClaimPipeline
+from claim_outbox import ClaimOutbox
+from receipts_cache import ReceiptsCache
+import claim_outbox as outbox_mod
+import vend_frame
+import verify_worker
+from notify_buffer import NotifyBuffer
+from loop_jobs import LoopJobManager, JobRejected
+import metrics
 
 # --- Kivy ---
 from kivy.uix.screenmanager import Screen
@@ -40,6 +57,7 @@ from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.label import Label
 from kivy.uix.button import Button
 from kivy.uix.textinput import TextInput
+from kivy.uix.popup import Popup
 from kivy.clock import Clock
 
 # ==============================
@@ -48,10 +66,54 @@ from kivy.clock import Clock
 API_BASE_URL = os.environ.get("API_BASE_URL", "http://127.0.0.1:3000").rstrip("/")
 DEFAULT_USE_API = os.environ.get("USE_API", "true").lower() in ("1", "true", "yes")
 XRP_RPC_HTTP = os.environ.get("XRP_RPC_HTTP", "https://s.altnet.rippletest.net:51234")
+# API auth (not needed with DEV_NO_AUTH): a token, or credentials to log in with
+API_TOKEN = os.environ.get("API_TOKEN", "").strip()
+API_EMAIL = os.environ.get("API_EMAIL", "").strip()
+API_PASSWORD = os.environ.get("API_PASSWORD", "")
 
 # Device-side exposure cap used for local checks (drops)
 EXPOSURE_CAP_DROPS = int(os.environ.get("EXPOSURE_CAP_DROPS", "3000000"))
 
+# Repeated-claim handling: verdict cache (size/age) + seen-signature filter
+VERDICT_CACHE_SIZE = int(os.environ.get("VERDICT_CACHE_SIZE", "4096"))
+VERDICT_CACHE_TTL_S = float(os.environ.get("VERDICT_CACHE_TTL_S", "600"))
+SEEN_FILTER_CAPACITY = int(os.environ.get("SEEN_FILTER_CAPACITY", "100000"))
+
+# Channel PublicKey cache: entries older than this are refreshed in the background
+CHANNEL_KEY_TTL_S = float(os.environ.get("CHANNEL_KEY_TTL_S", str(7 * 24 * 3600)))
+CHANNEL_KEY_WARM_INTERVAL_S = float(os.environ.get("CHANNEL_KEY_WARM_INTERVAL_S", "300"))
+
+# Merchant r-address whose incoming PayChannels are snapshotted for offline prechecks
+MERCHANT_ADDRESS = os.environ.get("MERCHANT_ADDRESS", "").strip()
+CHANNEL_SNAPSHOT_INTERVAL_S = float(os.environ.get("CHANNEL_SNAPSHOT_INTERVAL_S", "120"))
+# Decline claims on channels that expire within this window (settlement needs time)
+CHANNEL_EXPIRY_MARGIN_S = float(os.environ.get("CHANNEL_EXPIRY_MARGIN_S", "600"))
+
+# Claims allowed to wait for the verify stage before taps are refused
+PIPELINE_MAX_PENDING = int(os.environ.get("PIPELINE_MAX_PENDING", "64"))
+APPROVED_MSG = "Approved (Offline). Product may dispense."
+
+# Outbox flush: claims per upload request, longest retry backoff
+OUTBOX_BATCH_SIZE = int(os.environ.get("OUTBOX_BATCH_SIZE", "50"))
+OUTBOX_BACKOFF_MAX_S = float(os.environ.get("OUTBOX_BACKOFF_MAX_S", "300"))
+
+# BLE connect: direct-connect timeout for the cached ESP32, scan window per reconnect try
+BLE_DIRECT_TIMEOUT_S = float(os.environ.get("BLE_DIRECT_TIMEOUT_S", "4"))
+BLE_RECONNECT_SCAN_S = float(os.environ.get("BLE_RECONNECT_SCAN_S", "8"))
+# Vend command encoding: auto (binary if the ESP32 advertises frame_v), binary, json
+VEND_FRAME_MODE = os.environ.get("VEND_FRAME_MODE", "auto").strip().lower()
+# ESP32 notifications held between UI frames (oldest dropped beyond this)
+NOTIFY_BUFFER_SIZE = int(os.environ.get("NOTIFY_BUFFER_SIZE", "64"))
+# BLE job limits: per-write deadline, concurrent jobs, jobs queued before refusing more.
+# Connect/reconnect/disconnect run in their own single slot, so a slow scan never holds up vend writes.
+BLE_WRITE_TIMEOUT_S = float(os.environ.get("BLE_WRITE_TIMEOUT_S", "5"))
+BLE_MAX_CONCURRENT_JOBS = int(os.environ.get("BLE_MAX_CONCURRENT_JOBS", "1"))
+BLE_MAX_PENDING_JOBS = int(os.environ.get("BLE_MAX_PENDING_JOBS", "8"))
+# Hot-path metrics: export file (.prom = Prometheus text, else JSON; empty = off), admin panel
+METRICS_PATH = os.environ.get("METRICS_PATH", "").strip()
+METRICS_EXPORT_INTERVAL_S = float(os.environ.get("METRICS_EXPORT_INTERVAL_S", "30"))
+METRICS_PANEL = os.environ.get("METRICS_PANEL", "false").lower() in ("1", "true", "yes")
+
 # Optional BLE UUIDs (must match ESP32 sketch if you use BLE vend)
 SERVICE_UUID           = "12345678-1234-5678-1234-56789abcdef0"
 CHARACTERISTIC_TX_UUID = "12345678-1234-5678-1234-56789abcdef0"  # READ/NOTIFY
@@ -59,85 +121,210 @@ CHARACTERISTIC_RX_UUID = "12345678-1234-5678-1234-56789abcdef1"  # WRITE
 TARGET_NAME_HINT       = "ESP32_BLE_SERVER"
 
 # ==============================
-# Helpers: kv store (JSON file)
+# Helpers: kv store (in-memory index + append-only log)
 # ==============================
-_KV_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "kv.json")
+_KV_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "kv.json")  # legacy, migrated once
+_KV_LOG_PATH = os.environ.get("KV_LOG_PATH") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "kv.log")
+KV_COMMIT_INTERVAL_MS = float(os.environ.get("KV_COMMIT_INTERVAL_MS", "5"))
+_kv_store: Optional[KVStore] = None
+_kv_lock = threading.Lock()
 
-def _kv_load():
-    try:
-        if os.path.exists(_KV_PATH):
-            with open(_KV_PATH, "r", encoding="utf-8") as f:
-                return json.load(f)
-    except Exception as e:
-        print("KV load error:", e)
-    return {}
+def _kv() -> KVStore:
+    global _kv_store
+    if _kv_store is None:
+        with _kv_lock:
+            if _kv_store is None:
+                _kv_store = KVStore(_KV_LOG_PATH, legacy_json_path=_KV_PATH,
+                                    commit_interval_s=KV_COMMIT_INTERVAL_MS / 1000.0)
+    return _kv_store
 
+@metrics.timed("kv_get")
 def kv_get(key, default=None):
-    return _kv_load().get(key, default)
+    return _kv().get(key, default)
 
-def kv_set(key, value):
-    d = _kv_load()
-    d[key] = value
+@metrics.timed("kv_set")
+def kv_set(key, value, wait: bool = True) -> bool:
+    """False if the write failed (with wait=True: was not fsynced)."""
     try:
-        with open(_KV_PATH, "w", encoding="utf-8") as f:
-            json.dump(d, f)
+        _kv().set(key, value, wait=wait)
+        return True
     except Exception as e:
         print("KV save error:", e)
+        return False
 
 # ==============================
 # XRPL claim verification utils
 # ==============================
+@metrics.timed("encode_claim")
 def encode_for_signing_claim(channel_id: str, amount_drops: str | int) -> bytes:
-    amt = str(int(str(amount_drops).strip()))  # normalize & strip leading zeros
-    try:
-        res = _enc_new(channel=channel_id, amount=amt)
-    except TypeError:
-        if _enc_old is None:
-            raise
-        res = _enc_old({"channel": channel_id, "amount": amt})
-    if isinstance(res, str):
-        return bytes.fromhex(res)
-    return bytes(res)
+    # struct fast path; xrpl-py codec only for inputs the fast path rejects
+    return _encode_claim_msg(channel_id, amount_drops)
+
+# Native verify lives in verify_worker (no Kivy import) so process pools can use it
+PUBKEY_CACHE_SIZE = verify_worker.PUBKEY_CACHE_SIZE
+_parse_pubkey = verify_worker.parse_pubkey
+_native_verify = verify_worker.native_verify
 
 def _ed25519_verify_raw(msg: bytes, sig_hex: str, pub_hex: str) -> bool:
-    sig = unhexlify(str(sig_hex).strip())
-    pub = unhexlify(str(pub_hex).strip())
-    if len(pub) == 33 and pub[0] == 0xED:  # XRPL ed25519 prefix
-        pub = pub[1:]
     try:
-        Ed25519PublicKey.from_public_bytes(pub).verify(sig, msg)
-        return True
+        return _native_verify(msg, sig_hex, pub_hex)
     except Exception:
         return False
 
+def _resolve_xrpl_backend():
+    """Pick the xrpl-py verify entry point and calling convention once."""
+    if xrpl_is_valid_message is not None:
+        return lambda msg, sig, pk: bool(xrpl_is_valid_message(msg, bytes.fromhex(sig), pk))
+    if xrpl_verify is not None:
+        try:
+            params = inspect.signature(xrpl_verify).parameters
+        except (TypeError, ValueError):
+            params = {}
+        if "message" in params and "public_key" in params:
+            return lambda msg, sig, pk: bool(xrpl_verify(message=msg, signature=sig, public_key=pk))
+        return lambda msg, sig, pk: bool(xrpl_verify(msg, sig, pk))
+    return None
+
+_xrpl_backend = _resolve_xrpl_backend()
+
+@metrics.timed("verify_claim")
 def verify_claim(channel_id: str, amount_drops: str, signature_hex: str, pubkey_hex: str) -> bool:
     msg = encode_for_signing_claim(channel_id, amount_drops)
-    # Prefer xrpl's verify if available
-    if xrpl_verify is not None:
+    # Native (cryptography) path; xrpl-py only for keys it cannot parse
+    try:
+        return _native_verify(msg, signature_hex, pubkey_hex)
+    except Exception:
+        pass
+    if _xrpl_backend is not None:
         try:
-            return bool(xrpl_verify(message=msg, signature=signature_hex, public_key=pubkey_hex))
-        except TypeError:
-            try:
-                return bool(xrpl_verify(msg, signature_hex, pubkey_hex))
-            except Exception:
-                pass
+            return _xrpl_backend(msg, str(signature_hex).strip(), str(pubkey_hex).strip().upper())
         except Exception:
             pass
-    # Fallback ed25519
-    if pubkey_hex.upper().startswith("ED"):
-        return _ed25519_verify_raw(msg, signature_hex, pubkey_hex)
     return False
 
-def fetch_channel_pubkey(channel_id: str) -> Optional[str]:
-    """Online: fetch PayChannel's PublicKey (uppercase hex) from Testnet."""
+# Worker count for batch re-verification (0/unset -> one per CPU)
+VERIFY_WORKERS = int(os.environ.get("VERIFY_WORKERS", "0") or 0)
+# Smallest batch worth a process pool. Spawning workers from the kiosk costs ~2.4s
+# (each child re-imports the Kivy main module) against ~5-6k claims/s in-process,
+# so a 2-CPU pool breaks even near 24k claims.
+VERIFY_PROCESS_MIN_BATCH = int(os.environ.get("VERIFY_PROCESS_MIN_BATCH", "20000") or 20000)
+
+def _verify_claim_item(item) -> bool:
+    """Verify one claim dict; never raises."""
     try:
-        client = JsonRpcClient(XRP_RPC_HTTP)
-        req = {"method": "ledger_entry", "params": [{"index": channel_id, "ledger_index": "validated"}]}
-        res = client._request_impl(req)  # low-level to avoid version drift
-        pk = (res or {}).get("result", {}).get("node", {}).get("PublicKey")
-        return pk.upper() if isinstance(pk, str) and pk else None
+        ch  = str(item.get("channel_id","")).strip()
+        amt = str(item.get("amount_drops","")).strip()
+        sig = str(item.get("signature","")).strip()
+        pk  = str(item.get("pubkey","")).strip()
+        if not (ch and amt and sig and pk):
+            return False
+        return verify_claim(ch, amt, sig, pk)
     except Exception:
-        return None
+        return False
+
+def verify_claims_batch(claims, workers: Optional[int] = None, use_processes: Optional[bool] = None,
+                        chunksize: int = 256):
+    """Verify many claim dicts (offline: claims need a pubkey).
+
+    Returns (results, claims_per_sec); results[i] is the verdict for claims[i].
+    Verification holds the GIL, so there is no thread pool: batches run in this
+    thread, or in verify_worker's spawned (never forked) processes. By default
+    processes are used only from VERIFY_PROCESS_MIN_BATCH claims with more than
+    one worker; use_processes=True/False forces the choice.
+    """
+    items = list(claims)
+    t0 = time.perf_counter()
+    workers = workers or VERIFY_WORKERS or os.cpu_count() or 1
+    if use_processes is None:
+        use_processes = len(items) >= VERIFY_PROCESS_MIN_BATCH
+    if use_processes and workers > 1 and len(items) > 1:
+        chunk = max(1, min(chunksize, len(items) // workers or 1))
+        results = verify_worker.verify_batch(items, workers, chunk)
+    else:
+        results = [_verify_claim_item(it) for it in items]
+    elapsed = time.perf_counter() - t0
+    rate = (len(items) / elapsed) if elapsed > 0 else float(len(items))
+    return results, rate
+
+_rpc_client: Optional[JsonRpcClient] = None
+
+def _rpc(method: str, params: dict) -> dict:
+    """Raw JSON-RPC call on a shared client; returns the "result" object."""
+    global _rpc_client
+    if _rpc_client is None:
+        _rpc_client = JsonRpcClient(XRP_RPC_HTTP)
+    res = _rpc_client._request_impl({"method": method, "params": [params]})  # low-level to avoid version drift
+    return (res or {}).get("result", {}) or {}
+
+@metrics.timed("fetch_channel_pubkey")
+def fetch_channel_pubkey(channel_id: str) -> Optional[str]:
+    """Online: fetch PayChannel's PublicKey (uppercase hex) from Testnet.
+
+    None only if the channel does not exist (closed); raises when the lookup
+    itself fails, so an offline kiosk keeps its cached key."""
+    res = _rpc("ledger_entry", {"index": channel_id, "ledger_index": "validated"})
+    node = res.get("node")
+    if not node:
+        if res.get("error") == "entryNotFound":
+            return None
+        raise RuntimeError(f"ledger_entry failed: {res.get('error', res)}")
+    pk = node.get("PublicKey")
+    return pk.upper() if isinstance(pk, str) and pk else None
+
+_channel_key_cache: Optional[ChannelKeyCache] = None
+
+def _channel_keys() -> ChannelKeyCache:
+    global _channel_key_cache
+    if _channel_key_cache is None:
+        with _kv_lock:
+            if _channel_key_cache is None:
+                _channel_key_cache = ChannelKeyCache(_kv(), fetch_channel_pubkey, ttl_s=CHANNEL_KEY_TTL_S)
+    return _channel_key_cache
+
+_channel_snapshot_obj: Optional[ChannelSnapshot] = None
+
+def _channel_snapshot() -> ChannelSnapshot:
+    """Offline PayChannel snapshot for the merchant (MERCHANT_ADDRESS or learned from /health)."""
+    global _channel_snapshot_obj
+    merchant = MERCHANT_ADDRESS or kv_get("merchant_address") or ""
+    snap = _channel_snapshot_obj
+    if snap is None or snap.merchant != merchant:
+        snap = _channel_snapshot_obj = ChannelSnapshot(_kv(), _rpc, merchant, key_cache=_channel_keys())
+    return snap
+
+def lookup_channel_pubkey(channel_id: str, allow_network: bool = True) -> Optional[str]:
+    """Cached channel PublicKey; hits the ledger only for unknown channels."""
+    return _channel_keys().get(channel_id, allow_network=allow_network)
+
+def upload_claim_batch(api: MerchantApiClient, payloads: list) -> list:
+    """POST claims to /claims/queue in one request; per-claim outbox verdicts.
+
+    Falls back to one request per claim for APIs without batch support."""
+    def verdict(status: int) -> str:
+        if status == 200:
+            return outbox_mod.SENT
+        if status in (400, 409):  # invalid, or server already has a same/higher claim
+            return outbox_mod.DROP
+        if status == 402:  # exposure_cap_exceeded: this claim only, not the API
+            return outbox_mod.PARK
+        return outbox_mod.RETRY
+
+    try:
+        results = api.queue_claims(payloads)
+        return [verdict(int(x.get("status", 200 if x.get("accepted") else 500))) for x in results]
+    except MerchantApiError as e:
+        if e.status in (401, 403, 429) or (e.status >= 500 and e.status != 501):
+            return [outbox_mod.RETRY] * len(payloads)
+    out = []
+    for p in payloads:
+        try:
+            api.queue_claim(p)
+            out.append(outbox_mod.SENT)
+        except MerchantApiError as e:
+            out.append(verdict(e.status))
+        except Exception:
+            out.append(outbox_mod.RETRY)
+    return out
 
 # ==============================
 # BLE helper (optional)
@@ -147,55 +334,206 @@ class _AsyncLoopThread:
         self.loop = asyncio.new_event_loop()
         self.t = threading.Thread(target=self.loop.run_forever, daemon=True)
         self.t.start()
-    def call(self, coro):
-        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+        self.jobs = LoopJobManager(self.loop, max_concurrent=BLE_MAX_CONCURRENT_JOBS,
+                                   max_pending=BLE_MAX_PENDING_JOBS)
+        self.link_jobs = LoopJobManager(self.loop, max_concurrent=1, max_pending=2)
+    def call(self, coro, timeout=None, on_done=None, name="", link=False):
+        mgr = self.link_jobs if link else self.jobs
+        return mgr.submit(coro, timeout=timeout, on_done=on_done, name=name)
+    def cancel_all(self):
+        return self.jobs.cancel_all() + self.link_jobs.cancel_all()
 
 class BleVendClient:
-    def __init__(self, on_notify=None, log_fn=None):
+    def __init__(self, on_notify=None, log_fn=None, auto_reconnect=True, on_notify_batch=None):
         self._thr = _AsyncLoopThread()
         self._client = None
         self._connected = False
         self._on_notify = on_notify or (lambda msg: None)
+        self._on_notify_batch = on_notify_batch
+        self._notify_buf = NotifyBuffer(self._deliver_notifications,
+                                        lambda fn: Clock.schedule_once(fn),
+                                        capacity=NOTIFY_BUFFER_SIZE)
         self._log = log_fn or (lambda msg: None)
+        self._auto_reconnect = auto_reconnect
+        self._want_connected = False  # set by connect(); cleared by disconnect()
+        self._reconnect_handle = None  # loop.call_later handle of the next reconnect attempt
+        self._reconnecting = False     # an attempt is scheduled or running
+        self._connect_lock = None     # created on the loop thread
+        self._target = (TARGET_NAME_HINT, SERVICE_UUID)
+        self._frame_version = 0       # from the ESP32's merchant-info read
 
     def connect(self, target_name=TARGET_NAME_HINT, service_uuid=SERVICE_UUID, timeout=10.0):
-        return self._thr.call(self._connect_async(target_name, service_uuid, timeout))
+        self._want_connected = True
+        self._target = (target_name, service_uuid)
+        # a connect may chain a direct attempt, a scan and a full connect
+        return self._thr.call(self._connect_async(target_name, service_uuid, timeout),
+                              timeout=self._connect_deadline(timeout), name="connect", link=True)
+
+    @staticmethod
+    def _connect_deadline(timeout):
+        return timeout + BLE_DIRECT_TIMEOUT_S + 20
+
+    def disconnect(self):
+        self._want_connected = False
+        self._thr.cancel_all()
+        return self._thr.call(self._disconnect_async(), timeout=BLE_WRITE_TIMEOUT_S, name="disconnect",
+                              link=True)
+
+    async def _disconnect_async(self):
+        if self._reconnect_handle is not None:
+            self._reconnect_handle.cancel()
+            self._reconnect_handle = None
+        self._reconnecting = False
+        if self._client is not None:
+            try:
+                await self._client.disconnect()
+            except Exception:
+                pass
+        self._connected = False
+        return True
+
+    async def _find_device(self, target_name, service_uuid, timeout):
+        """Scan filtered by service UUID; returns as soon as the ESP32 is seen."""
+        want = service_uuid.lower()
+
+        def match(d, adv):
+            uuids = [u.lower() for u in (getattr(adv, "service_uuids", None) or [])]
+            return want in uuids or d.name == target_name or getattr(adv, "local_name", None) == target_name
+
+        finder = getattr(BleakScanner, "find_device_by_filter", None)
+        if finder is not None:
+            return await finder(match, timeout=timeout, service_uuids=[service_uuid])
+        # very old bleak: fall back to a single discover pass
+        for d in await BleakScanner.discover(timeout=timeout):
+            if d.name == target_name:
+                return d
+        return None
+
+    async def _open(self, address_or_device, timeout):
+        client = BleakClient(address_or_device, timeout=timeout,
+                             disconnected_callback=self._on_disconnected)
+        await client.connect()
+        try:
+            ic = getattr(client, "is_connected", None)
+            ok = await ic() if callable(ic) else bool(ic)
+        except Exception:
+            ok = True
+        if not ok:
+            return False
+        self._client = client
+        self._connected = True
+        try:
+            await client.start_notify(CHARACTERISTIC_TX_UUID, self._notify_cb)
+        except Exception:
+            pass
+        self._frame_version = await self._read_frame_version(client)
+        addr = getattr(address_or_device, "address", address_or_device)
+        if addr and addr != kv_get("ble:last_address"):
+            kv_set("ble:last_address", addr, wait=False)
+        return True
 
     async def _connect_async(self, target_name, service_uuid, timeout):
         if BleakScanner is None:
             self._log("BLE unavailable (bleak not installed).")
             return False
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self._connected:
+                return True
+            t0 = time.perf_counter()
 
-        self._log(f"[BLE] scanning up to {timeout}s…")
-        deadline = time.time() + timeout
-        target = None
-        while time.time() < deadline and target is None:
-            devices = await BleakScanner.discover(timeout=2.0)
-            for d in devices:
-                if d.name == target_name:
-                    target = d
-                    break
-        if target is None:
-            self._log("[BLE] device not found.")
-            return False
+            # 1) Direct connect to the last known ESP32 (no scan)
+            cached = kv_get("ble:last_address")
+            if cached:
+                self._log(f"[BLE] connecting to cached {cached}…")
+                try:
+                    if await asyncio.wait_for(self._open(cached, BLE_DIRECT_TIMEOUT_S), BLE_DIRECT_TIMEOUT_S + 1):
+                        metrics.observe("ble_connect", time.perf_counter() - t0)
+                        self._log(f"[BLE] connected in {time.perf_counter() - t0:.2f}s.")
+                        return True
+                except Exception:
+                    pass  # moved/replaced/asleep: scan instead
+
+            # 2) Filtered scan that stops at the first match
+            remaining = max(1.0, timeout - (time.perf_counter() - t0))
+            self._log(f"[BLE] scanning up to {remaining:.0f}s…")
+            target = await self._find_device(target_name, service_uuid, remaining)
+            if target is None:
+                metrics.inc("ble_connect_failed")
+                self._log("[BLE] device not found.")
+                return False
+
+            self._log(f"[BLE] connecting to {target.address} ({target.name})…")
+            try:
+                ok = await self._open(target, 15.0)
+            except Exception as e:
+                metrics.inc("ble_connect_failed")
+                self._log(f"[BLE] connect error: {e}")
+                return False
+            if ok:
+                metrics.observe("ble_connect", time.perf_counter() - t0)
+                self._log(f"[BLE] connected in {time.perf_counter() - t0:.2f}s.")
+            return ok
 
-        self._log(f"[BLE] connecting to {target.address} ({target.name})…")
-        self._client = BleakClient(target.address, timeout=15.0)
-        await self._client.connect()
+    def _on_disconnected(self, client):
+        # bleak calls this on the loop thread
+        if client is not self._client:
+            return
+        self._connected = False
+        self._log("[BLE] link lost.")
+        if self._auto_reconnect and self._want_connected and not self._reconnecting:
+            self._reconnecting = True
+            self._reconnect_attempt(0.5)
+
+    def _reconnect_attempt(self, delay):
+        """Loop thread: one managed connect attempt (deadline, cancel, accounting); backs off on failure."""
+        self._reconnect_handle = None
+        if not self._want_connected or self._connected:
+            self._reconnecting = False
+            return
+
+        def done(ok, exc):
+            if isinstance(exc, asyncio.CancelledError) or not self._reconnecting:
+                self._reconnecting = False  # disconnect() cancelled it
+                return
+            if exc is not None:
+                self._log(f"[BLE] reconnect error: {exc}")
+            if ok or not self._want_connected or self._connected:
+                self._reconnecting = False
+                return
+            self._thr.loop.call_soon_threadsafe(self._schedule_reconnect, delay)
+
+        self._thr.call(self._connect_async(*self._target, BLE_RECONNECT_SCAN_S), on_done=done,
+                       timeout=self._connect_deadline(BLE_RECONNECT_SCAN_S), name="reconnect", link=True)
+
+    def _schedule_reconnect(self, delay):
+        if self._reconnecting:
+            self._reconnect_handle = self._thr.loop.call_later(delay, self._reconnect_attempt,
+                                                               min(delay * 2, 30.0))
+
+    async def _read_frame_version(self, client):
+        if VEND_FRAME_MODE != "auto":
+            return 0
         try:
-            ic = getattr(self._client, "is_connected", None)
-            self._connected = await ic() if callable(ic) else bool(ic)
+            info = json.loads(bytes(await client.read_gatt_char(CHARACTERISTIC_TX_UUID)).decode("utf-8"))
+            return int(info.get("frame_v", 0))
         except Exception:
-            self._connected = True
+            return 0  # older firmware: JSON only
 
-        await self._client.get_services()
+    def _write_size(self):
+        """Largest single write: negotiated ATT MTU minus the 3-byte header."""
         try:
-            await self._client.start_notify(CHARACTERISTIC_TX_UUID, self._notify_cb)
+            char = self._client.services.get_characteristic(CHARACTERISTIC_RX_UUID)
+            n = int(char.max_write_without_response_size)
         except Exception:
-            pass
+            n = int(getattr(self._client, "mtu_size", 23) or 23) - 3
+        return max(vend_frame.MIN_WRITE_SIZE, n)
 
-        self._log("[BLE] connected.")
-        return True
+    def _use_binary(self):
+        if VEND_FRAME_MODE == "json":
+            return False
+        return VEND_FRAME_MODE == "binary" or self._frame_version >= vend_frame.FRAME_VERSION
 
     async def _write_json(self, obj):
         if not self._client or not self._connected:
@@ -203,21 +541,55 @@ class BleVendClient:
             return False
         try:
             raw = json.dumps(obj, separators=(",", ":"))
-            await self._client.write_gatt_char(CHARACTERISTIC_RX_UUID, raw.encode("utf-8"), response=True)
+            with metrics.timer("ble_write"):
+                await self._client.write_gatt_char(CHARACTERISTIC_RX_UUID, raw.encode("utf-8"), response=True)
             self._log(f"[BLE] → {raw}")
             return True
         except Exception as e:
+            metrics.inc("ble_write_error")
             self._log(f"[BLE] write error: {e}")
             return False
 
-    def _notify_cb(self, handle, data: bytearray):
+    async def _write_frame(self, frame: bytes):
+        if not self._client or not self._connected:
+            self._log("[BLE] not connected.")
+            return False
         try:
-            msg = data.decode("utf-8", errors="ignore")
-        except Exception:
-            msg = repr(data)
-        Clock.schedule_once(lambda dt: self._on_notify(msg))
+            chunks = vend_frame.chunk_frame(frame, self._write_size())
+            with metrics.timer("ble_write"):
+                for chunk in chunks:
+                    await self._client.write_gatt_char(CHARACTERISTIC_RX_UUID, chunk, response=True)
+            self._log(f"[BLE] → frame {len(frame)}B in {len(chunks)} write(s)")
+            return True
+        except Exception as e:
+            metrics.inc("ble_write_error")
+            self._log(f"[BLE] write error: {e}")
+            return False
+
+    def _notify_cb(self, handle, data: bytearray):
+        self._notify_buf.push(data)  # decoded on the UI thread, one batch per frame
+
+    def _deliver_notifications(self, raw_items):
+        msgs = [bytes(d).decode("utf-8", errors="ignore") for d in raw_items]
+        if self._on_notify_batch is not None:
+            self._on_notify_batch(msgs)
+            return
+        for msg in msgs:
+            self._on_notify(msg)
+
+    @property
+    def notify_dropped(self) -> int:
+        return self._notify_buf.dropped
 
     def send_vend(self, *, channel_id, amount_drops, slot=1, pulse_ms=600, device_id="dev-kiosk"):
+        if self._use_binary():
+            try:
+                frame = vend_frame.encode_vend(channel_id, amount_drops, slot=slot,
+                                               pulse_ms=pulse_ms, device_id=device_id)
+                return self._thr.call(self._write_frame(frame), timeout=BLE_WRITE_TIMEOUT_S,
+                                      on_done=self._vend_done, name="vend")
+            except ValueError as e:
+                self._log(f"[BLE] binary frame unavailable ({e}); sending JSON")
         payload = {
             "action": "vend",
             "slot": int(slot),
@@ -226,7 +598,22 @@ class BleVendClient:
             "claim_amount_drops": str(amount_drops),
             "device_id": str(device_id),
         }
-        return self._thr.call(self._write_json(payload))
+        return self._thr.call(self._write_json(payload), timeout=BLE_WRITE_TIMEOUT_S,
+                              on_done=self._vend_done, name="vend")
+
+    def _vend_done(self, ok, exc):
+        if isinstance(exc, asyncio.TimeoutError):
+            metrics.inc("ble_write_timeout")
+            self._log("[BLE] vend write timed out.")
+        elif isinstance(exc, JobRejected):
+            metrics.inc("ble_job_rejected")
+            self._log("[BLE] busy: vend not sent.")
+        elif exc is not None and not isinstance(exc, asyncio.CancelledError):
+            self._log(f"[BLE] vend error: {exc}")
+
+    @property
+    def jobs_in_flight(self) -> int:
+        return self._thr.jobs.in_flight
 
 # ==============================
 # Main Screen
@@ -272,6 +659,10 @@ class MainScreen(Screen):
         b_settle.bind(on_press=self.ui_settle_now)
         for b in (b_health, b_register, b_receipts, b_settle):
             admin_row2.add_widget(b)
+        if METRICS_PANEL:
+            b_metrics = Button(text="Metrics")
+            b_metrics.bind(on_press=self.ui_show_metrics)
+            admin_row2.add_widget(b_metrics)
         root.add_widget(admin_row2)
 
         # Claim JSON input
@@ -293,7 +684,7 @@ class MainScreen(Screen):
 
         # Optional BLE connect
         self.ble = BleVendClient(
-            on_notify=lambda msg: setattr(self.label, "text", f"ESP32: {msg}"),
+            on_notify_batch=self._on_esp32_notify,
             log_fn=lambda s: setattr(self.label, "text", s),
         )
         b_ble = Button(text="Connect BLE (optional)", size_hint=(1, 0.08))
@@ -304,32 +695,112 @@ class MainScreen(Screen):
 
         # locals
         self._last_claim: Optional[dict] = None
+        self._verdicts = VerdictCache(VERDICT_CACHE_SIZE, VERDICT_CACHE_TTL_S)
+        self._seen = SeenFilter(SEEN_FILTER_CAPACITY)
+
+        # Receipts are synced incrementally into the KV store
+        self._receipts = ReceiptsCache(_kv(), on_closed=lambda ch: _channel_keys().invalidate(ch))
+        self._receipts_syncing = False  # one receipts refresh in flight at a time
+
+        # One pooled keep-alive client for every API call
+        self._api = MerchantApiClient(self._api_base(), token=API_TOKEN or None,
+                                      email=API_EMAIL or None, password=API_PASSWORD,
+                                      on_call=self._observe_api_call)
+
+        # Claims for /claims/queue survive restarts and API outages (highest per channel)
+        self._api_target = self._api_base() if self.use_api else None
+        self._outbox = ClaimOutbox(_kv(), self._send_outbox_batch, batch_size=OUTBOX_BATCH_SIZE,
+                                   backoff_max_s=OUTBOX_BACKOFF_MAX_S, on_status=self._post_status)
+
+        # verify -> vend -> queue run on worker threads; UI updates come back via Clock
+        self._pipeline = ClaimPipeline(
+            [("verify", self._stage_verify), ("vend", self._stage_vend), ("queue", self._stage_queue)],
+            on_error=self._on_pipeline_error, maxsize=PIPELINE_MAX_PENDING,
+        )
+
+        # Keep channel keys warm so offline claims never need the network
+        Clock.schedule_once(lambda dt: self._warm_channel_keys(), 2)
+        Clock.schedule_interval(lambda dt: self._warm_channel_keys(), CHANNEL_KEY_WARM_INTERVAL_S)
+        Clock.schedule_once(lambda dt: self._sync_channel_snapshot(), 3)
+        Clock.schedule_interval(lambda dt: self._sync_channel_snapshot(), CHANNEL_SNAPSHOT_INTERVAL_S)
+        if METRICS_PATH:
+            Clock.schedule_interval(lambda dt: self._export_metrics(), METRICS_EXPORT_INTERVAL_S)
 
     # ----------- Admin helpers -----------
+    def _observe_api_call(self, endpoint: str, seconds: float, status: int):
+        metrics.observe(f"api_{endpoint}", seconds)
+        if not 200 <= status < 300:
+            metrics.inc(f"api_{endpoint}_error")
+
+    def _export_metrics(self):
+        metrics.set_gauge("ble_notify_dropped", self.ble.notify_dropped)
+        try:
+            metrics.REGISTRY.write(METRICS_PATH)
+        except Exception as e:
+            print("Metrics export error:", e)
+
+    def ui_show_metrics(self, *_):
+        metrics.set_gauge("ble_notify_dropped", self.ble.notify_dropped)
+        lines = metrics.REGISTRY.summary_lines() or ["No samples yet."]
+        body = Label(text="\n".join(lines), font_size="12sp", halign="left", valign="top")
+        body.bind(size=lambda w, *_: setattr(w, "text_size", w.size))
+        Popup(title="Hot-path metrics", content=body, size_hint=(0.95, 0.9)).open()
+        if METRICS_PATH:
+            self._export_metrics()
+
+    def _on_esp32_notify(self, msgs):
+        # only the newest status is visible anyway; one label update per frame
+        extra = f" (+{len(msgs) - 1})" if len(msgs) > 1 else ""
+        self.label.text = f"ESP32: {msgs[-1]}{extra}"
+
     def _api_base(self) -> str:
-        raw = (self.api_url_input.text or "").strip()
-        if not raw:
-            return ""
-        if raw.startswith("//"):
-            raw = "http:" + raw
-        if not raw.startswith("http://") and not raw.startswith("https://"):
-            raw = "http://" + raw
-        return raw.rstrip("/")
+        return normalize_base_url(self.api_url_input.text)
 
     def _toggle_api(self):
         self.use_api = not self.use_api
+        self._refresh_api_target()
         self.btn_api_toggle.text = "API: ON" if self.use_api else "API: OFF"
         self.label.text = f"API {'enabled' if self.use_api else 'disabled'}."
 
+    def _refresh_api_target(self):
+        # Worker threads read this instead of touching Kivy widgets
+        prev = self._api_target
+        self._api_target = self._api_base() if self.use_api else None
+        if self._api_target:
+            self._api.base_url = self._api_target
+            if self._api_target != prev:
+                self._outbox.kick()  # re-enabled or moved: retry held claims now
+
+    def _send_outbox_batch(self, payloads: list) -> list:
+        if not self._api_target:
+            return None  # API off: hold claims until it is re-enabled
+        return upload_claim_batch(self._api, payloads)
+
+    def _api_call(self, busy_text: str, call):
+        """Run call() -> status text on a worker thread; the label is updated via Clock."""
+        self.label.text = busy_text
+        threading.Thread(target=lambda: self._post_status(call()), daemon=True).start()
+
     def ui_admin_health(self, *_):
         if not self.use_api:
             self.label.text = "API disabled."
             return
+        self._refresh_api_target()
+        self._api_call("Checking health…", self._check_health)
+
+    def _check_health(self) -> str:
         try:
-            r = requests.get(f"{self._api_base()}/health", timeout=4)
-            self.label.text = (r.text[:200] + "…") if len(r.text) > 200 else r.text
+            data = self._api.health()
+            text = json.dumps(data) if isinstance(data, dict) else str(data)
+            merchant = (data or {}).get("merchant_address") if isinstance(data, dict) else None
+            if merchant and merchant != kv_get("merchant_address"):
+                kv_set("merchant_address", merchant)
+                self._sync_channel_snapshot()
+            return (text[:200] + "…") if len(text) > 200 else text
+        except MerchantApiError as e:
+            return f"Health failed: HTTP {e.status}"
         except Exception as e:
-            self.label.text = f"Health error: {e}"
+            return f"Health error: {e}"
 
     def ui_admin_register_device(self, *_):
         if not self.use_api:
@@ -341,49 +812,71 @@ class MainScreen(Screen):
         except Exception:
             self.label.text = "Invalid exposure cap."
             return
-        try:
-            r = requests.post(f"{self._api_base()}/devices/register",
-                              json={"device_id": device_id, "exposure_cap_drops": cap},
-                              timeout=5)
-            self.label.text = "Registered." if r.ok else f"Register failed: {r.status_code}"
-        except Exception as e:
-            self.label.text = f"Register error: {e}"
+        self._refresh_api_target()
+
+        def register() -> str:
+            try:
+                self._api.register_device(device_id, cap)
+                return "Registered."
+            except MerchantApiError as e:
+                return f"Register failed: {e.status}"
+            except Exception as e:
+                return f"Register error: {e}"
+        self._api_call("Registering…", register)
 
     def ui_view_receipts(self, *_):
         if not self.use_api:
             self.label.text = "API disabled."
             return
+        self._refresh_api_target()
+        if self._receipts_syncing:
+            return
+        self._receipts_syncing = True
+        self._api_call("Loading receipts…", self._sync_receipts)
+
+    def _sync_receipts(self) -> str:
+        note = ""
         try:
-            r = requests.get(f"{self._api_base()}/receipts", timeout=6)
-            if not r.ok:
-                self.label.text = f"Receipts failed: HTTP {r.status_code}"
-                return
-            items = r.json() or []
-            if not items:
-                self.label.text = "No receipts."
-                return
-            last = items[-1]
-            ch  = last.get("channel_id","?")[-12:]
-            amt = int(last.get("amount_drops",0))/1_000_000
-            tx  = last.get("tx_hash","?")[:12]
-            when= last.get("settledAt","")
-            self.label.text = f"Last receipt: {amt:.6f} XRP\nch…{ch}\ntx…{tx}\n@{when}"
+            self._receipts.sync(self._api)  # only receipts newer than the local cursor
+        except MerchantApiError as e:
+            note = f"\n(cached; HTTP {e.status})"
         except Exception as e:
-            self.label.text = f"Receipts error: {e}"
+            note = f"\n(cached; {type(e).__name__})"
+        finally:
+            self._receipts_syncing = False
+        return self._receipts_text(note)
+
+    def _receipts_text(self, note: str) -> str:
+        last = self._receipts.last()
+        if not last:
+            return "No receipts." + note
+        ch_full = str(last.get("channel_id","?"))
+        ch  = ch_full[-12:]
+        amt = int(last.get("amount_drops",0))/1_000_000
+        tx  = str(last.get("tx_hash","?"))[:12]
+        when= last.get("settledAt","")
+        per = self._receipts.channel(ch_full) or {}
+        tot = int(per.get("settled_drops", 0))/1_000_000
+        return (f"Last receipt: {amt:.6f} XRP\nch…{ch} (settled {tot:.6f} XRP, "
+                f"{per.get('count', 0)} receipts)\ntx…{tx}\n@{when}{note}")
 
     def ui_settle_now(self, *_):
         if not self.use_api:
             self.label.text = "API disabled."
             return
+        self._refresh_api_target()
+        self._api_call("Settling…", self._settle)
+
+    def _settle(self) -> str:
         try:
-            r = requests.post(f"{self._api_base()}/claims/settle", json={}, timeout=10)
-            data = r.json() if r.headers.get("content-type","").startswith("application/json") else {}
-            if r.ok and data.get("ok"):
-                self.label.text = f"Settled. tx: {data.get('tx_hash','?')}"
-            else:
-                self.label.text = f"Settle failed: {r.status_code} {data}"
+            data = self._api.settle()
+            if isinstance(data, dict) and data.get("ok"):
+                return f"Settled. tx: {data.get('tx_hash','?')}"
+            return f"Settle failed: 200 {data}"
+        except MerchantApiError as e:
+            return f"Settle failed: {e.status} {e.body}"
         except Exception as e:
-            self.label.text = f"Settle error: {e}"
+            return f"Settle error: {e}"
 
     # ----------- Claim JSON flow -----------
     def load_claim_from_json(self, *_):
@@ -403,6 +896,22 @@ class MainScreen(Screen):
         except Exception as e:
             self.label.text = f"Bad JSON: {e}"
 
+    def _warm_channel_keys(self):
+        # Background fetches; failures (offline) just leave entries as they are
+        try:
+            known = [k.split(":", 1)[1] for k in _kv().keys("last_seen:")]
+            _channel_keys().warm(known)
+        except Exception as e:
+            print("Channel key warm error:", e)
+
+    def _sync_channel_snapshot(self):
+        def run():
+            try:
+                _channel_snapshot().sync()
+            except Exception as e:
+                print("Channel snapshot sync error:", e)
+        threading.Thread(target=run, daemon=True).start()
+
     def _device_may_dispense(self, channel_id: str, amount_drops: int):
         last = int(kv_get(f"last_seen:{channel_id}", 0) or 0)
         settled = int(kv_get(f"settled:{channel_id}", 0) or 0)
@@ -417,14 +926,29 @@ class MainScreen(Screen):
         amt = str(claim.get("amount_drops","")).strip()
         sig = str(claim.get("signature","")).strip()
         pk  = str(claim.get("pubkey","")).strip()
-        if pk:
-            return verify_claim(ch, amt, sig, pk)
-        # Try to fetch channel.pubkey if not present
-        onchain_pk = fetch_channel_pubkey(ch)
-        if not onchain_pk:
+        if not pk:
+            # Channel's on-ledger key: persistent cache first, ledger if unknown
+            pk = lookup_channel_pubkey(ch)
+            if not pk:
+                return False  # not a verdict: do not cache
+            claim["pubkey"] = pk
+        # Verdicts are per key used: the same signature under another pubkey is rechecked
+        key = VerdictCache.key(ch, amt, sig, pk)
+        cached = self._verdicts.get(key)
+        if cached is not None:
+            return cached
+        ok = verify_claim(ch, amt, sig, pk)
+        self._verdicts.put(key, ok)
+        return ok
+
+    def _is_retransmit(self, channel_id: str, amount_drops: int, signature: str) -> bool:
+        """O(1) duplicate check before any crypto.
+
+        The filter may give false positives, so a hit only declines claims that
+        could not be dispensed anyway (amount not above last_seen)."""
+        if not self._seen.might_contain(signature):
             return False
-        claim["pubkey"] = onchain_pk
-        return verify_claim(ch, amt, sig, onchain_pk)
+        return amount_drops <= int(kv_get(f"last_seen:{channel_id}", 0) or 0)
 
     def ui_verify_and_queue(self, *_):
         claim = self._last_claim
@@ -449,45 +973,90 @@ class MainScreen(Screen):
             self.label.text = "amount_drops must be positive integer string."
             return
 
+        # Hand off to the worker pipeline; the button returns immediately
+        job = {
+            "claim": dict(claim), "channel_id": ch, "amount_drops": amt_i, "signature": sig,
+            "device_id": (self.device_id_input.text or "dev-kiosk").strip(),
+            "use_api": self.use_api, "api_base": self._api_base(), "t0": time.perf_counter(),
+        }
+        self._refresh_api_target()
+        if not self._pipeline.submit(job):
+            metrics.inc("claims_busy")
+            self.label.text = "Busy: too many claims in flight."
+            return
+        self.label.text = "Verifying…"
+
+    # ----------- Pipeline stages (worker threads) -----------
+    def _post_status(self, text: str):
+        Clock.schedule_once(lambda dt: setattr(self.label, "text", text))
+
+    def _on_pipeline_error(self, stage: str, job: dict, exc: Exception):
+        metrics.inc("claims_error")
+        self._post_status(f"{stage.capitalize()} error: {type(exc).__name__}")
+
+    def _stage_verify(self, job: dict):
+        ch, amt_i, sig, claim = job["channel_id"], job["amount_drops"], job["signature"], job["claim"]
+
+        # On-ledger capacity/expiry from the local snapshot; over capacity re-reads the channel once
+        ok, reason = _channel_snapshot().precheck(ch, amt_i, expiry_margin_s=CHANNEL_EXPIRY_MARGIN_S,
+                                                  refresh=True)
+        if not ok:
+            metrics.inc("claims_declined")
+            self._post_status(f"Declined: {reason}")
+            return None
+
+        # Retransmitted claim (phone retry / flaky BLE): reject before crypto
+        if self._is_retransmit(ch, amt_i, sig):
+            metrics.inc("claims_declined")
+            self._post_status("Declined: duplicate_claim")
+            return None
+
         # Local signature verification (no server dependency)
         try:
             if not self._local_sig_check(claim):
-                self.label.text = "Verify failed (signature/amount/pubkey)."
-                return
+                metrics.inc("claims_declined")
+                self._post_status("Verify failed (signature/amount/pubkey).")
+                return None
         except Exception as e:
-            self.label.text = f"Verify error: {type(e).__name__}"
-            return
+            metrics.inc("claims_error")
+            self._post_status(f"Verify error: {type(e).__name__}")
+            return None
 
-        # Device-side exposure/monotonic
+        # Device-side exposure/monotonic (single verify thread: check+set is not racy)
         ok, reason = self._device_may_dispense(ch, amt_i)
         if not ok:
-            self.label.text = f"Declined: {reason}"
-            return
+            metrics.inc("claims_declined")
+            self._post_status(f"Declined: {reason}")
+            return None
 
-        # Persist last_seen, update UI
-        kv_set(f"last_seen:{ch}", amt_i)
-        base_msg = "Approved (Offline). Product may dispense."
-        self.label.text = base_msg
+        # Persist last_seen before vending; without it the claim could be replayed after a restart
+        if not kv_set(f"last_seen:{ch}", amt_i):
+            metrics.inc("claims_error")
+            self._post_status("Declined: state_not_saved")
+            return None
+        self._seen.add(sig)
+        metrics.inc("claims_approved")
+        self._post_status(APPROVED_MSG)
+        return job
 
+    def _stage_vend(self, job: dict):
         # Kick BLE vend (optional)
         try:
             if self.ble:
-                self.ble.send_vend(channel_id=ch, amount_drops=str(amt_i), slot=1, pulse_ms=600,
-                                   device_id=(self.device_id_input.text or "dev-kiosk").strip())
+                self.ble.send_vend(channel_id=job["channel_id"], amount_drops=str(job["amount_drops"]),
+                                   slot=1, pulse_ms=600, device_id=job["device_id"])
         except Exception:
             pass
+        metrics.observe("tap_to_vend", time.perf_counter() - job["t0"])  # button -> vend handed to BLE
+        return job
 
-        # Queue to API (optional)
-        if self.use_api and self._api_base():
-            try:
-                payload = dict(claim)
-                payload["device_id"] = (self.device_id_input.text or "dev-kiosk").strip()
-                r = requests.post(f"{self._api_base()}/claims/queue", json=payload, timeout=6)
-                if r.ok and (r.json().get("accepted") is True):
-                    self.label.text = base_msg + "\nQueued for settlement."
-                else:
-                    self.label.text = base_msg + "\nQueue failed."
-            except Exception:
-                self.label.text = base_msg + "\nAPI offline (skipped)."
+    def _stage_queue(self, job: dict):
+        # Durable outbox: uploaded in the background, retried with backoff
+        payload = dict(job["claim"])
+        payload["device_id"] = job["device_id"]
+        self._outbox.put(payload)
+        if job["use_api"] and job["api_base"]:
+            self._post_status(APPROVED_MSG + "\nSaved in outbox; uploading in background.")
         else:
-            self.label.text = base_msg + "\n(API off)"
+            self._post_status(APPROVED_MSG + "\n(API off: held in outbox)")
+        return None
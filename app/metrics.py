@@ -0,0 +1,158 @@
+"""
+In-process latency histograms and counters for the kiosk hot path.
+
+Recording is a lock, a bisect and two additions, so it can wrap per-claim
+calls. The registry can be dumped as a JSON snapshot or in the Prometheus
+text exposition format (for node_exporter's textfile collector); write()
+picks the format from the file extension (.prom -> text, else JSON).
+"""
+from __future__ import annotations
+
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# seconds; fine at the bottom for in-memory lookups, coarse at the top for network/BLE
+DEFAULT_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, v: float):
+        self.counts[bisect.bisect_left(self.buckets, v)] += 1
+        self.count += 1
+        self.sum += v
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (Prometheus-style estimate)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                return self.buckets[i] if i < len(self.buckets) else float("inf")
+        return float("inf")
+
+
+class Registry:
+    def __init__(self, prefix: str = "kiosk"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._hist = {}
+        self._counters = {}
+        self._gauges = {}
+
+    def inc(self, name: str, n: int = 1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def set_gauge(self, name: str, value: float):
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            h = self._hist.get(name)
+            if h is None:
+                h = self._hist[name] = Histogram()
+            h.observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - t0)
+
+    def timed(self, name: str):
+        """Decorator form of timer()."""
+        def deco(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                t0 = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.observe(name, time.perf_counter() - t0)
+            return wrapper
+        return deco
+
+    def reset(self):
+        with self._lock:
+            self._hist.clear()
+            self._counters.clear()
+            self._gauges.clear()
+
+    # ----------- export -----------
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "ts": time.time(),
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "latency": {
+                    name: {"count": h.count, "sum_s": h.sum,
+                           "p50_s": h.quantile(0.5), "p95_s": h.quantile(0.95), "p99_s": h.quantile(0.99),
+                           "buckets": {str(b): c for b, c in zip(h.buckets + ("+Inf",), h.counts)}}
+                    for name, h in self._hist.items()
+                },
+            }
+
+    def prometheus_text(self) -> str:
+        lines = []
+        with self._lock:
+            for name in sorted(self._counters):
+                metric = f"{self.prefix}_{name}_total"
+                lines += [f"# TYPE {metric} counter", f"{metric} {self._counters[name]}"]
+            for name in sorted(self._gauges):
+                metric = f"{self.prefix}_{name}"
+                lines += [f"# TYPE {metric} gauge", f"{metric} {self._gauges[name]}"]
+            for name in sorted(self._hist):
+                h = self._hist[name]
+                metric = f"{self.prefix}_{name}_seconds"
+                lines.append(f"# TYPE {metric} histogram")
+                cum = 0
+                for b, c in zip(h.buckets, h.counts):
+                    cum += c
+                    lines.append(f'{metric}_bucket{{le="{b}"}} {cum}')
+                lines.append(f'{metric}_bucket{{le="+Inf"}} {h.count}')
+                lines.append(f"{metric}_sum {h.sum:.9f}")
+                lines.append(f"{metric}_count {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str):
+        """Atomically write a .prom text file or a JSON snapshot."""
+        body = self.prometheus_text() if path.endswith(".prom") else json.dumps(self.snapshot(), indent=2)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(body)
+        os.replace(tmp, path)
+
+    def summary_lines(self) -> list:
+        """Short human-readable lines for the admin panel."""
+        snap = self.snapshot()
+        out = [f"{k}: {v}" for k, v in sorted({**snap["counters"], **snap["gauges"]}.items())]
+        for name, h in sorted(snap["latency"].items()):
+            out.append(f"{name}: n={h['count']} p50={h['p50_s'] * 1000:.2f}ms p95={h['p95_s'] * 1000:.2f}ms")
+        return out
+
+
+REGISTRY = Registry()
+inc = REGISTRY.inc
+set_gauge = REGISTRY.set_gauge
+observe = REGISTRY.observe
+timer = REGISTRY.timer
+timed = REGISTRY.timed
@@ -0,0 +1,45 @@
+"""
+Bounded buffer between BLE notifications (asyncio thread) and the Kivy UI.
+
+push() only appends raw bytes; the first push after a flush schedules one
+flush on the UI thread, which hands everything collected so far to the
+consumer in one call. A burst of N notifications therefore costs one
+scheduled callback, not N. When the buffer is full the oldest entry is
+overwritten and counted in `dropped`.
+"""
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import Callable
+
+
+class NotifyBuffer:
+    def __init__(self, deliver: Callable[[list], None], schedule: Callable[[Callable], None],
+                 capacity: int = 64):
+        self._deliver = deliver    # deliver([bytes, ...]) on the UI thread
+        self._schedule = schedule  # e.g. lambda fn: Clock.schedule_once(fn)
+        self._buf = deque(maxlen=max(1, int(capacity)))
+        self._lock = threading.Lock()
+        self._scheduled = False
+        self.dropped = 0
+        self.delivered = 0
+
+    def push(self, data) -> None:
+        with self._lock:
+            if len(self._buf) == self._buf.maxlen:
+                self.dropped += 1
+            self._buf.append(bytes(data))
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self._schedule(self._flush)
+
+    def _flush(self, *_):
+        with self._lock:
+            items = list(self._buf)
+            self._buf.clear()
+            self._scheduled = False
+        if items:
+            self.delivered += len(items)
+            self._deliver(items)
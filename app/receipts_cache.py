@@ -0,0 +1,76 @@
+"""
+Local receipts cache synced incrementally from the merchant API.
+
+The API's receipts list is append-only, so the kiosk keeps a cursor (count of
+receipts already applied) and asks only for newer ones. Per channel it keeps
+the highest settled amount, receipt count and last tx; it also raises the
+"settled:<CHANNEL>" value that the exposure-cap check reads. A receipt
+flagged "closed" (the settlement closed the channel) is passed to on_closed,
+e.g. to drop the channel's cached PublicKey.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Callable, Optional
+
+CURSOR_KEY = "receipts:cursor"
+LAST_KEY = "receipts:last"
+CHANNEL_PREFIX = "receipt:"
+
+
+class ReceiptsCache:
+    def __init__(self, store, on_closed: Optional[Callable[[str], None]] = None):
+        self._store = store
+        self._on_closed = on_closed
+        self._lock = threading.Lock()
+
+    @property
+    def cursor(self) -> int:
+        return int(self._store.get(CURSOR_KEY, 0) or 0)
+
+    def last(self) -> Optional[dict]:
+        return self._store.get(LAST_KEY)
+
+    def channel(self, channel_id: str) -> Optional[dict]:
+        return self._store.get(CHANNEL_PREFIX + str(channel_id).strip().upper())
+
+    def sync(self, api) -> int:
+        """Fetch receipts newer than the cursor; returns how many were applied."""
+        with self._lock:
+            cursor = self.cursor
+            items, nxt, incremental = api.receipts_since(cursor)
+            if not incremental or nxt < cursor:
+                # Old API (full list every time) or server history reset: rebuild
+                self._reset()
+                if incremental and cursor:
+                    items, nxt, _ = api.receipts_since(0)
+            for rec in items:
+                self._apply(rec)
+            self._store.set(CURSOR_KEY, int(nxt))
+            return len(items)
+
+    def _reset(self):
+        for key in self._store.keys(CHANNEL_PREFIX):
+            self._store.set(key, None, wait=False)
+        self._store.set(LAST_KEY, None, wait=False)
+
+    def _apply(self, rec: dict):
+        raw_ch = str(rec.get("channel_id", "")).strip()
+        if not raw_ch:
+            return
+        amt = int(rec.get("amount_drops", 0) or 0)
+        key = CHANNEL_PREFIX + raw_ch.upper()
+        cur = self._store.get(key) or {"settled_drops": 0, "count": 0}
+        cur = {
+            "settled_drops": max(int(cur.get("settled_drops", 0)), amt),  # claims are cumulative
+            "count": int(cur.get("count", 0)) + 1,
+            "last_tx": rec.get("tx_hash"),
+            "last_at": rec.get("settledAt"),
+        }
+        self._store.set(key, cur, wait=False)
+        self._store.set(LAST_KEY, dict(rec), wait=False)
+        # same key format as the kiosk's last_seen/settled entries (channel id as sent)
+        if amt > int(self._store.get(f"settled:{raw_ch}", 0) or 0):
+            self._store.set(f"settled:{raw_ch}", amt, wait=False)
+        if rec.get("closed") and self._on_closed is not None:
+            self._on_closed(raw_ch.upper())
@@ -0,0 +1,136 @@
+"""
+Binary vend command frame for the kiosk -> ESP32 BLE link.
+
+A v1 frame is a fixed 64-byte big-endian record (the firmware decodes it with
+byte offsets, no JSON parser):
+
+    off size field
+      0    1 magic (0xA5)
+      1    1 version (1)
+      2    1 action (1 = vend, 2 = status)
+      3    1 slot
+      4    2 pulse_ms
+      6    8 amount_drops
+     14   32 channel id (raw bytes)
+     46   16 device_id (ASCII, NUL padded)
+     62    2 CRC-16/CCITT-FALSE over bytes 0..61
+
+Frames longer than one ATT write are split into chunks; every chunk starts
+with a header byte 0x80 | LAST(0x40) | seq (0..63). The high bit can never
+start a JSON ("{") or legacy text command, so the firmware routes on it.
+"""
+from __future__ import annotations
+
+import struct
+from typing import Optional
+
+FRAME_MAGIC = 0xA5
+FRAME_VERSION = 1
+ACTION_VEND = 1
+ACTION_STATUS = 2
+DEVICE_ID_LEN = 16
+
+_BODY = struct.Struct(">BBBBHQ32s16s")
+FRAME_LEN = _BODY.size + 2  # 64
+
+CHUNK_FLAG = 0x80
+CHUNK_LAST = 0x40
+CHUNK_SEQ_MASK = 0x3F
+MIN_WRITE_SIZE = 20  # default ATT MTU (23) minus the 3-byte write header
+
+
+def crc16_ccitt(data: bytes, crc: int = 0xFFFF) -> int:
+    for b in data:
+        crc ^= b << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
+            crc &= 0xFFFF
+    return crc
+
+
+def encode_vend(channel_id: str, amount_drops, slot: int = 1, pulse_ms: int = 600,
+                device_id: str = "") -> bytes:
+    """Build a v1 vend frame; raises ValueError if a field does not fit."""
+    ch = bytes.fromhex(str(channel_id).strip())
+    if len(ch) != 32:
+        raise ValueError("channel_id must be 32 bytes hex")
+    amt = int(str(amount_drops).strip())
+    if not (0 <= amt <= 0xFFFFFFFFFFFFFFFF):
+        raise ValueError("amount_drops out of range")
+    if not (0 <= int(slot) <= 0xFF) or not (0 <= int(pulse_ms) <= 0xFFFF):
+        raise ValueError("slot/pulse_ms out of range")
+    dev = str(device_id).encode("ascii")
+    if len(dev) > DEVICE_ID_LEN:
+        raise ValueError(f"device_id longer than {DEVICE_ID_LEN} bytes")
+    return _seal(ACTION_VEND, int(slot), int(pulse_ms), amt, ch, dev)
+
+
+def encode_status() -> bytes:
+    return _seal(ACTION_STATUS, 0, 0, 0, bytes(32), b"")
+
+
+def _seal(action, slot, pulse_ms, amount, channel, device) -> bytes:
+    body = _BODY.pack(FRAME_MAGIC, FRAME_VERSION, action, slot, pulse_ms, amount, channel, device)
+    return body + struct.pack(">H", crc16_ccitt(body))
+
+
+def decode_frame(frame: bytes) -> dict:
+    """Parse and check a frame (what the firmware does); raises ValueError."""
+    frame = bytes(frame)
+    if len(frame) != FRAME_LEN:
+        raise ValueError(f"frame must be {FRAME_LEN} bytes, got {len(frame)}")
+    body, (crc,) = frame[:-2], struct.unpack(">H", frame[-2:])
+    if crc16_ccitt(body) != crc:
+        raise ValueError("frame checksum mismatch")
+    magic, version, action, slot, pulse_ms, amount, ch, dev = _BODY.unpack(body)
+    if magic != FRAME_MAGIC or version != FRAME_VERSION:
+        raise ValueError(f"unsupported frame {magic:#x} v{version}")
+    return {
+        "action": {ACTION_VEND: "vend", ACTION_STATUS: "status"}.get(action, action),
+        "slot": slot,
+        "pulse_ms": pulse_ms,
+        "claim_channel": ch.hex().upper(),
+        "claim_amount_drops": str(amount),
+        "device_id": dev.rstrip(b"\x00").decode("ascii"),
+    }
+
+
+def chunk_frame(frame: bytes, write_size: int = MIN_WRITE_SIZE) -> list:
+    """Split frame into writes of at most write_size bytes (header included)."""
+    step = max(MIN_WRITE_SIZE, int(write_size)) - 1
+    parts = [frame[i:i + step] for i in range(0, len(frame), step)] or [b""]
+    if len(parts) > CHUNK_SEQ_MASK + 1:
+        raise ValueError("frame needs too many chunks")
+    last = len(parts) - 1
+    return [bytes([CHUNK_FLAG | (CHUNK_LAST if i == last else 0) | i]) + p for i, p in enumerate(parts)]
+
+
+class FrameAssembler:
+    """Receiver-side reassembly (mirrors the firmware; used by tests/tools)."""
+
+    def __init__(self, max_len: int = FRAME_LEN):
+        self.max_len = max_len
+        self._buf = bytearray()
+        self._next = 0
+
+    def feed(self, chunk: bytes) -> Optional[bytes]:
+        """Returns the full frame on its last chunk, else None; raises ValueError."""
+        if not chunk or not chunk[0] & CHUNK_FLAG:
+            raise ValueError("not a frame chunk")
+        hdr = chunk[0]
+        seq = hdr & CHUNK_SEQ_MASK
+        if seq == 0:
+            self._buf.clear()
+            self._next = 0
+        if seq != self._next or len(self._buf) + len(chunk) - 1 > self.max_len:
+            self._buf.clear()
+            self._next = 0
+            raise ValueError("chunk out of sequence")
+        self._buf += chunk[1:]
+        self._next += 1
+        if hdr & CHUNK_LAST:
+            out = bytes(self._buf)
+            self._buf.clear()
+            self._next = 0
+            return out
+        return None
@@ -0,0 +1,83 @@
+"""
+Claim signature checks that can run in worker processes.
+
+This module imports neither Kivy nor xrpl-py at load time, so a spawned pool
+worker only pays for `cryptography`. verify_batch() always uses the "spawn"
+start method: forking the kiosk process would copy Kivy's window/GL state and
+BLE threads into the children. main_screen_clean uses the same native path.
+"""
+from __future__ import annotations
+
+import functools
+import hashlib
+import os
+from binascii import unhexlify
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
+from cryptography.hazmat.primitives.asymmetric.utils import Prehashed
+
+from claim_codec import encode_for_signing_claim
+
+# Parsed public keys are cached: the same buyer key signs many claims.
+PUBKEY_CACHE_SIZE = int(os.environ.get("PUBKEY_CACHE_SIZE", "1024"))
+
+
+@functools.lru_cache(maxsize=PUBKEY_CACHE_SIZE)
+def parse_pubkey(pub_hex: str):
+    """XRPL pubkey hex (ED-prefixed ed25519 or compressed secp256k1) -> key object."""
+    pub = unhexlify(pub_hex)
+    if len(pub) == 33 and pub[0] == 0xED:  # XRPL ed25519 prefix
+        return Ed25519PublicKey.from_public_bytes(pub[1:])
+    if len(pub) == 32:
+        return Ed25519PublicKey.from_public_bytes(pub)
+    return ec.EllipticCurvePublicKey.from_encoded_point(ec.SECP256K1(), pub)
+
+
+def native_verify(msg: bytes, sig_hex: str, pub_hex: str) -> bool:
+    """Raises on keys/signatures it cannot parse; False on a bad signature."""
+    key = parse_pubkey(str(pub_hex).strip().upper())
+    sig = unhexlify(str(sig_hex).strip())
+    try:
+        if isinstance(key, Ed25519PublicKey):
+            key.verify(sig, msg)
+        else:
+            # XRPL secp256k1 signs SHA-512Half(msg) with a DER signature
+            digest = hashlib.sha512(msg).digest()[:32]
+            key.verify(sig, digest, ec.ECDSA(Prehashed(hashes.SHA256())))
+        return True
+    except InvalidSignature:
+        return False
+
+
+def _xrpl_verify(msg: bytes, sig_hex: str, pub_hex: str) -> bool:
+    from xrpl.core.keypairs import is_valid_message  # only for keys cryptography rejects
+    return bool(is_valid_message(msg, bytes.fromhex(sig_hex), pub_hex))
+
+
+def verify_item(item) -> bool:
+    """Pool worker: verify one claim dict; never raises."""
+    try:
+        ch  = str(item.get("channel_id","")).strip()
+        amt = str(item.get("amount_drops","")).strip()
+        sig = str(item.get("signature","")).strip()
+        pk  = str(item.get("pubkey","")).strip()
+        if not (ch and amt and sig and pk):
+            return False
+        msg = encode_for_signing_claim(ch, amt)
+        try:
+            return native_verify(msg, sig, pk)
+        except Exception:
+            return _xrpl_verify(msg, sig, pk.upper())
+    except Exception:
+        return False
+
+
+def verify_batch(items: list, workers: int, chunksize: int) -> list:
+    """verify_item over items in `workers` spawned processes, results in order."""
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+        return list(pool.map(verify_item, items, chunksize=chunksize))
@@ -0,0 +1,220 @@
+"""
+Length-prefixed claim transport over a Bluetooth RFCOMM stream.
+
+Frame: 4-byte big-endian payload length, then compact UTF-8 JSON. Every
+message the app sends carries a "seq"; the receiver answers each one with
+a frame {"ack": seq, "ok": true|false, "reason": "..."}. Up to `window`
+claims can be in flight before the app waits for their acks, so a batch
+costs one round trip per window instead of one per claim.
+
+Stream objects are taken once per connection (AndroidStreamIO). Desktop
+mode uses LoopbackIO, a socketpair with an in-process receiver, so the
+protocol can be exercised and benchmarked without hardware.
+"""
+
+import json
+import socket
+import struct
+import threading
+import time
+
+HEADER = struct.Struct('>I')
+MAX_FRAME = 4096
+ACK_TIMEOUT_S = 5.0
+
+# Outcome of one claim: the receiver accepted it, refused it, or never answered
+ACKED, NACKED, NO_ACK = 'acked', 'nacked', 'no_ack'
+
+
+class TransportError(IOError):
+    pass
+
+
+class PartialSendError(TransportError):
+    """The stream failed mid-batch. `results` has (ok, reason) for the claims
+    answered before the failure and None for those left without an ack."""
+    def __init__(self, message, results):
+        super().__init__(message)
+        self.results = results
+
+
+def encode_frame(msg):
+    payload = json.dumps(msg, separators=(',', ':')).encode('utf-8')
+    if len(payload) > MAX_FRAME:
+        raise ValueError(f'frame too large: {len(payload)} > {MAX_FRAME}')
+    return HEADER.pack(len(payload)) + payload
+
+
+def read_frame(io, timeout=None):
+    """Read one frame from io.read_exact(n, timeout) and decode its JSON"""
+    (length,) = HEADER.unpack(io.read_exact(HEADER.size, timeout))
+    if length > MAX_FRAME:
+        raise TransportError(f'frame length {length} exceeds {MAX_FRAME}')
+    return json.loads(io.read_exact(length, timeout).decode('utf-8'))
+
+
+class AndroidStreamIO:
+    """RFCOMM socket streams, fetched once per connection"""
+    POLL_S = 0.005
+
+    def __init__(self, bt_socket):
+        self.socket = bt_socket
+        self.output = bt_socket.getOutputStream()
+        self.input = bt_socket.getInputStream()
+
+    def write(self, data):
+        self.output.write(data)
+        self.output.flush()
+
+    def read_exact(self, n, timeout=None):
+        # InputStream.read() blocks with no timeout; wait on available() instead
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.input.available() < n:
+            if deadline is not None and time.monotonic() > deadline:
+                raise TransportError('timed out waiting for ack')
+            time.sleep(self.POLL_S)
+        # read(byte[], off, len) fills the buffer in one JNI call; pyjnius copies
+        # the Java array back into the bytearray when the call returns
+        buf = bytearray(n)
+        got = 0
+        while got < n:
+            count = self.input.read(buf, got, n - got)
+            if count < 0:
+                raise TransportError('stream closed')
+            got += count
+        return bytes(buf)
+
+    def close(self):
+        self.socket.close()
+
+
+class SocketIO:
+    """Python socket end of a stream (loopback, tests, desktop receivers)"""
+    def __init__(self, sock):
+        self.sock = sock
+
+    def write(self, data):
+        self.sock.sendall(data)
+
+    def read_exact(self, n, timeout=None):
+        self.sock.settimeout(timeout)
+        data = bytearray()
+        try:
+            while len(data) < n:
+                chunk = self.sock.recv(n - len(data))
+                if not chunk:
+                    raise TransportError('stream closed')
+                data += chunk
+        except socket.timeout:
+            raise TransportError('timed out waiting for ack')
+        return bytes(data)
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class LoopbackIO(SocketIO):
+    """Desktop stand-in for the vending machine: acks every claim frame it can parse
+
+    `handler(msg) -> (ok, reason)` decides the ack; the default accepts claims
+    that carry the four signed fields. Received messages are kept in `received`.
+    """
+    CLAIM_FIELDS = ('channel_id', 'amount_drops', 'signature', 'pubkey')
+
+    def __init__(self, handler=None):
+        app_end, self._peer = socket.socketpair()
+        super().__init__(app_end)
+        self.handler = handler or self._default_handler
+        self.received = []
+        self._thread = threading.Thread(target=self._serve, name='bt-loopback', daemon=True)
+        self._thread.start()
+
+    def _default_handler(self, msg):
+        claim = msg.get('claim') or {}
+        missing = [k for k in self.CLAIM_FIELDS if not claim.get(k)]
+        return (not missing, f'missing {",".join(missing)}' if missing else 'ok')
+
+    def _serve(self):
+        peer = SocketIO(self._peer)
+        try:
+            while True:
+                msg = read_frame(peer)
+                self.received.append(msg)
+                ok, reason = self.handler(msg)
+                peer.write(encode_frame({'ack': msg.get('seq'), 'ok': ok, 'reason': reason}))
+        except (TransportError, OSError, ValueError):
+            pass
+        finally:
+            peer.close()
+
+    def close(self):
+        super().close()
+        self._thread.join(timeout=1)
+
+
+class FramedClaimTransport:
+    """Sends claims as frames on one long-lived stream and matches acks by seq"""
+    def __init__(self, io, window=8, ack_timeout=ACK_TIMEOUT_S):
+        self.io = io
+        self.window = max(1, int(window))
+        self.ack_timeout = ack_timeout
+        self._seq = 0
+        self._lock = threading.Lock()
+        self.sent = 0
+        self.acked = 0
+        self.nacked = 0
+
+    def _next_seq(self):
+        self._seq = (self._seq + 1) & 0xFFFFFFFF
+        return self._seq
+
+    def send_claim(self, claim):
+        """Send one claim and wait for its ack; returns (ok, reason)"""
+        return self.send_claims([claim])[0]
+
+    def send_claims(self, claims):
+        """Pipeline claims, at most `window` unacknowledged; returns [(ok, reason)] in order
+
+        Raises PartialSendError if the stream fails part way; its `results`
+        keep the acks that did arrive so only the rest are in doubt.
+        """
+        acks = {}
+        sent = []
+        with self._lock:
+            pending = []
+            try:
+                for claim in claims:
+                    seq = self._next_seq()
+                    self.io.write(encode_frame({'type': 'claim', 'seq': seq, 'claim': claim}))
+                    self.sent += 1
+                    sent.append(seq)
+                    pending.append(seq)
+                    if len(pending) >= self.window:
+                        self._collect(pending, acks)
+                        pending = []
+                self._collect(pending, acks)
+            except (TransportError, OSError, ValueError) as e:
+                results = [acks.get(seq) for seq in sent] + [None] * (len(claims) - len(sent))
+                raise PartialSendError(str(e), results) from e
+        return [acks[seq] for seq in sent]
+
+    def _collect(self, pending, acks):
+        """Read acks into `acks` until every seq in `pending` has one"""
+        waiting = set(pending)
+        while waiting:
+            msg = read_frame(self.io, self.ack_timeout)
+            seq = msg.get('ack')
+            if seq not in waiting:
+                continue  # stale ack from an earlier, timed-out batch
+            waiting.discard(seq)
+            acks[seq] = (bool(msg.get('ok')), msg.get('reason', ''))
+            if acks[seq][0]:
+                self.acked += 1
+            else:
+                self.nacked += 1
+
+    def close(self):
+        self.io.close()
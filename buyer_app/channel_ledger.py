@@ -0,0 +1,174 @@
+"""
+Buyer-side record of open payment channels, kept in ~/.xrpl_buyer/channels.json.
+
+For every channel the app opened it stores the capacity and the cumulative
+amount the merchant has acknowledged, so a payment is just "total so far +
+price": no ledger lookup, no arithmetic by the user.
+
+A new total is written to disk as `pending_drops` before the claim is signed
+and sent, and only becomes `signed_drops` once the receiver answers it. While
+a claim is pending no new price is stacked on top: the app resends the same
+total (signatures are deterministic, so it is the same claim) until it gets
+an answer. A signed claim that left the phone is a bearer authorization, so
+a refused total is committed too (`reject`): the receiver can still redeem
+it, and after a lost ack it may already have dispensed against it and will
+refuse the resend as stale. A lost ack or a crash therefore leaves the
+pending total in place instead of raising the price of the next sale, and
+the app never signs a lower total than one it may already have handed out.
+"""
+
+import json
+import os
+from datetime import datetime
+
+
+class ChannelLedgerError(ValueError):
+    pass
+
+
+class ChannelLedger:
+    """Per-channel capacity, acknowledged and pending cumulative drops, persisted as JSON"""
+    def __init__(self, path):
+        self.path = str(path)
+        self.channels = {}
+        self.current_id = None
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"Error loading channel ledger: {e}")
+            return
+        self.channels = data.get('channels', {})
+        self.current_id = data.get('current')
+
+    def save(self):
+        """Atomic write: a torn file would lose the running totals"""
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'current': self.current_id, 'channels': self.channels}, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    @property
+    def current(self):
+        return self.channels.get(self.current_id) if self.current_id else None
+
+    def get(self, channel_id):
+        return self.channels.get(channel_id.upper())
+
+    def add_channel(self, channel_id, capacity_drops, destination=None, dest_tag=None, make_current=True,
+                    status='open'):
+        """Record a newly opened channel (an existing entry keeps its signed total)
+
+        status='opening' records a PaymentChannelCreate that was signed but is
+        not validated yet, so its locked funds are not forgotten if the app
+        stops waiting for it.
+        """
+        channel_id = channel_id.upper()
+        entry = self.channels.setdefault(
+            channel_id, {'channel_id': channel_id, 'signed_drops': 0, 'pending_drops': None, 'claims': 0})
+        entry.update(capacity_drops=int(capacity_drops), destination=destination, dest_tag=dest_tag,
+                     status=status, updated_at=_now())
+        if make_current:
+            self.current_id = channel_id
+        self.save()
+        return entry
+
+    def drop_opening(self, channel_id):
+        """Forget an 'opening' channel whose create transaction failed or expired"""
+        entry = self.get(channel_id)
+        if entry is None or entry.get('status') != 'opening':
+            return False
+        del self.channels[entry['channel_id']]
+        if self.current_id == entry['channel_id']:
+            self.current_id = None
+        self.save()
+        return True
+
+    def set_capacity(self, channel_id, capacity_drops):
+        """After a PaymentChannelFund"""
+        entry = self._entry(channel_id)
+        entry['capacity_drops'] = int(capacity_drops)
+        entry['updated_at'] = _now()
+        self.save()
+        return entry
+
+    def remaining(self, channel_id):
+        entry = self._entry(channel_id)
+        return entry['capacity_drops'] - max(entry['signed_drops'], entry.get('pending_drops') or 0)
+
+    def pending_drops(self, channel_id):
+        """Cumulative total of the claim sent but not yet acked, or None"""
+        return self._entry(channel_id).get('pending_drops')
+
+    def authorize(self, channel_id, increment_drops):
+        """Persist signed total + increment_drops as pending and return it
+
+        Refused while an earlier claim is pending: resend that one instead.
+        """
+        entry = self._entry(channel_id)
+        if entry.get('status') == 'opening':
+            raise ChannelLedgerError('Channel is not validated yet')
+        if entry.get('pending_drops') is not None:
+            raise ChannelLedgerError(
+                f'Claim for {entry["pending_drops"]} drops is not acknowledged yet; resend it first')
+        increment_drops = int(increment_drops)
+        if increment_drops <= 0:
+            raise ChannelLedgerError('Price must be positive')
+        total = entry['signed_drops'] + increment_drops
+        if total > entry['capacity_drops']:
+            raise ChannelLedgerError(
+                f'Channel has {entry["capacity_drops"] - entry["signed_drops"]} drops left, '
+                f'price is {increment_drops}')
+        entry['pending_drops'] = total
+        entry['updated_at'] = _now()
+        self.save()
+        return total
+
+    def acknowledge(self, channel_id, total_drops):
+        """Receiver acked the claim for total_drops: it becomes the signed total"""
+        entry = self._entry(channel_id)
+        total_drops = int(total_drops)
+        if entry.get('pending_drops') != total_drops:
+            return False  # stale ack for a claim already settled or rolled back
+        entry['signed_drops'] = max(entry['signed_drops'], total_drops)
+        entry['pending_drops'] = None
+        entry['claims'] += 1
+        entry['updated_at'] = _now()
+        self.save()
+        return True
+
+    def reject(self, channel_id, total_drops):
+        """Receiver refused the claim for total_drops: it still becomes the signing floor
+
+        The refused claim was handed out and stays redeemable, so rolling it
+        back would understate what the channel owes and, if an earlier send
+        was accepted with its ack lost, make the next sale re-sign the same
+        refused total forever.
+        """
+        entry = self._entry(channel_id)
+        total_drops = int(total_drops)
+        if entry.get('pending_drops') != total_drops:
+            return False
+        entry['signed_drops'] = max(entry['signed_drops'], total_drops)
+        entry['pending_drops'] = None
+        entry['refused'] = entry.get('refused', 0) + 1
+        entry['updated_at'] = _now()
+        self.save()
+        return True
+
+    def _entry(self, channel_id):
+        entry = self.get(channel_id)
+        if entry is None:
+            raise ChannelLedgerError(f'Unknown channel {channel_id}')
+        return entry
+
+
+def _now():
+    return datetime.utcnow().isoformat() + "Z"
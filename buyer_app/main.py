@@ -17,23 +17,75 @@ from kivy.uix.scrollview import ScrollView
 from kivy.clock import Clock
 import json
 import os
+import sys
 from pathlib import Path
 
-# XRPL imports
-from xrpl.clients import JsonRpcClient
-from xrpl.wallet import Wallet
-from xrpl.models.transactions import PaymentChannelCreate
-from xrpl.transaction import autofill, sign, submit_and_wait
-from xrpl.core.binarycodec import encode_for_signing_claim
-from xrpl.core.keypairs import sign as xrpl_sign
-from xrpl.utils import xrp_to_drops, drops_to_xrp
-from xrpl.models.requests.account_channels import AccountChannels
 from datetime import datetime
+from decimal import Decimal
+from functools import lru_cache
 
+# xrpl-py costs ~0.6s to import (its package __init__ loads everything), so it
+# is imported where a screen first talks to the ledger or derives keys; the
+# launch -> load wallet -> sign claim path does not need it.
 try:
-    from xrpl.wallet import generate_faucet_wallet
-except:
-    generate_faucet_wallet = None
+    from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+except ImportError:
+    Ed25519PrivateKey = None
+
+# Shared modules from ../common when running from the repo. APK builds bundle a
+# copy of channel_id.py next to this file (see BUILD_ANDROID.md); without
+# claim_codec.py the claim encoder falls back to the xrpl-py codec.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "common"))
+try:
+    from claim_codec import encode_for_signing_claim
+except ImportError:
+    def encode_for_signing_claim(channel_id, amount_drops):
+        from xrpl.core.binarycodec import encode_for_signing_claim as _codec_encode
+        return bytes.fromhex(_codec_encode({"channel": channel_id, "amount": str(amount_drops)}))
+from channel_id import channel_id_from_result
+
+from bt_transport import ACKED, NACKED, NO_ACK, AndroidStreamIO, FramedClaimTransport, LoopbackIO
+from channel_ledger import ChannelLedger
+from net_worker import NetWorker, TxNotApplied
+
+
+def xrp_to_drops(xrp):
+    """Same result as xrpl.utils.xrp_to_drops for amounts typed into the app"""
+    drops = Decimal(str(xrp)) * 1_000_000
+    if drops < 0 or drops != drops.to_integral_value():
+        raise ValueError(f'{xrp} XRP is not a whole number of drops')
+    return str(int(drops))
+
+
+def drops_to_xrp(drops):
+    return format(Decimal(int(drops)) / 1_000_000, 'f')
+
+
+@lru_cache(maxsize=4)
+def _ed25519_key(private_key):
+    return Ed25519PrivateKey.from_private_bytes(bytes.fromhex(private_key[2:]))
+
+
+def sign_claim_message(msg, private_key):
+    """Ed25519 signs locally via cryptography (no xrpl import); secp256k1 goes through xrpl-py"""
+    if Ed25519PrivateKey is not None and private_key.upper().startswith('ED'):
+        return _ed25519_key(private_key).sign(msg).hex().upper()
+    from xrpl.core.keypairs import sign as xrpl_sign
+    return xrpl_sign(msg, private_key)
+
+
+def build_claim(keys, channel_id, amount_drops):
+    """Signed claim dict for the cached key material in WalletManager.keys"""
+    amount_drops = str(amount_drops)
+    return {
+        "channel_id": channel_id,
+        "amount_drops": amount_drops,
+        "signature": sign_claim_message(encode_for_signing_claim(channel_id, amount_drops), keys['private_key']),
+        "pubkey": keys['public_key'],
+        "key_type": "ed25519" if keys['public_key'].upper().startswith('ED') else "secp256k1",
+        "generated_at": datetime.utcnow().isoformat() + "Z"
+    }
+
 
 # Bluetooth imports
 try:
@@ -49,48 +101,72 @@ except Exception:
 class WalletManager:
     """Manages buyer wallet state"""
     def __init__(self):
-        self.wallet = None
+        self._wallet = None
+        self.keys = None  # seed/address/public_key/private_key, cached in wallet.json
         self.config_dir = Path.home() / ".xrpl_buyer"
         self.config_dir.mkdir(exist_ok=True)
         self.wallet_file = self.config_dir / "wallet.json"
         self.load_wallet()
 
+    @property
+    def wallet(self):
+        """Full xrpl-py Wallet, built from the cached keys on first use"""
+        if self._wallet is None and self.keys:
+            from xrpl.wallet import Wallet
+            self._wallet = Wallet(self.keys['public_key'], self.keys['private_key'],
+                                  master_address=self.keys['address'], seed=self.keys['seed'])
+        return self._wallet
+
+    def has_wallet(self):
+        return self.keys is not None
+
     def load_wallet(self):
-        """Load wallet from file if exists"""
+        """Load wallet from file if exists (keys are derived once, then cached)"""
         if self.wallet_file.exists():
             try:
                 with open(self.wallet_file, 'r') as f:
                     data = json.load(f)
-                    self.wallet = Wallet(data['seed'], sequence=0)
-                    return True
+                if data.get('public_key') and data.get('private_key') and data.get('address'):
+                    self.keys = data
+                else:
+                    self._set_wallet(self._derive(data['seed']))
+                    self.save_wallet()  # older file without private_key
+                return True
             except Exception as e:
                 print(f"Error loading wallet: {e}")
         return False
 
     def save_wallet(self):
         """Save wallet to file"""
-        if self.wallet:
+        if self.keys:
             with open(self.wallet_file, 'w') as f:
-                json.dump({
-                    'seed': self.wallet.seed,
-                    'address': self.wallet.classic_address,
-                    'public_key': self.wallet.public_key
-                }, f, indent=2)
+                json.dump(self.keys, f, indent=2)
+
+    @staticmethod
+    def _derive(seed=None):
+        from xrpl.wallet import Wallet
+        return Wallet.from_seed(seed) if seed else Wallet.create()
+
+    def _set_wallet(self, wallet):
+        self._wallet = wallet
+        self.keys = {
+            'seed': wallet.seed,
+            'address': wallet.classic_address,
+            'public_key': wallet.public_key,
+            'private_key': wallet.private_key
+        }
 
     def create_new_wallet(self, seed=None):
         """Create new wallet from seed or generate new"""
-        if seed:
-            self.wallet = Wallet.from_seed(seed)
-        else:
-            self.wallet = Wallet.create()
+        self._set_wallet(self._derive(seed))
         self.save_wallet()
-        return self.wallet
+        return self._wallet
 
     def get_address(self):
-        return self.wallet.classic_address if self.wallet else None
+        return self.keys['address'] if self.keys else None
 
     def get_seed(self):
-        return self.wallet.seed if self.wallet else None
+        return self.keys['seed'] if self.keys else None
 
 
 class BluetoothManager:
@@ -99,6 +175,8 @@ class BluetoothManager:
         self.connected = False
         self.device_address = None
         self.socket = None
+        self.transport = None  # FramedClaimTransport over the cached streams
+        self.last_error = None
 
         if ANDROID:
             self.BluetoothAdapter = autoclass('android.bluetooth.BluetoothAdapter')
@@ -135,9 +213,10 @@ class BluetoothManager:
         return devices
 
     def connect(self, device_address):
-        """Connect to Bluetooth device"""
+        """Connect to Bluetooth device (blocks in socket.connect(); run it on a worker)"""
         if not ANDROID:
-            # Desktop mode - simulate connection
+            # Desktop mode - in-process receiver speaking the same protocol
+            self.transport = FramedClaimTransport(LoopbackIO())
             self.connected = True
             self.device_address = device_address
             return True
@@ -148,43 +227,47 @@ class BluetoothManager:
             uuid = self.UUID.fromString("00001101-0000-1000-8000-00805F9B34FB")  # SPP UUID
             self.socket = device.createRfcommSocketToServiceRecord(uuid)
             self.socket.connect()
+            self.transport = FramedClaimTransport(AndroidStreamIO(self.socket))
             self.connected = True
             self.device_address = device_address
             return True
         except Exception as e:
             print(f"Bluetooth connection error: {e}")
+            self.last_error = str(e)
             return False
 
     def disconnect(self):
         """Disconnect from Bluetooth device"""
-        if self.socket and ANDROID:
+        if self.transport:
             try:
-                self.socket.close()
-            except:
+                self.transport.close()
+            except Exception:
                 pass
+        self.transport = None
+        self.socket = None
         self.connected = False
         self.device_address = None
 
     def send_claim(self, claim_json):
-        """Send claim JSON via Bluetooth"""
-        if not self.connected:
-            return False
+        """Send one claim frame and wait for the receiver's ack; returns (ACKED|NACKED|NO_ACK, reason)"""
+        return self.send_claims([claim_json])[0]
 
-        if not ANDROID:
-            # Desktop mode - just print
-            print(f"[BLUETOOTH SEND] Would send to {self.device_address}:")
-            print(json.dumps(claim_json, indent=2))
-            return True
+    def send_claims(self, claims):
+        """Send several claims on the open stream; returns one (status, reason) per claim"""
+        if not self.connected or not self.transport:
+            return [(NO_ACK, 'not connected')] * len(claims)
 
         try:
-            data = json.dumps(claim_json).encode('utf-8')
-            output_stream = self.socket.getOutputStream()
-            output_stream.write(data)
-            output_stream.flush()
-            return True
+            results = self.transport.send_claims(claims)
         except Exception as e:
             print(f"Bluetooth send error: {e}")
-            return False
+            self.last_error = str(e)
+            self.disconnect()  # stream state unknown; reconnect before the next claim
+            # claims answered before the failure keep their ack; only the rest are NO_ACK
+            partial = getattr(e, 'results', None) or [None] * len(claims)
+            return [(NO_ACK, str(e)) if r is None else (ACKED if r[0] else NACKED, r[1]) for r in partial]
+        self.last_error = next((reason for ok, reason in results if not ok), None)
+        return [(ACKED if ok else NACKED, reason) for ok, reason in results]
 
 
 class WalletScreen(Screen):
@@ -251,7 +334,7 @@ class WalletScreen(Screen):
 
     def update_wallet_info(self):
         """Update wallet display"""
-        if self.app_ref.wallet_manager.wallet:
+        if self.app_ref.wallet_manager.has_wallet():
             addr = self.app_ref.wallet_manager.get_address()
             self.wallet_info.text = f'Address:\n{addr[:20]}...\n{addr[20:]}'
         else:
@@ -298,23 +381,44 @@ class WalletScreen(Screen):
         popup.open()
 
     def request_faucet(self, instance):
-        """Request testnet funds"""
-        if not generate_faucet_wallet:
-            self.show_popup('Error', 'Faucet not available in this xrpl-py version')
-            return
+        """Request testnet funds (on a background worker)"""
+        rpc_url = self.app_ref.rpc_url
 
-        def do_faucet(dt):
+        def do_faucet(job):
+            from xrpl.clients import JsonRpcClient
             try:
-                client = JsonRpcClient(self.app_ref.rpc_url)
-                wallet = generate_faucet_wallet(client, debug=True)
-                self.app_ref.wallet_manager.create_new_wallet(wallet.seed)
-                self.update_wallet_info()
-                self.show_popup('Success', f'Faucet wallet created!\nAddress: {wallet.classic_address}')
-            except Exception as e:
-                self.show_popup('Error', f'Faucet failed: {str(e)}')
+                from xrpl.wallet import generate_faucet_wallet
+            except ImportError:
+                raise RuntimeError('Faucet not available in this xrpl-py version')
+            client = JsonRpcClient(rpc_url)
+            job.progress('requesting')
+            return generate_faucet_wallet(client, debug=True)
+
+        def done(wallet, error):
+            wait_popup.dismiss()
+            self.btn_faucet.disabled = False
+            if error:
+                self.show_popup('Error', f'Faucet failed: {str(error)}')
+                return
+            self.app_ref.wallet_manager.create_new_wallet(wallet.seed)
+            self.update_wallet_info()
+            self.show_popup('Success', f'Faucet wallet created!\nAddress: {wallet.classic_address}')
+
+        job = self.app_ref.net.submit(do_faucet, name='faucet', on_done=done)
 
-        self.show_popup('Please Wait', 'Requesting testnet funds...')
-        Clock.schedule_once(do_faucet, 0.5)
+        def cancel(_):
+            job.cancel()
+            wait_popup.dismiss()
+            self.btn_faucet.disabled = False
+
+        content = BoxLayout(orientation='vertical', padding=10)
+        content.add_widget(Label(text='Requesting testnet funds...'))
+        btn = Button(text='Cancel', size_hint_y=0.3)
+        btn.bind(on_press=cancel)
+        content.add_widget(btn)
+        wait_popup = Popup(title='Please Wait', content=content, size_hint=(0.8, 0.4), auto_dismiss=False)
+        self.btn_faucet.disabled = True
+        wait_popup.open()
 
     def show_seed(self, instance):
         """Show wallet seed"""
@@ -356,6 +460,8 @@ class ChannelScreen(Screen):
         super().__init__(**kwargs)
         self.app_ref = app_ref
         self.name = 'channel'
+        self._job = None
+        self._signed = {}  # {'channel_id': ...} once the running job has signed its create
 
         layout = BoxLayout(orientation='vertical', padding=20, spacing=10)
 
@@ -421,8 +527,19 @@ class ChannelScreen(Screen):
         self.add_widget(layout)
 
     def open_channel(self, instance):
-        """Open payment channel"""
-        if not self.app_ref.wallet_manager.wallet:
+        """Open payment channel (on a background worker); pressing again cancels"""
+        if self._job is not None:
+            signed_id = self._signed.get('channel_id')
+            if signed_id is None:
+                self._job.cancel()  # nothing signed yet: nothing can reach the ledger
+                self._finish_open('Cancelled')
+            else:
+                # May already be submitted: keep the job running, stop only the UI wait
+                self._finish_open(f'Stopped waiting; channel {signed_id[:16]}... is '
+                                  'recorded as opening and updates when it validates')
+            return
+
+        if not self.app_ref.wallet_manager.has_wallet():
             self.show_popup('Error', 'No wallet loaded')
             return
 
@@ -431,78 +548,101 @@ class ChannelScreen(Screen):
             tag = int(self.dest_tag.text.strip())
             amount = float(self.amount_xrp.text.strip())
             delay = int(self.settle_delay.text.strip())
+        except ValueError as e:
+            self.show_popup('Error', f'Invalid input: {str(e)}')
+            return
 
-            if not merchant:
-                self.show_popup('Error', 'Please enter merchant address')
-                return
-
-            self.status_label.text = 'Opening channel...'
-            self.btn_open.disabled = True
-
-            def do_open(dt):
-                try:
-                    client = JsonRpcClient(self.app_ref.rpc_url)
-                    wallet = self.app_ref.wallet_manager.wallet
-
-                    # Create transaction
-                    tx = PaymentChannelCreate(
-                        account=wallet.classic_address,
-                        destination=merchant,
-                        amount=str(xrp_to_drops(amount)),
-                        settle_delay=delay,
-                        public_key=wallet.public_key,
-                        destination_tag=tag
-                    )
-
-                    # Submit
-                    filled = autofill(tx, client)
-                    signed = sign(filled, wallet)
-                    result = submit_and_wait(signed, client)
-
-                    # Extract channel ID
-                    channel_id = self.extract_channel_id(result.result, client, wallet.classic_address, merchant)
-
-                    if channel_id:
-                        self.app_ref.channel_id = channel_id
-                        self.status_label.text = f'Channel opened!\nID: {channel_id[:16]}...'
-                        self.show_popup('Success', f'Channel ID:\n{channel_id}')
-                    else:
-                        self.status_label.text = 'Failed to get channel ID'
-                        self.show_popup('Error', 'Could not extract channel ID')
+        if not merchant:
+            self.show_popup('Error', 'Please enter merchant address')
+            return
 
-                except Exception as e:
-                    self.status_label.text = f'Error: {str(e)}'
-                    self.show_popup('Error', str(e))
-                finally:
-                    self.btn_open.disabled = False
+        rpc_url = self.app_ref.rpc_url
+        wallet_manager = self.app_ref.wallet_manager
+        signed_info = self._signed = {}  # channel_id, set on the worker once the create is signed
+
+        def do_open(job):
+            from xrpl.clients import JsonRpcClient
+            from xrpl.models.transactions import PaymentChannelCreate
+            from net_worker import submit_with_progress
+
+            client = JsonRpcClient(rpc_url)
+            wallet = wallet_manager.wallet
+            tx = PaymentChannelCreate(
+                account=wallet.classic_address,
+                destination=merchant,
+                amount=xrp_to_drops(amount),
+                settle_delay=delay,
+                public_key=wallet.public_key,
+                destination_tag=tag
+            )
+            job.progress('signing')
+
+            def on_signed(signed):
+                # known before submission; confirmed once validated
+                signed_info['channel_id'] = self.extract_channel_id({'tx_json': signed.to_xrpl()})
+                job.progress('channel_id', channel_id=signed_info['channel_id'])
+
+            return submit_with_progress(job, client, wallet, tx, on_signed=on_signed)
+
+        opening = {'capacity_drops': xrp_to_drops(amount), 'destination': merchant, 'dest_tag': tag}
+        self.status_label.text = 'Opening channel...'
+        self.btn_open.text = 'Cancel'
+        job = None
+
+        def progress(stage, info):
+            if stage == 'channel_id' and info.get('channel_id'):
+                # Signed and about to be submitted: record it before it can validate unseen
+                self.app_ref.channel_ledger.add_channel(info['channel_id'], make_current=False,
+                                                        status='opening', **opening)
+            if job is self._job:
+                self._on_open_progress(stage, info)
+
+        def done(result, error):
+            self._on_open_done(job, opening, signed_info.get('channel_id'), result, error)
+
+        job = self._job = self.app_ref.net.submit(do_open, name='open_channel',
+                                                  on_progress=progress, on_done=done)
+
+    def _on_open_progress(self, stage, info):
+        if stage == 'signing':
+            self.status_label.text = 'Signing...'
+        elif stage == 'channel_id':
+            self.status_label.text = f'Channel ID: {info["channel_id"][:16]}...\nSubmitting...'
+        elif stage == 'submitted':
+            self.status_label.text = f'Submitted ({info["engine_result"]})\nWaiting for validation...'
+        elif stage == 'waiting':
+            self.status_label.text = f'Waiting for validation...\nledger {info["ledger_index"]}'
+        elif stage == 'validated':
+            self.status_label.text = f'Validated in ledger {info["ledger_index"]}: {info["result"]}'
+
+    def _on_open_done(self, job, opening, signed_id, result, error):
+        ledger = self.app_ref.channel_ledger
+        in_view = job is self._job  # False once the user stopped waiting for it
+        channel_id = self.extract_channel_id(result) if error is None else None
+        if channel_id:
+            ledger.add_channel(channel_id, make_current=True, **opening)
+        elif signed_id and (error is None or isinstance(error, TxNotApplied)):
+            ledger.drop_opening(signed_id)  # tec*, rejected or expired: no channel was created
+        if not in_view:
+            return
+        if error is not None:
+            self._finish_open(f'Error: {str(error)}')
+            self.show_popup('Error', str(error))
+        elif channel_id:
+            self._finish_open(f'Channel opened!\nID: {channel_id[:16]}...')
+            self.show_popup('Success', f'Channel ID:\n{channel_id}')
+        else:
+            self._finish_open('Failed to get channel ID')
+            self.show_popup('Error', 'Could not extract channel ID')
 
-            Clock.schedule_once(do_open, 0.5)
+    def _finish_open(self, text):
+        self._job = None
+        self.status_label.text = text
+        self.btn_open.text = 'Open Channel'
 
-        except ValueError as e:
-            self.show_popup('Error', f'Invalid input: {str(e)}')
-            self.btn_open.disabled = False
-
-    def extract_channel_id(self, tx_result, client, source, destination):
-        """Extract channel ID from transaction result"""
-        # Try from metadata
-        meta = tx_result.get('meta') or tx_result.get('meta_json')
-        if meta:
-            nodes = meta.get('AffectedNodes', [])
-            for node in nodes:
-                created = node.get('CreatedNode')
-                if created and created.get('LedgerEntryType') == 'PayChannel':
-                    cid = created.get('LedgerIndex')
-                    if cid:
-                        return cid
-
-        # Fallback: query account channels
-        req = AccountChannels(account=source, destination_account=destination)
-        resp = client.request(req)
-        channels = (resp.result or {}).get('channels', [])
-        if channels:
-            return channels[-1].get('channel_id')
-
-        return None
+    def extract_channel_id(self, tx_result):
+        """Channel ID from the CreatedNode, or derived locally from the signed transaction"""
+        return channel_id_from_result(tx_result)
 
     def show_popup(self, title, message):
         """Show popup message"""
@@ -539,10 +679,14 @@ class ClaimScreen(Screen):
         self.channel_id = TextInput(multiline=False, size_hint_x=0.7, readonly=True)
         form.add_widget(self.channel_id)
 
-        form.add_widget(Label(text='Claim Amount (XRP):', size_hint_x=0.3))
+        form.add_widget(Label(text='Price (XRP):', size_hint_x=0.3))
         self.claim_amount = TextInput(text='1.0', multiline=False, size_hint_x=0.7)
         form.add_widget(self.claim_amount)
 
+        form.add_widget(Label(text='Signed so far:', size_hint_x=0.3))
+        self.signed_label = Label(text='-', size_hint_x=0.7)
+        form.add_widget(self.signed_label)
+
         layout.add_widget(form)
 
         # Bluetooth section
@@ -602,10 +746,22 @@ class ClaimScreen(Screen):
 
     def on_enter(self):
         """Called when screen is displayed"""
-        if self.app_ref.channel_id:
-            self.channel_id.text = self.app_ref.channel_id
+        if self.app_ref.channel_ledger.current_id:
+            self.channel_id.text = self.app_ref.channel_ledger.current_id
+        self.update_totals()
         self.update_bt_status()
 
+    def update_totals(self):
+        """Show cumulative signed / capacity for the current channel"""
+        entry = self.app_ref.channel_ledger.get(self.channel_id.text) if self.channel_id.text else None
+        if entry:
+            self.signed_label.text = (f'{drops_to_xrp(entry["signed_drops"])} / '
+                                      f'{drops_to_xrp(entry["capacity_drops"])} XRP')
+            if entry.get('pending_drops') is not None:
+                self.signed_label.text += f' (pending {drops_to_xrp(entry["pending_drops"])})'
+        else:
+            self.signed_label.text = '-'
+
     def update_bt_status(self):
         """Update Bluetooth status"""
         if self.app_ref.bt_manager.connected:
@@ -636,12 +792,8 @@ class ClaimScreen(Screen):
 
         for device in devices:
             def connect_device(instance, addr=device['address']):
-                if self.app_ref.bt_manager.connect(addr):
-                    self.update_bt_status()
-                    popup.dismiss()
-                    self.show_popup('Connected', f'Connected to {addr}')
-                else:
-                    self.show_popup('Error', 'Failed to connect')
+                popup.dismiss()
+                self.connect_device(addr)
 
             btn = Button(
                 text=f"{device['name']}\n{device['address']}",
@@ -660,6 +812,22 @@ class ClaimScreen(Screen):
 
         popup.open()
 
+    def connect_device(self, addr):
+        """Open the RFCOMM link on a worker; socket.connect() blocks for seconds"""
+        bt = self.app_ref.bt_manager
+        self.btn_scan.disabled = True
+        self.bt_status.text = f'Connecting to:\n{addr}...'
+
+        def done(ok, error):
+            self.btn_scan.disabled = False
+            self.update_bt_status()
+            if ok:
+                self.show_popup('Connected', f'Connected to {addr}')
+            else:
+                self.show_popup('Error', f'Failed to connect\n{error or bt.last_error or ""}')
+
+        self.app_ref.net.submit(lambda job: bt.connect(addr), name='bt_connect', on_done=done)
+
     def disconnect_bluetooth(self, instance):
         """Disconnect from Bluetooth device"""
         self.app_ref.bt_manager.disconnect()
@@ -667,7 +835,7 @@ class ClaimScreen(Screen):
 
     def create_and_send_claim(self, instance):
         """Create claim and send via Bluetooth"""
-        if not self.app_ref.wallet_manager.wallet:
+        if not self.app_ref.wallet_manager.has_wallet():
             self.show_popup('Error', 'No wallet loaded')
             return
 
@@ -680,40 +848,54 @@ class ClaimScreen(Screen):
             return
 
         try:
-            amount = float(self.claim_amount.text.strip())
+            price = self.claim_amount.text.strip()
             channel = self.channel_id.text.strip()
-            wallet = self.app_ref.wallet_manager.wallet
-
-            # Create claim
-            amount_drops = str(xrp_to_drops(amount))
-
-            try:
-                msg = encode_for_signing_claim(channel, amount_drops)
-            except TypeError:
-                msg = encode_for_signing_claim({"channel": channel, "amount": amount_drops})
-
-            signature = xrpl_sign(msg, wallet.private_key)
-
-            claim = {
-                "channel_id": channel,
-                "amount_drops": amount_drops,
-                "signature": signature,
-                "pubkey": wallet.public_key,
-                "key_type": "ed25519",
-                "generated_at": datetime.utcnow().isoformat() + "Z"
-            }
-
-            # Send via Bluetooth
-            if self.app_ref.bt_manager.send_claim(claim):
-                self.status_label.text = f'Claim sent! {amount} XRP'
-                self.show_popup('Success', f'Claim for {amount} XRP sent via Bluetooth!')
-            else:
-                self.status_label.text = 'Failed to send claim'
-                self.show_popup('Error', 'Failed to send claim via Bluetooth')
-
+            keys = self.app_ref.wallet_manager.keys
+            ledger = self.app_ref.channel_ledger
+
+            # An unacknowledged claim is resent as is; only an ack or a nack settles it
+            total = ledger.pending_drops(channel)
+            resend = total is not None
+            if not resend:
+                total = ledger.authorize(channel, xrp_to_drops(price))
+            claim = build_claim(keys, channel, total)
+            self.update_totals()
         except Exception as e:
             self.status_label.text = f'Error: {str(e)}'
             self.show_popup('Error', str(e))
+            return
+
+        # The ack wait (up to ACK_TIMEOUT_S) runs on a worker, not the UI thread
+        bt = self.app_ref.bt_manager
+        self.btn_send.disabled = True
+        verb = 'Resending' if resend else 'Sending'
+        self.status_label.text = f'{verb} claim for {drops_to_xrp(total)} XRP total...'
+
+        def done(result, error):
+            self._on_claim_sent(channel, total, resend, result, error)
+
+        self.app_ref.net.submit(lambda job: bt.send_claim(claim), name='send_claim', on_done=done)
+
+    def _on_claim_sent(self, channel, total, resend, result, error):
+        self.btn_send.disabled = False
+        ledger = self.app_ref.channel_ledger
+        status, reason = result if error is None else (NO_ACK, str(error))
+        if status == ACKED:
+            ledger.acknowledge(channel, total)
+            self.status_label.text = f'Claim acknowledged (total {drops_to_xrp(total)} XRP)'
+            self.show_popup('Success', f'Claim for {drops_to_xrp(total)} XRP total sent via Bluetooth!')
+        elif status == NACKED:
+            # Handed out all the same: the refused total stays the floor for the next claim
+            ledger.reject(channel, total)
+            self.status_label.text = f'Claim refused: {reason} (total {drops_to_xrp(total)} XRP kept)'
+            self.show_popup('Error', f'Receiver refused the claim\n{reason}')
+        else:
+            what = 'Resent claim' if resend else 'Claim'
+            self.status_label.text = (f'{what} for {drops_to_xrp(total)} XRP total not acknowledged '
+                                      f'({reason}); send again to resend it')
+            self.show_popup('Error', f'No ack from the receiver\n{reason}')
+        self.update_bt_status()
+        self.update_totals()
 
     def show_popup(self, title, message):
         """Show popup message"""
@@ -727,12 +909,15 @@ class ClaimScreen(Screen):
 
 
 class BuyerScreenManager:
-    """Manages screen transitions"""
-    def __init__(self, screen_manager):
+    """Manages screen transitions; screens are built on first visit"""
+    def __init__(self, screen_manager, factories):
         self.screen_manager = screen_manager
+        self.factories = factories
 
     def set_screen(self, screen_name):
         """Switch to screen"""
+        if not self.screen_manager.has_screen(screen_name):
+            self.screen_manager.add_widget(self.factories[screen_name]())
         self.screen_manager.current = screen_name
 
 
@@ -742,9 +927,11 @@ class XRPLBuyerApp(App):
         super().__init__(**kwargs)
         self.wallet_manager = WalletManager()
         self.bt_manager = BluetoothManager()
-        self.channel_id = None
+        self.channel_ledger = ChannelLedger(self.wallet_manager.config_dir / 'channels.json')
         self.rpc_url = os.environ.get('RPC_URL', 'https://s.altnet.rippletest.net:51234')
         self.screen_manager = None
+        # network calls run off the UI thread; callbacks come back on the next frame
+        self.net = NetWorker(dispatch=lambda fn: Clock.schedule_once(lambda dt: fn(), 0))
 
     def build(self):
         """Build the app UI"""
@@ -754,15 +941,18 @@ class XRPLBuyerApp(App):
             pass
 
         sm = ScreenManager()
-        self.screen_manager = BuyerScreenManager(sm)
-
-        # Add screens
-        sm.add_widget(WalletScreen(self))
-        sm.add_widget(ChannelScreen(self))
-        sm.add_widget(ClaimScreen(self))
+        self.screen_manager = BuyerScreenManager(sm, {
+            'wallet': lambda: WalletScreen(self),
+            'channel': lambda: ChannelScreen(self),
+            'claim': lambda: ClaimScreen(self),
+        })
+        self.screen_manager.set_screen('wallet')
 
         return sm
 
+    def on_stop(self):
+        self.net.shutdown()
+
 
 if __name__ == '__main__':
     XRPLBuyerApp().run()
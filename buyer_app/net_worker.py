@@ -0,0 +1,153 @@
+"""
+Background workers for XRPL network calls in the buyer app.
+
+Autofill, submit, validation polling and the faucet block for seconds; they
+run here instead of on the Kivy main thread. Progress and results are handed
+back through `dispatch` (Clock.schedule_once in the app), so callbacks can
+touch widgets. Jobs can be cancelled: a cancelled job stops at its next
+checkpoint, and its late result is dropped. xrpl-py is imported inside the
+jobs, keeping it off the app's startup path.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+POLL_INTERVAL_S = 1.0
+LEDGER_OFFSET = 20
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class TxNotApplied(RuntimeError):
+    """The transaction was rejected or expired: it never reaches the ledger"""
+
+
+class Job:
+    """Handle for one background job; fn(job) calls job.progress()/job.check()"""
+    def __init__(self, worker, name, on_progress=None, on_done=None):
+        self.worker = worker
+        self.name = name
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.future = None
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        """Ask the job to stop; returns False if it already finished"""
+        if self.future is not None and self.future.done():
+            return False
+        self._cancel.set()
+        if self.future is not None:
+            self.future.cancel()  # never started: drop it outright
+        return True
+
+    def check(self):
+        if self._cancel.is_set():
+            raise JobCancelled(self.name)
+
+    def sleep(self, seconds):
+        """Sleep, waking early (and raising) on cancel"""
+        if self._cancel.wait(seconds):
+            raise JobCancelled(self.name)
+
+    def progress(self, stage, **info):
+        self.check()
+        if self.on_progress:
+            self.worker.dispatch(lambda: self.on_progress(stage, info))
+
+
+class NetWorker:
+    """Small thread pool for blocking XRPL calls"""
+    def __init__(self, dispatch=None, max_workers=2):
+        self.dispatch = dispatch or (lambda fn: fn())
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='xrpl-net')
+        self._lock = threading.Lock()
+        self._jobs = set()
+
+    def submit(self, fn, name='job', on_progress=None, on_done=None):
+        """Run fn(job) on a worker; on_done(result, error) runs via dispatch unless cancelled"""
+        job = Job(self, name, on_progress, on_done)
+        with self._lock:
+            self._jobs.add(job)
+        job.future = self._pool.submit(self._run, job, fn)
+        return job
+
+    def _run(self, job, fn):
+        result, error = None, None
+        try:
+            job.check()
+            result = fn(job)
+        except JobCancelled:
+            return None
+        except Exception as e:
+            error = e
+        finally:
+            with self._lock:
+                self._jobs.discard(job)
+        if job.on_done and not job.cancelled:
+            self.dispatch(lambda: job.on_done(result, error))
+        return result
+
+    def cancel_all(self):
+        with self._lock:
+            jobs = list(self._jobs)
+        return sum(1 for j in jobs if j.cancel())
+
+    @property
+    def busy(self):
+        with self._lock:
+            return len(self._jobs)
+
+    def shutdown(self):
+        self.cancel_all()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def validated_ledger_index(client):
+    from xrpl.models.requests import Ledger
+    resp = client.request(Ledger(ledger_index='validated'))
+    return int(resp.result['ledger_index'])
+
+
+def submit_with_progress(job, client, wallet, tx, on_signed=None, poll_s=POLL_INTERVAL_S):
+    """autofill -> sign -> submit -> poll until validated, reporting each stage.
+
+    on_signed(signed_tx) runs before submission (e.g. to derive the channel ID).
+    Cancelling after 'submitted' stops the wait only; the transaction may
+    still validate before its LastLedgerSequence.
+    """
+    from xrpl.models.requests import Tx
+    from xrpl.transaction import autofill, sign, submit
+
+    filled = autofill(tx, client)
+    job.check()
+    signed = sign(filled, wallet)
+    if on_signed:
+        on_signed(signed)
+    job.check()
+    prelim = submit(signed, client).result
+    engine = prelim.get('engine_result', '')
+    tx_hash = signed.get_hash()
+    job.progress('submitted', tx_hash=tx_hash, engine_result=engine)
+    if engine.startswith(('tem', 'tef')):
+        raise TxNotApplied(f'Transaction rejected: {engine} {prelim.get("engine_result_message", "")}')
+
+    last = filled.last_ledger_sequence or (validated_ledger_index(client) + LEDGER_OFFSET)
+    while True:
+        job.sleep(poll_s)
+        current = validated_ledger_index(client)
+        result = client.request(Tx(transaction=tx_hash)).result
+        if result.get('validated'):
+            job.progress('validated', tx_hash=tx_hash, ledger_index=result.get('ledger_index'),
+                         result=(result.get('meta') or {}).get('TransactionResult'))
+            return result
+        if current > last:
+            raise TxNotApplied(f'Transaction {tx_hash} expired (LastLedgerSequence {last})')
+        job.progress('waiting', tx_hash=tx_hash, ledger_index=current)
@@ -0,0 +1,64 @@
+"""
+Local PayChannel ID derivation.
+
+A PayChannel's ledger index is SHA-512Half(0x0078 || AccountID(source) ||
+AccountID(destination) || UInt32 sequence), where the sequence is the
+creating transaction's Sequence, or its TicketSequence when Sequence is 0.
+Knowing the signed PaymentChannelCreate is enough to know the channel ID;
+no account_channels lookup (and no guessing among several channels) needed.
+"""
+from __future__ import annotations
+
+import hashlib
+import struct
+from typing import Optional
+
+PAYCHAN_SPACE = b"\x00x"  # ledger namespace 'x'
+
+_UINT32 = struct.Struct(">I")
+
+
+def sha512_half(data: bytes) -> bytes:
+    return hashlib.sha512(data).digest()[:32]
+
+
+def paychannel_id(source: str, destination: str, sequence: int) -> str:
+    """Uppercase hex channel ID for a channel `source` opened to `destination` at `sequence`."""
+    from xrpl.core.addresscodec import decode_classic_address  # lazy: the buyer app starts without xrpl-py
+
+    return sha512_half(PAYCHAN_SPACE + decode_classic_address(source)
+                       + decode_classic_address(destination) + _UINT32.pack(int(sequence))).hex().upper()
+
+
+def create_sequence(tx_json: dict) -> int:
+    """Sequence that identifies a transaction: its Sequence, or its TicketSequence if Sequence is 0."""
+    seq = int(tx_json.get("Sequence") or 0)
+    if seq == 0 and tx_json.get("TicketSequence") is not None:
+        return int(tx_json["TicketSequence"])
+    if seq == 0:
+        raise ValueError("transaction has neither Sequence nor TicketSequence")
+    return seq
+
+
+def channel_id_from_tx(tx_json: dict) -> str:
+    """Channel ID created by a PaymentChannelCreate (JSON form, e.g. tx_json of a submit/tx result)."""
+    if tx_json.get("TransactionType", "PaymentChannelCreate") != "PaymentChannelCreate":
+        raise ValueError(f"not a PaymentChannelCreate: {tx_json.get('TransactionType')}")
+    return paychannel_id(tx_json["Account"], tx_json["Destination"], create_sequence(tx_json))
+
+
+def channel_id_from_result(tx_result: dict) -> Optional[str]:
+    """Channel ID from a validated tx result: metadata CreatedNode first, else derived from tx_json."""
+    meta = tx_result.get("meta") or tx_result.get("meta_json") or {}
+    if isinstance(meta, dict):
+        if meta.get("TransactionResult", "tesSUCCESS") != "tesSUCCESS":
+            return None  # tec*: fee charged, no channel created
+        for node in meta.get("AffectedNodes") or []:
+            created = node.get("CreatedNode") or {}
+            if created.get("LedgerEntryType") == "PayChannel" and created.get("LedgerIndex"):
+                return created["LedgerIndex"]
+    tx_json = tx_result.get("tx_json") or tx_result.get("tx") or tx_result
+    try:
+        return channel_id_from_tx(tx_json)
+    except (KeyError, ValueError):
+        return None
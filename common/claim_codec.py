@@ -0,0 +1,47 @@
+"""
+PayChannel claim signing message, encoded without the xrpl-py binary codec.
+
+The layout is fixed: b"CLM\\0" || channel (Hash256, 32 bytes) || amount
+(UInt64 drops, big-endian). Shared by the kiosk verifier, the buyer app and
+the tools/ scripts; the xrpl-py codec is kept as a fallback.
+"""
+from __future__ import annotations
+
+import struct
+
+CLAIM_PREFIX = b"CLM\x00"
+CLAIM_MSG_LEN = len(CLAIM_PREFIX) + 32 + 8
+
+_AMOUNT = struct.Struct(">Q")
+_UINT64_MAX = (1 << 64) - 1
+
+
+def encode_claim(channel_id: str, amount_drops: str | int) -> bytes:
+    """Fast path: raises ValueError on anything that is not a plain claim."""
+    channel = bytes.fromhex(str(channel_id).strip())
+    if len(channel) != 32:
+        raise ValueError(f"channel must be 32 bytes, got {len(channel)}")
+    amount = int(str(amount_drops).strip())
+    if not 0 <= amount <= _UINT64_MAX:
+        raise ValueError(f"amount out of UInt64 range: {amount}")
+    return CLAIM_PREFIX + channel + _AMOUNT.pack(amount)
+
+
+def encode_claim_codec(channel_id: str, amount_drops: str | int) -> bytes:
+    """Reference path through xrpl-py's binary codec (imported lazily)."""
+    from xrpl.core.binarycodec import encode_for_signing_claim as _enc
+    amt = str(int(str(amount_drops).strip()))
+    try:
+        res = _enc({"channel": channel_id, "amount": amt})
+    except TypeError:
+        res = _enc(channel=channel_id, amount=amt)  # very old keyword signature
+    return bytes.fromhex(res) if isinstance(res, str) else bytes(res)
+
+
+def encode_for_signing_claim(channel_id: str, amount_drops: str | int) -> bytes:
+    """Claim signing bytes; falls back to the codec if the fast path rejects input."""
+    try:
+        return encode_claim(channel_id, amount_drops)
+    except ValueError:
+        return encode_claim_codec(channel_id, amount_drops)
+
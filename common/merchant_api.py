@@ -0,0 +1,196 @@
+"""
+Python client for the merchant API (api/server_offline_dev.js).
+
+One requests.Session per client keeps TCP/TLS connections alive between
+calls; every endpoint has its own timeout, and a bearer token is reused until
+the API rejects it (then, if credentials were given, it logs in once again).
+AsyncMerchantApiClient exposes the same calls as coroutines by running them on
+a small thread pool that shares the pooled session.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_TIMEOUTS = {
+    "health": 4.0,
+    "login": 5.0,
+    "register": 5.0,
+    "verify": 5.0,
+    "queue": 10.0,
+    "settle": 30.0,   # real settlement waits for a validated ledger
+    "receipts": 6.0,
+}
+
+
+class MerchantApiError(Exception):
+    def __init__(self, status: int, body=None):
+        self.status = int(status)
+        self.body = body
+        super().__init__(f"HTTP {status}: {body}")
+
+
+def normalize_base_url(raw: str) -> str:
+    raw = (raw or "").strip()
+    if not raw:
+        return ""
+    if raw.startswith("//"):
+        raw = "http:" + raw
+    if not raw.startswith("http://") and not raw.startswith("https://"):
+        raw = "http://" + raw
+    return raw.rstrip("/")
+
+
+class MerchantApiClient:
+    def __init__(self, base_url: str, token: Optional[str] = None, email: Optional[str] = None,
+                 password: Optional[str] = None, timeouts: Optional[dict] = None, pool_size: int = 8,
+                 on_call: Optional[Callable[[str, float, int], None]] = None):
+        self.base_url = normalize_base_url(base_url)
+        self.token = token or None
+        self._creds = (email, password) if email else None
+        self.timeouts = dict(DEFAULT_TIMEOUTS, **(timeouts or {}))
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, max_retries=0)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._login_lock = threading.Lock()
+        self._on_call = on_call  # on_call(endpoint, seconds, http_status or 0) for metrics
+
+    def close(self):
+        self._session.close()
+
+    # ----------- endpoints -----------
+    def health(self) -> dict:
+        return self._call("GET", "/health", "health", auth=False)
+
+    def login(self, email: Optional[str] = None, password: Optional[str] = None, role: Optional[str] = None) -> str:
+        if email:
+            self._creds = (email, password)
+        body = {}
+        if self._creds:
+            body = {"email": self._creds[0], "password": self._creds[1]}
+        if role:
+            body["role"] = role
+        data = self._call("POST", "/auth/login", "login", json=body, auth=False)
+        self.token = data.get("token") or None
+        return self.token
+
+    def register_device(self, device_id: str, exposure_cap_drops: int) -> dict:
+        return self._call("POST", "/devices/register", "register",
+                          json={"device_id": device_id, "exposure_cap_drops": int(exposure_cap_drops)})
+
+    def verify_claim(self, claim: dict) -> dict:
+        return self._call("POST", "/claims/verify", "verify", json=claim, auth=False)
+
+    def queue_claim(self, claim: dict) -> dict:
+        return self._call("POST", "/claims/queue", "queue", json=claim)
+
+    def queue_claims(self, claims: list) -> list:
+        """Batch form; returns the API's per-claim results ({status, accepted, reason})."""
+        data = self._call("POST", "/claims/queue", "queue", json={"claims": list(claims)})
+        results = (data or {}).get("results")
+        if not isinstance(results, list) or len(results) != len(claims):
+            raise MerchantApiError(501, "batch queue not supported")
+        return results
+
+    def settle(self, channel_id: Optional[str] = None) -> dict:
+        return self._call("POST", "/claims/settle", "settle", json={"channel_id": channel_id} if channel_id else {})
+
+    def receipts(self, channel_id: Optional[str] = None, **params) -> list:
+        if channel_id:
+            params["channel_id"] = channel_id
+        return self._call("GET", "/receipts", "receipts", params=params or None) or []
+
+    def receipts_since(self, cursor: int = 0):
+        """Incremental receipts -> (new_receipts, next_cursor, incremental).
+
+        incremental is False when the API ignored the cursor and returned its
+        full list (older servers); callers should then rebuild from scratch."""
+        r, items = self._call("GET", "/receipts", "receipts", params={"since": int(cursor)}, raw=True)
+        items = items or []
+        total = r.headers.get("X-Receipts-Total")
+        if total is None:
+            return items, len(items), False
+        return items, int(total), True
+
+    # ----------- transport -----------
+    def _call(self, method: str, path: str, endpoint: str, json=None, params=None, auth: bool = True,
+              raw: bool = False):
+        if not self.base_url:
+            raise MerchantApiError(0, "API base URL not set")
+        t0 = time.perf_counter()
+        status = 0
+        try:
+            r = self._send(method, path, endpoint, json, params, auth)
+            if r.status_code == 401 and auth and self._creds:
+                with self._login_lock:
+                    self.login()
+                r = self._send(method, path, endpoint, json, params, auth)
+            status = r.status_code
+        finally:
+            if self._on_call is not None:
+                self._on_call(endpoint, time.perf_counter() - t0, status)
+        body = None
+        if r.content:
+            try:
+                body = r.json()
+            except ValueError:
+                body = r.text
+        if not r.ok:
+            raise MerchantApiError(r.status_code, body)
+        return (r, body) if raw else body
+
+    def _send(self, method, path, endpoint, json, params, auth):
+        headers = {"Authorization": f"Bearer {self.token}"} if (auth and self.token) else None
+        return self._session.request(method, self.base_url + path, json=json, params=params,
+                                     headers=headers, timeout=self.timeouts.get(endpoint, 10.0))
+
+
+class AsyncMerchantApiClient:
+    """asyncio facade over MerchantApiClient (same pooled session, same token)."""
+
+    def __init__(self, base_url: str = "", client: Optional[MerchantApiClient] = None,
+                 max_concurrency: int = 8, **kwargs):
+        self.sync = client or MerchantApiClient(base_url, pool_size=max_concurrency, **kwargs)
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="merchant-api")
+
+    async def _run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, lambda: fn(*args, **kwargs))
+
+    async def health(self):
+        return await self._run(self.sync.health)
+
+    async def login(self, *args, **kwargs):
+        return await self._run(self.sync.login, *args, **kwargs)
+
+    async def register_device(self, device_id, exposure_cap_drops):
+        return await self._run(self.sync.register_device, device_id, exposure_cap_drops)
+
+    async def verify_claim(self, claim):
+        return await self._run(self.sync.verify_claim, claim)
+
+    async def queue_claim(self, claim):
+        return await self._run(self.sync.queue_claim, claim)
+
+    async def queue_claims(self, claims):
+        return await self._run(self.sync.queue_claims, claims)
+
+    async def settle(self, channel_id=None):
+        return await self._run(self.sync.settle, channel_id)
+
+    async def receipts(self, channel_id=None, **params):
+        return await self._run(self.sync.receipts, channel_id, **params)
+
+    async def receipts_since(self, cursor=0):
+        return await self._run(self.sync.receipts_since, cursor)
+
+    async def aclose(self):
+        self._pool.shutdown(wait=False)
+        self.sync.close()
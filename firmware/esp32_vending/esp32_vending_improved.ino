@@ -83,6 +83,21 @@ String errorMessage = "";
 #define MAX_PULSE_MS      5000
 #define STATE_DISPLAY_MS  2000
 
+// Binary vend frame (layout in app/vend_frame.py)
+#define FRAME_MAGIC          0xA5
+#define FRAME_VERSION        1
+#define FRAME_LEN            64
+#define FRAME_ACTION_VEND    1
+#define FRAME_ACTION_STATUS  2
+#define CHUNK_FLAG           0x80
+#define CHUNK_LAST           0x40
+#define CHUNK_SEQ_MASK       0x3F
+#define BLE_MTU              185
+
+uint8_t frameBuf[FRAME_LEN];
+size_t frameLen = 0;
+uint8_t frameNextSeq = 0;
+
 // ========== State to String Helper ===========
 const char* getStateString(MachineState s) {
   switch(s) {
@@ -125,6 +140,7 @@ class CommandCallback : public BLECharacteristicCallbacks {
     doc["merchant_address"] = MERCHANT_ADDRESS;
     doc["dest_tag"] = MERCHANT_DEST_TAG;
     doc["device_id"] = DEVICE_ID;
+    doc["frame_v"] = FRAME_VERSION;  // kiosk switches to binary vend frames
 
     String response;
     serializeJson(doc, response);
@@ -135,6 +151,14 @@ class CommandCallback : public BLECharacteristicCallbacks {
   }
 
   void onWrite(BLECharacteristic* pCharacteristic) override {
+    // Binary frame chunks start with the high bit set (never '{' or text)
+    uint8_t* raw = pCharacteristic->getData();
+    size_t rawLen = pCharacteristic->getLength();
+    if (rawLen > 0 && (raw[0] & CHUNK_FLAG)) {
+      handleFrameChunk(raw, rawLen);
+      return;
+    }
+
     String receivedData = pCharacteristic->getValue().c_str();
 
     if (receivedData.length() == 0) {
@@ -233,6 +257,7 @@ void initBLE() {
   Serial.println("[BLE] Initializing...");
 
   BLEDevice::init(DEVICE_NAME);
+  BLEDevice::setMTU(BLE_MTU);  // lets a vend frame go in a single write
   pServer = BLEDevice::createServer();
   pServer->setCallbacks(new MyServerCallbacks());
 
@@ -353,12 +378,7 @@ void handleJSONCommand(const String& jsonCmd) {
     if (channel_id) lastChannelId = String(channel_id);
     if (amount_drops_str) lastClaimAmount = String(amount_drops_str).toInt();
 
-    // Update state and execute vend
-    currentState = STATE_CLAIM_VERIFIED;
-    updateDisplay();
-    delay(500);
-
-    executeVend(slot, pulse_ms);
+    startPayChannelVend(slot, pulse_ms);
 
   } else if (strcmp(action, "status") == 0) {
     // Status query
@@ -373,7 +393,101 @@ void handleJSONCommand(const String& jsonCmd) {
   }
 }
 
+// ========== Binary Frame Handler ===========
+uint16_t crc16Ccitt(const uint8_t* data, size_t len) {
+  uint16_t crc = 0xFFFF;
+  for (size_t i = 0; i < len; i++) {
+    crc ^= (uint16_t)data[i] << 8;
+    for (int b = 0; b < 8; b++) {
+      crc = (crc & 0x8000) ? (uint16_t)((crc << 1) ^ 0x1021) : (uint16_t)(crc << 1);
+    }
+  }
+  return crc;
+}
+
+void rejectFrame(const char* why) {
+  Serial.printf("[FRAME] %s\n", why);
+  frameLen = 0;
+  frameNextSeq = 0;
+  currentState = STATE_ERROR;
+  errorMessage = "Bad frame";
+  sendNotification("ERROR: Bad frame");
+}
+
+void handleFrameChunk(const uint8_t* data, size_t len) {
+  uint8_t hdr = data[0];
+  uint8_t seq = hdr & CHUNK_SEQ_MASK;
+  if (seq == 0) {
+    frameLen = 0;
+    frameNextSeq = 0;
+  }
+  if (seq != frameNextSeq || frameLen + len - 1 > FRAME_LEN) {
+    rejectFrame("Chunk out of sequence");
+    return;
+  }
+  memcpy(frameBuf + frameLen, data + 1, len - 1);
+  frameLen += len - 1;
+  frameNextSeq++;
+  if (hdr & CHUNK_LAST) {
+    size_t n = frameLen;
+    frameLen = 0;
+    frameNextSeq = 0;
+    handleBinaryFrame(frameBuf, n);
+  }
+}
+
+void handleBinaryFrame(const uint8_t* f, size_t len) {
+  if (len != FRAME_LEN || f[0] != FRAME_MAGIC || f[1] != FRAME_VERSION) {
+    rejectFrame("Bad length/version");
+    return;
+  }
+  uint16_t crc = ((uint16_t)f[FRAME_LEN - 2] << 8) | f[FRAME_LEN - 1];
+  if (crc != crc16Ccitt(f, FRAME_LEN - 2)) {
+    rejectFrame("Checksum mismatch");
+    return;
+  }
+
+  if (f[2] == FRAME_ACTION_STATUS) {
+    sendStatusJSON();
+    return;
+  }
+  if (f[2] != FRAME_ACTION_VEND) {
+    rejectFrame("Unknown action");
+    return;
+  }
+
+  int slot = f[3];
+  int pulse_ms = ((int)f[4] << 8) | f[5];
+  uint64_t amount = 0;
+  for (int i = 0; i < 8; i++) amount = (amount << 8) | f[6 + i];
+  char channel[65];
+  for (int i = 0; i < 32; i++) snprintf(channel + 2 * i, 3, "%02X", f[14 + i]);
+  char device[17];
+  memcpy(device, f + 46, 16);
+  device[16] = '\0';
+
+  Serial.println("[VEND] PayChannel vend frame:");
+  Serial.printf("  Slot: %d\n", slot);
+  Serial.printf("  Pulse: %dms\n", pulse_ms);
+  Serial.printf("  Channel: %s\n", channel);
+  Serial.printf("  Amount: %llu drops\n", (unsigned long long)amount);
+  Serial.printf("  Device: %s\n", device);
+
+  lastChannelId = String(channel);
+  lastClaimAmount = (unsigned long)amount;
+
+  startPayChannelVend(slot, pulse_ms);
+}
+
 // ========== Vend Execution ===========
+void startPayChannelVend(int slot, int pulse_ms) {
+  currentState = STATE_CLAIM_VERIFIED;
+  updateDisplay();
+  delay(500);
+
+  executeVend(slot, pulse_ms);
+}
+
 void executeVend(int slot, int pulse_ms) {
   if (vendingInProgress) {
     Serial.println("[VEND] ERROR: Already vending");
@@ -0,0 +1,61 @@
+"""
+Buyer claim transport throughput over the desktop loopback (no hardware).
+
+    python tests/benchmarks/bench_bt_transport.py            # 2000 claims per window size
+    python tests/benchmarks/bench_bt_transport.py --claims 500 --windows 1 4 16
+
+window=1 is stop-and-wait (one ack round trip per claim); larger windows
+pipeline claims on the same stream. The loopback has no radio latency, so
+the numbers are an upper bound for protocol and JSON overhead.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(ROOT, "buyer_app"))
+
+from bt_transport import FramedClaimTransport, LoopbackIO  # noqa: E402
+
+CLAIM = {
+    "channel_id": "1B06D34C0C4A1D8DDF188D35A33A9AEB394DD01EAF03D383BEFF334F06BA0994",
+    "amount_drops": "1000000",
+    "signature": "AB" * 64,
+    "pubkey": "ED" + "CD" * 32,
+    "key_type": "ed25519",
+    "generated_at": "2026-01-01T00:00:00Z",
+}
+
+
+def run(claims: int = 2000, windows=(1, 4, 16)) -> dict:
+    out = {}
+    for window in windows:
+        transport = FramedClaimTransport(LoopbackIO(), window=window)
+        try:
+            batch = [dict(CLAIM, amount_drops=str(1_000_000 + i)) for i in range(claims)]
+            t0 = time.perf_counter()
+            results = transport.send_claims(batch)
+            elapsed = time.perf_counter() - t0
+        finally:
+            transport.close()
+        if not all(ok for ok, _ in results):
+            raise AssertionError(f"loopback nacked claims at window={window}")
+        out[f"claims_per_s_window_{window}"] = claims / elapsed
+    return out
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Bluetooth claim transport loopback benchmark")
+    ap.add_argument("--claims", type=int, default=2000)
+    ap.add_argument("--windows", type=int, nargs="+", default=[1, 4, 16])
+    args = ap.parse_args(argv)
+    for name, rate in run(args.claims, args.windows).items():
+        print(f"{name:28s} {rate:12,.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
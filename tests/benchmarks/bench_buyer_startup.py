@@ -0,0 +1,98 @@
+"""
+Buyer app cold start: fresh interpreter -> import main -> load wallet -> first signed claim.
+
+    python tests/benchmarks/bench_buyer_startup.py              # median of 5 runs, 1.0s budget
+    python tests/benchmarks/bench_buyer_startup.py --budget 0.8
+
+Each run is a new process with HOME pointed at a temporary ~/.xrpl_buyer, so
+nothing is warm except the OS file cache. No window is opened; the Kivy
+modules are still imported. Exits 1 if the median launch-to-claim time for an
+Ed25519 wallet is over budget. secp256k1 wallets are reported too; they sign
+through xrpl-py and pay its import cost.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+BUYER_APP = os.path.join(ROOT, "buyer_app")
+CH = "1B06D34C0C4A1D8DDF188D35A33A9AEB394DD01EAF03D383BEFF334F06BA0994"
+
+CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import main
+t1 = time.perf_counter()
+wm = main.WalletManager()
+t2 = time.perf_counter()
+claim = main.build_claim(wm.keys, sys.argv[1], "1000000")
+t3 = time.perf_counter()
+print(json.dumps({"import_s": t1 - t0, "wallet_s": t2 - t1, "claim_s": t3 - t2,
+                  "xrpl_imported": "xrpl" in sys.modules, "claim": claim}))
+"""
+
+
+def write_wallet(home: str, algorithm: str):
+    from xrpl.constants import CryptoAlgorithm
+    from xrpl.wallet import Wallet
+
+    w = Wallet.create(algorithm=CryptoAlgorithm(algorithm))
+    os.makedirs(os.path.join(home, ".xrpl_buyer"), exist_ok=True)
+    with open(os.path.join(home, ".xrpl_buyer", "wallet.json"), "w", encoding="utf-8") as f:
+        json.dump({"seed": w.seed, "address": w.classic_address,
+                   "public_key": w.public_key, "private_key": w.private_key}, f)
+    return w
+
+
+def run_once(home: str) -> dict:
+    env = dict(os.environ, HOME=home, KIVY_NO_ARGS="1", KIVY_NO_CONSOLELOG="1", KIVY_NO_FILELOG="1")
+    t0 = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", CHILD, CH], cwd=BUYER_APP, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    total = time.perf_counter() - t0
+    res = json.loads(out.strip().splitlines()[-1])
+    res["launch_to_claim_s"] = total
+    return res
+
+
+def run(runs: int = 5) -> dict:
+    results = {}
+    for algorithm in ("ed25519", "secp256k1"):
+        with tempfile.TemporaryDirectory() as home:
+            write_wallet(home, algorithm)
+            samples = [run_once(home) for _ in range(runs)]
+        results[algorithm] = {
+            key: statistics.median(s[key] for s in samples)
+            for key in ("launch_to_claim_s", "import_s", "wallet_s", "claim_s")
+        }
+        results[algorithm]["xrpl_imported"] = samples[-1]["xrpl_imported"]
+        results[algorithm]["claim"] = samples[-1]["claim"]
+    return results
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Buyer app cold-start benchmark")
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--budget", type=float, default=1.0, help="seconds, Ed25519 launch -> first claim")
+    args = ap.parse_args(argv)
+
+    results = run(args.runs)
+    for algorithm, r in results.items():
+        print(f"{algorithm:10s} launch->claim {r['launch_to_claim_s'] * 1000:7.1f} ms  "
+              f"(import {r['import_s'] * 1000:.1f}, wallet {r['wallet_s'] * 1000:.1f}, "
+              f"claim {r['claim_s'] * 1000:.1f} ms; xrpl imported: {r['xrpl_imported']})")
+    over = results["ed25519"]["launch_to_claim_s"] > args.budget
+    if over:
+        print(f"OVER BUDGET: {results['ed25519']['launch_to_claim_s']:.3f}s > {args.budget:.3f}s")
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
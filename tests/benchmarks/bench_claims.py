@@ -0,0 +1,196 @@
+"""
+Kiosk hot-path benchmarks with a stored baseline.
+
+    python tests/benchmarks/bench_claims.py                    # run, compare with baseline.json
+    python tests/benchmarks/bench_claims.py --update-baseline  # record this machine's numbers
+    python tests/benchmarks/bench_claims.py --quick            # small sizes (CI smoke)
+
+Every benchmark reports operations per second. A result more than
+--threshold (default 30%) below its baseline counts as a regression and the
+script exits with status 1. Baselines are machine-specific: record them on
+the box (or CI runner class) that runs the comparison.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+for sub in ("common", "app", "tools"):
+    p = os.path.join(ROOT, sub)
+    if p not in sys.path:
+        sys.path.insert(0, p)
+os.environ.setdefault("KIVY_NO_ARGS", "1")
+os.environ.setdefault("KIVY_NO_CONSOLELOG", "1")
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+CHANNEL_SIZES = (10_000, 100_000, 1_000_000)
+QUICK_SIZES = (1_000, 10_000)
+CH = "1B06D34C0C4A1D8DDF188D35A33A9AEB394DD01EAF03D383BEFF334F06BA0994"
+
+
+def _rate(fn, n: int, min_time: float = 0.2, repeat: int = 5) -> float:
+    """Best-of-`repeat` ops/s of fn(i), each run repeating batches of n for min_time."""
+    fn(0)  # warm caches / lazy imports
+    best = 0.0
+    for _ in range(repeat):
+        done, t0 = 0, time.perf_counter()
+        while True:
+            for i in range(n):
+                fn(i)
+            done += n
+            elapsed = time.perf_counter() - t0
+            if elapsed >= min_time:
+                break
+        best = max(best, done / elapsed)
+    return best
+
+
+def bench_encode(m) -> dict:
+    return {"encode_for_signing_claim": _rate(lambda i: m.encode_for_signing_claim(CH, 1_000_000 + i), 2000)}
+
+
+def bench_verify(m) -> dict:
+    from xrpl.constants import CryptoAlgorithm
+    from xrpl.core.keypairs import sign
+    from xrpl.wallet import Wallet
+
+    out = {}
+    for algo in (CryptoAlgorithm.ED25519, CryptoAlgorithm.SECP256K1):
+        w = Wallet.create(algorithm=algo)
+        sig = sign(m.encode_for_signing_claim(CH, "2000000"), w.private_key)
+        out[f"verify_claim_{algo.value}"] = _rate(lambda i: m.verify_claim(CH, "2000000", sig, w.public_key), 50)
+    return out
+
+
+def bench_dispense_state(m, sizes, ops: int = 200) -> dict:
+    """_device_may_dispense + durable kv_set(last_seen) with N channels already stored."""
+    out = {}
+    check = m.MainScreen._device_may_dispense  # does not touch self
+    saved = m._kv_store
+    try:
+        for n in sizes:
+            with tempfile.TemporaryDirectory() as tmp:
+                store = m.KVStore(os.path.join(tmp, "kv.log"),
+                                  commit_interval_s=m.KV_COMMIT_INTERVAL_MS / 1000.0)
+                for i in range(n):
+                    store.set(f"last_seen:{i:064X}", 1_000, wait=False)
+                store.flush()
+                m._kv_store = store
+                chans = [f"{(i * 7919) % n:064X}" for i in range(ops)]
+                amounts = itertools.count(10_000)  # strictly rising, so every check passes
+
+                def check_only(i):
+                    check(None, chans[i % ops], 2_000 + i)
+
+                def check_and_set(i):
+                    ch = chans[i % ops]
+                    amt = next(amounts)
+                    if not check(None, ch, amt)[0]:
+                        raise AssertionError("benchmark claim was declined")
+                    m.kv_set(f"last_seen:{ch}", amt)
+
+                out[f"device_may_dispense_{n}"] = _rate(check_only, ops)
+                out[f"dispense_and_kv_set_{n}"] = _rate(check_and_set, ops, min_time=0.5)
+                store.close()
+                m._kv_store = None
+    finally:
+        m._kv_store = saved
+    return out
+
+
+def bench_make_claim(m) -> dict:
+    import buyer_claim_tool as tool
+    from xrpl.wallet import Wallet
+
+    w = Wallet.create()
+    sink = io.StringIO()
+
+    def one(i):
+        with contextlib.redirect_stdout(sink):  # make_claim_json prints the claim
+            tool.make_claim_json(CH, 1 + i / 1e6, w)
+        sink.seek(0)
+        sink.truncate()
+
+    return {"make_claim_json": _rate(one, 50)}
+
+
+def run(quick: bool = False) -> dict:
+    import main_screen_clean as m
+
+    results = {}
+    results.update(bench_encode(m))
+    results.update(bench_verify(m))
+    results.update(bench_dispense_state(m, QUICK_SIZES if quick else CHANNEL_SIZES))
+    results.update(bench_make_claim(m))
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """[(name, current, baseline, change)] for results slower than baseline by > threshold."""
+    bad = []
+    for name, cur in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        change = cur / base - 1.0
+        if change < -threshold:
+            bad.append((name, cur, base, change))
+    return bad
+
+
+def load_baseline(path: str = BASELINE_PATH) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get("results", {})
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(results: dict, path: str = BASELINE_PATH):
+    doc = {
+        "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                    "cpu": platform.processor() or platform.machine(), "cpus": os.cpu_count()},
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "results": {k: round(v, 1) for k, v in sorted(results.items())},
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(doc, f, indent=2)
+        f.write("\n")
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Kiosk hot-path benchmarks")
+    ap.add_argument("--quick", action="store_true", help="small channel counts")
+    ap.add_argument("--threshold", type=float, default=0.30, help="allowed slowdown vs baseline (0.30 = 30%%)")
+    ap.add_argument("--baseline", default=BASELINE_PATH)
+    ap.add_argument("--update-baseline", action="store_true")
+    args = ap.parse_args(argv)
+
+    results = run(quick=args.quick)
+    baseline = load_baseline(args.baseline)
+    for name, cur in sorted(results.items()):
+        base = baseline.get(name)
+        delta = f"{(cur / base - 1) * 100:+6.1f}%" if base else "   (new)"
+        print(f"{name:36s} {cur:14,.0f} ops/s  {delta}")
+
+    if args.update_baseline:
+        save_baseline({**baseline, **results}, args.baseline)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    bad = compare(results, baseline, args.threshold)
+    for name, cur, base, change in bad:
+        print(f"REGRESSION {name}: {cur:,.0f} ops/s vs baseline {base:,.0f} ({change * 100:.1f}%)")
+    return 1 if bad else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,12 @@
+import os
+import sys
+
+# Kiosk/tool modules are plain scripts, not an installed package.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for sub in ("buyer_app", "common", "app", "tools"):  # later entries win on name clashes (main.py)
+    p = os.path.join(ROOT, sub)
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+os.environ.setdefault("KIVY_NO_ARGS", "1")
+os.environ.setdefault("KIVY_NO_CONSOLELOG", "1")
@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+import bench_buyer_startup  # noqa: E402
+import bench_claims  # noqa: E402
+
+
+def test_compare_flags_only_slowdowns_past_threshold():
+    baseline = {"a": 1000.0, "b": 1000.0, "c": 1000.0}
+    bad = bench_claims.compare({"a": 650.0, "b": 800.0, "c": 2000.0, "new": 1.0}, baseline, 0.30)
+    assert [name for name, *_ in bad] == ["a"]
+
+
+@pytest.mark.skipif(not os.environ.get("RUN_BENCHMARKS"), reason="set RUN_BENCHMARKS=1 to run benchmarks")
+def test_no_regression_against_baseline():
+    assert bench_claims.main(["--quick"]) == 0
+
+
+@pytest.mark.skipif(not os.environ.get("RUN_BENCHMARKS"), reason="set RUN_BENCHMARKS=1 to run benchmarks")
+def test_buyer_cold_start_within_budget():
+    assert bench_buyer_startup.main(["--runs", "3"]) == 0
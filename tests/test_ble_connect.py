@@ -0,0 +1,132 @@
+import time
+
+import main_screen_clean as m
+
+
+class FakeDevice:
+    def __init__(self, address, name):
+        self.address = address
+        self.name = name
+
+
+class FakeScanner:
+    scans = 0
+    device = FakeDevice("AA:BB", "ESP32_BLE_SERVER")
+
+    @classmethod
+    async def find_device_by_filter(cls, fn, timeout=10.0, **kwargs):
+        cls.scans += 1
+        return cls.device
+
+
+class FakeClient:
+    instances = []
+    reachable = {"AA:BB"}
+
+    def __init__(self, target, timeout=10.0, disconnected_callback=None):
+        self.address = getattr(target, "address", target)
+        self.on_disc = disconnected_callback
+        FakeClient.instances.append(self)
+
+    async def connect(self):
+        if self.address not in FakeClient.reachable:
+            raise OSError("not reachable")
+
+    @property
+    def is_connected(self):
+        return True
+
+    async def start_notify(self, uuid, cb):
+        pass
+
+    async def disconnect(self):
+        pass
+
+    async def read_gatt_char(self, uuid):
+        return b'{"device_id":"vending-001","frame_v":1}'
+
+    async def write_gatt_char(self, uuid, data, response=True):
+        self.writes = getattr(self, "writes", []) + [bytes(data)]
+
+
+def _setup(monkeypatch):
+    store = {}
+    FakeScanner.scans = 0
+    FakeClient.instances = []
+    monkeypatch.setattr(m, "BleakScanner", FakeScanner)
+    monkeypatch.setattr(m, "BleakClient", FakeClient)
+    monkeypatch.setattr(m, "kv_get", lambda k, d=None: store.get(k, d))
+    monkeypatch.setattr(m, "kv_set", lambda k, v, wait=True: store.__setitem__(k, v))
+    return store
+
+
+def test_cached_address_skips_scan(monkeypatch):
+    store = _setup(monkeypatch)
+    ble = m.BleVendClient()
+    assert ble.connect().result(timeout=5)
+    assert FakeScanner.scans == 1 and store["ble:last_address"] == "AA:BB"
+
+    ble2 = m.BleVendClient()
+    assert ble2.connect().result(timeout=5)
+    assert FakeScanner.scans == 1  # direct connect, no scan
+
+
+def test_stale_cached_address_falls_back_to_scan(monkeypatch):
+    store = _setup(monkeypatch)
+    store["ble:last_address"] = "DE:AD"
+    assert m.BleVendClient().connect().result(timeout=5)
+    assert FakeScanner.scans == 1 and store["ble:last_address"] == "AA:BB"
+
+
+def test_auto_reconnect_after_link_loss(monkeypatch):
+    _setup(monkeypatch)
+    ble = m.BleVendClient()
+    assert ble.connect().result(timeout=5)
+    client = FakeClient.instances[-1]
+    ble._thr.loop.call_soon_threadsafe(client.on_disc, client)
+    deadline = time.time() + 3
+    while time.time() < deadline and len(FakeClient.instances) < 2:
+        time.sleep(0.02)
+    time.sleep(0.05)
+    assert ble._connected and ble._client is FakeClient.instances[-1] is not client
+
+
+def test_vend_uses_binary_frames_when_firmware_supports_them(monkeypatch):
+    import vend_frame
+
+    _setup(monkeypatch)
+    ble = m.BleVendClient()
+    assert ble.connect().result(timeout=5)
+    ch = "AB" * 32
+    assert ble.send_vend(channel_id=ch, amount_drops=2000000).result(timeout=5)
+    writes = FakeClient.instances[-1].writes
+    asm = vend_frame.FrameAssembler()
+    frame = [asm.feed(w) for w in writes][-1]
+    assert vend_frame.decode_frame(frame)["claim_channel"] == ch
+
+
+def test_reconnect_is_managed_and_does_not_block_vend_writes(monkeypatch):
+    _setup(monkeypatch)
+    ble = m.BleVendClient()
+    assert ble.connect().result(timeout=5)
+    client = FakeClient.instances[-1]
+
+    async def slow_scan(fn, timeout=10.0, **kwargs):
+        import asyncio
+        await asyncio.sleep(timeout)
+        return None
+
+    FakeClient.reachable = set()  # link gone: direct connect fails, scan hangs
+    monkeypatch.setattr(FakeScanner, "find_device_by_filter", slow_scan)
+    monkeypatch.setattr(m, "BLE_RECONNECT_SCAN_S", 2.0)
+    try:
+        ble._thr.loop.call_soon_threadsafe(client.on_disc, client)
+        time.sleep(0.1)
+        assert ble._thr.link_jobs.in_flight == 1  # reconnect runs as a managed job
+        t0 = time.time()
+        assert ble.send_vend(channel_id="AB" * 32, amount_drops=2000000).result(timeout=5) is False
+        assert time.time() - t0 < 1.0  # answered at once, not after the scan
+        ble.disconnect().result(timeout=5)
+        assert ble._thr.link_jobs.cancelled >= 1 and not ble._reconnecting
+    finally:
+        FakeClient.reachable = {"AA:BB"}
@@ -0,0 +1,116 @@
+import socket
+import struct
+import time
+
+import pytest
+
+from bt_transport import (MAX_FRAME, AndroidStreamIO, FramedClaimTransport, LoopbackIO, PartialSendError, SocketIO,
+                          TransportError, encode_frame, read_frame)
+
+CLAIM = {"channel_id": "AB" * 32, "amount_drops": "1000", "signature": "CD" * 64, "pubkey": "ED" + "EF" * 32}
+
+
+def test_frame_round_trip_is_compact():
+    a, b = socket.socketpair()
+    try:
+        frame = encode_frame({"seq": 1, "claim": CLAIM})
+        assert struct.unpack(">I", frame[:4])[0] == len(frame) - 4 and b"\n" not in frame
+        a.sendall(frame + encode_frame({"seq": 2}))  # two frames back to back
+        io = SocketIO(b)
+        assert read_frame(io, 1)["claim"] == CLAIM
+        assert read_frame(io, 1) == {"seq": 2}
+    finally:
+        a.close()
+        b.close()
+
+
+def test_oversized_frames_are_refused():
+    with pytest.raises(ValueError):
+        encode_frame({"x": "y" * MAX_FRAME})
+    a, b = socket.socketpair()
+    try:
+        a.sendall(struct.pack(">I", MAX_FRAME + 1))
+        with pytest.raises(TransportError):
+            read_frame(SocketIO(b), 1)
+    finally:
+        a.close()
+        b.close()
+
+
+@pytest.mark.parametrize("window", [1, 3, 8])
+def test_pipelined_claims_are_acked_in_order(window):
+    io = LoopbackIO()
+    transport = FramedClaimTransport(io, window=window)
+    try:
+        claims = [dict(CLAIM, amount_drops=str(1000 + i)) for i in range(10)]
+        claims[4] = dict(claims[4], signature="")
+        results = transport.send_claims(claims)
+        assert [ok for ok, _ in results] == [i != 4 for i in range(10)]
+        assert "signature" in results[4][1]
+        assert [m["claim"]["amount_drops"] for m in io.received] == [c["amount_drops"] for c in claims]
+        assert transport.send_claim(CLAIM) == (True, "ok")  # same stream keeps working
+        assert (transport.sent, transport.acked, transport.nacked) == (11, 10, 1)
+    finally:
+        transport.close()
+
+
+def test_missing_ack_times_out():
+    a, b = socket.socketpair()  # nobody answers on b
+    transport = FramedClaimTransport(SocketIO(a), ack_timeout=0.05)
+    try:
+        with pytest.raises(TransportError):
+            transport.send_claim(CLAIM)
+    finally:
+        transport.close()
+        b.close()
+
+
+def test_timeout_mid_window_keeps_the_acks_that_arrived():
+    def handler(msg):
+        if msg["claim"]["amount_drops"] >= "1003":
+            time.sleep(0.3)  # receiver stalls on the later claims
+        return True, "ok"
+
+    io = LoopbackIO(handler)
+    transport = FramedClaimTransport(io, window=4, ack_timeout=0.1)
+    try:
+        claims = [dict(CLAIM, amount_drops=str(1000 + i)) for i in range(6)]
+        with pytest.raises(PartialSendError) as exc:
+            transport.send_claims(claims)
+        assert exc.value.results == [(True, "ok")] * 3 + [None] * 3
+    finally:
+        transport.close()
+
+
+class _JavaInput:
+    """InputStream stand-in that hands out at most `chunk` bytes per read(byte[], off, len)"""
+    def __init__(self, data, chunk):
+        self.data, self.chunk, self.calls = bytearray(data), chunk, 0
+
+    def available(self):
+        return len(self.data)
+
+    def read(self, buf, off, length):
+        self.calls += 1
+        count = min(length, self.chunk, len(self.data))
+        buf[off:off + count] = self.data[:count]
+        del self.data[:count]
+        return count
+
+
+class _JavaSocket:
+    def __init__(self, stream):
+        self.stream = stream
+
+    def getOutputStream(self):
+        return None
+
+    def getInputStream(self):
+        return self.stream
+
+
+def test_android_read_exact_reads_in_bulk():
+    frame = encode_frame({"ack": 1, "ok": True, "reason": "x" * 200})
+    stream = _JavaInput(frame, chunk=128)
+    assert read_frame(AndroidStreamIO(_JavaSocket(stream)), timeout=1) == {"ack": 1, "ok": True, "reason": "x" * 200}
+    assert stream.calls == 3  # header, then the payload in two chunks
@@ -0,0 +1,31 @@
+import json
+import os
+import sys
+
+import pytest
+from xrpl.core.keypairs import is_valid_message
+
+from claim_codec import encode_for_signing_claim
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+import bench_buyer_startup as bench  # noqa: E402
+
+
+@pytest.mark.parametrize("algorithm", ["ed25519", "secp256k1"])
+def test_cold_start_claim_is_valid(tmp_path, algorithm):
+    w = bench.write_wallet(str(tmp_path), algorithm)
+    res = bench.run_once(str(tmp_path))
+    claim = res["claim"]
+    assert claim["pubkey"] == w.public_key and claim["key_type"] == algorithm
+    msg = encode_for_signing_claim(claim["channel_id"], claim["amount_drops"])
+    assert is_valid_message(msg, bytes.fromhex(claim["signature"]), w.public_key)
+    # Ed25519 claims never pull in xrpl-py
+    assert res["xrpl_imported"] == (algorithm == "secp256k1")
+
+
+def test_old_wallet_file_gets_key_cache(tmp_path):
+    w = bench.write_wallet(str(tmp_path), "ed25519")
+    path = tmp_path / ".xrpl_buyer" / "wallet.json"
+    path.write_text(json.dumps({"seed": w.seed, "address": w.classic_address, "public_key": w.public_key}))
+    bench.run_once(str(tmp_path))
+    assert json.loads(path.read_text())["private_key"] == w.private_key
@@ -0,0 +1,54 @@
+import copy
+import json
+import os
+
+import pytest
+
+from channel_id import channel_id_from_result, channel_id_from_tx, create_sequence, paychannel_id
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Testnet PaymentChannelCreate recorded in tools/open_channel_result.json
+SRC = "r9Uags6kSd9iG3vFY3NSpPzPZkq3xDz49e"
+DST = "ra58fbivy22z5a2q3S1QQfUz6EbY9e5DRa"
+SEQ = 11174383
+CH = "1B06D34C0C4A1D8DDF188D35A33A9AEB394DD01EAF03D383BEFF334F06BA0994"
+
+
+@pytest.fixture
+def recorded():
+    with open(os.path.join(ROOT, "tools", "open_channel_result.json"), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_ledger_vector():
+    assert paychannel_id(SRC, DST, SEQ) == CH
+
+
+def test_derived_id_matches_created_node(recorded):
+    created = [n["CreatedNode"] for n in recorded["meta"]["AffectedNodes"]
+               if n.get("CreatedNode", {}).get("LedgerEntryType") == "PayChannel"]
+    assert channel_id_from_tx(recorded["tx_json"]) == created[0]["LedgerIndex"] == CH
+    assert channel_id_from_result(recorded) == CH
+
+
+def test_derives_without_metadata(recorded):
+    res = copy.deepcopy(recorded)
+    res["meta"]["AffectedNodes"] = [n for n in res["meta"]["AffectedNodes"] if "CreatedNode" not in n]
+    assert channel_id_from_result(res) == CH
+
+
+def test_failed_create_has_no_channel(recorded):
+    res = copy.deepcopy(recorded)
+    res["meta"]["TransactionResult"] = "tecUNFUNDED"
+    assert channel_id_from_result(res) is None
+
+
+def test_ticket_sequence_is_used_when_sequence_is_zero():
+    tx = {"TransactionType": "PaymentChannelCreate", "Account": SRC, "Destination": DST,
+          "Sequence": 0, "TicketSequence": SEQ}
+    assert create_sequence(tx) == SEQ
+    assert channel_id_from_tx(tx) == CH
+    assert channel_id_from_tx(dict(tx, TicketSequence=SEQ + 1)) != CH
+    with pytest.raises(ValueError):
+        create_sequence({"Sequence": 0})
@@ -0,0 +1,108 @@
+import threading
+import time
+
+from channel_keys import ChannelKeyCache
+from kv_store import KVStore
+
+CH = "ab" * 32
+PK = "ED" + "11" * 32
+
+
+class _Clock:
+    def __init__(self):
+        self.t = 1000.0
+
+    def __call__(self):
+        return self.t
+
+
+def test_persistent_hit_needs_no_network(tmp_path):
+    calls = []
+    kv = KVStore(str(tmp_path / "kv.log"))
+    cache = ChannelKeyCache(kv, lambda ch: calls.append(ch) or PK)
+    assert cache.get(CH) == PK
+    kv.close()
+    kv = KVStore(str(tmp_path / "kv.log"))
+    cache = ChannelKeyCache(kv, lambda ch: calls.append(ch) or None)
+    assert cache.get(CH, allow_network=False) == PK
+    assert cache.get(CH.upper()) == PK and calls == [CH.upper()]
+    kv.close()
+
+
+def test_concurrent_lookups_share_one_request(tmp_path):
+    kv = KVStore(str(tmp_path / "kv.log"))
+    gate = threading.Event()
+
+    def slow_fetch(ch):
+        gate.wait(2)
+        return PK
+
+    cache = ChannelKeyCache(kv, slow_fetch)
+    out = []
+    threads = [threading.Thread(target=lambda: out.append(cache.get(CH))) for _ in range(10)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    gate.set()
+    for t in threads:
+        t.join()
+    assert out == [PK] * 10 and cache.network_fetches == 1
+    kv.close()
+
+
+def test_stale_served_then_refreshed_and_invalidate(tmp_path):
+    kv = KVStore(str(tmp_path / "kv.log"))
+    clk = _Clock()
+    keys = iter([PK, "ED" + "22" * 32])
+    cache = ChannelKeyCache(kv, lambda ch: next(keys), ttl_s=10, clock=clk)
+    assert cache.get(CH) == PK
+    clk.t += 11
+    assert cache.get(CH) == PK  # stale still served, refresh runs in background
+    for _ in range(100):
+        if cache.get(CH, allow_network=False) != PK:
+            break
+        time.sleep(0.01)
+    assert cache.get(CH, allow_network=False) == "ED" + "22" * 32
+    cache.invalidate(CH)
+    assert cache.get(CH, allow_network=False) is None
+    assert cache.warm([CH]) == 0  # known missing: no lookup until the negative entry ages out
+    clk.t += cache.negative_ttl_s + 1
+    assert cache.warm([CH]) == 1
+    kv.close()
+
+
+def test_closed_channel_is_invalidated_and_negatively_cached(tmp_path):
+    from channel_snapshot import ChannelSnapshot
+    from receipts_cache import ReceiptsCache
+
+    kv = KVStore(str(tmp_path / "kv.log"))
+    clk = _Clock()
+    calls, online = [], [True]
+
+    def fetch(ch):
+        calls.append(ch)
+        if not online[0]:
+            raise ConnectionError("offline")
+        return None  # entryNotFound
+
+    cache = ChannelKeyCache(kv, fetch, ttl_s=10, clock=clk)
+    cache.put(CH, PK)
+    # refresh_channel finds the channel gone -> the snapshot drops it and its key
+    snap = ChannelSnapshot(kv, lambda method, params: {"error": "entryNotFound"}, "rMerchant", key_cache=cache)
+    assert snap.refresh_channel(CH) is None
+    assert cache.get(CH) is None and calls == []  # negative hit: no network
+    clk.t += cache.negative_ttl_s + 1
+    assert cache.get(CH) is None and len(calls) == 1  # looked up again, still missing
+
+    # offline failures keep a cached key; a channel-closed receipt drops it
+    other = "cd" * 32
+    cache.put(other, PK)
+    clk.t += 11
+    online[0] = False
+    assert cache.get(other) == PK
+    time.sleep(0.05)
+    assert cache.get(other, allow_network=False) == PK
+    ReceiptsCache(kv, on_closed=cache.invalidate)._apply(
+        {"channel_id": other, "amount_drops": 5, "tx_hash": "T", "closed": True})
+    assert cache.get(other, allow_network=False) is None
+    kv.close()
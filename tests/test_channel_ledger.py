@@ -0,0 +1,103 @@
+import json
+
+import pytest
+
+from channel_ledger import ChannelLedger, ChannelLedgerError
+
+CH = "1b06d34c0c4a1d8ddf188d35a33a9aeb394dd01eaf03d383beff334f06ba0994"
+
+
+def test_increments_accumulate_and_survive_restart(tmp_path):
+    path = tmp_path / "channels.json"
+    ledger = ChannelLedger(path)
+    ledger.add_channel(CH, 2_000_000, destination="rMerchant", dest_tag=700123)
+    assert ledger.authorize(CH, 250_000) == 250_000
+    ledger.acknowledge(CH, 250_000)
+    assert ledger.authorize(CH, 250_000) == 500_000
+    ledger.acknowledge(CH, 500_000)
+
+    again = ChannelLedger(path)
+    assert again.current_id == CH.upper()
+    assert again.current["signed_drops"] == 500_000 and again.current["claims"] == 2
+    assert again.authorize(CH.upper(), 1_500_000) == 2_000_000
+    assert again.remaining(CH) == 0
+
+
+def test_over_capacity_and_bad_price_do_not_move_total(tmp_path):
+    ledger = ChannelLedger(tmp_path / "channels.json")
+    ledger.add_channel(CH, 1_000_000)
+    ledger.acknowledge(CH, ledger.authorize(CH, 900_000))
+    with pytest.raises(ChannelLedgerError):
+        ledger.authorize(CH, 200_000)
+    with pytest.raises(ChannelLedgerError):
+        ledger.authorize(CH, 0)
+    assert ChannelLedger(tmp_path / "channels.json").get(CH)["signed_drops"] == 900_000
+
+    ledger.set_capacity(CH, 2_000_000)  # after funding
+    assert ledger.authorize(CH, 200_000) == 1_100_000
+    with pytest.raises(ChannelLedgerError):
+        ledger.authorize("00" * 32, 1)
+
+
+def test_reopening_keeps_signed_total(tmp_path):
+    ledger = ChannelLedger(tmp_path / "channels.json")
+    ledger.add_channel(CH, 1_000_000)
+    ledger.acknowledge(CH, ledger.authorize(CH, 400_000))
+    ledger.add_channel(CH, 3_000_000)
+    assert ledger.get(CH)["signed_drops"] == 400_000
+    assert not (tmp_path / "channels.json.tmp").exists()
+    assert json.loads((tmp_path / "channels.json").read_text())["current"] == CH.upper()
+
+
+def test_pending_total_commits_on_ack_and_holds_floor_on_nack(tmp_path):
+    path = tmp_path / "channels.json"
+    ledger = ChannelLedger(path)
+    ledger.add_channel(CH, 1_000_000)
+
+    assert ledger.authorize(CH, 300_000) == 300_000
+    assert ledger.get(CH)["signed_drops"] == 0 and ledger.remaining(CH) == 700_000
+    with pytest.raises(ChannelLedgerError):
+        ledger.authorize(CH, 100_000)  # no stacking on an unacknowledged claim
+
+    # lost ack / restart: the same total is still pending and gets resent
+    again = ChannelLedger(path)
+    assert again.pending_drops(CH) == 300_000
+    assert not again.acknowledge(CH, 200_000)
+    assert again.acknowledge(CH, 300_000)
+    assert again.get(CH)["signed_drops"] == 300_000 and again.get(CH)["claims"] == 1
+    assert again.pending_drops(CH) is None
+
+
+def test_resend_refused_as_stale_does_not_loop(tmp_path):
+    path = tmp_path / "channels.json"
+    ledger = ChannelLedger(path)
+    ledger.add_channel(CH, 1_000_000)
+    first = ledger.authorize(CH, 200_000)
+    # first send dispensed but its ack was lost; the resend of the same total is refused as stale
+    assert ledger.pending_drops(CH) == first
+    assert ledger.reject(CH, first)
+
+    # the refused total was handed out: it is the floor, the next sale goes above it
+    assert ChannelLedger(path).get(CH)["signed_drops"] == first
+    assert ledger.remaining(CH) == 800_000
+    assert ledger.authorize(CH, 100_000) == 300_000
+    assert ledger.get(CH)["refused"] == 1 and ledger.get(CH)["claims"] == 0
+
+
+def test_opening_channel_is_recorded_until_validated_or_dropped(tmp_path):
+    path = tmp_path / "channels.json"
+    ledger = ChannelLedger(path)
+    ledger.add_channel(CH, 1_000_000, make_current=False, status="opening")
+    again = ChannelLedger(path)
+    assert again.get(CH)["status"] == "opening" and again.current_id is None
+    with pytest.raises(ChannelLedgerError):
+        again.authorize(CH, 1)  # not on the ledger yet
+
+    again.add_channel(CH, 1_000_000)  # validated
+    assert again.get(CH)["status"] == "open" and again.current_id == CH.upper()
+    assert not again.drop_opening(CH)
+
+    other = "00" * 32
+    again.add_channel(other, 5, make_current=False, status="opening")
+    assert again.drop_opening(other)  # rejected or expired: no channel exists
+    assert ChannelLedger(path).get(other) is None
@@ -0,0 +1,105 @@
+from channel_snapshot import RIPPLE_EPOCH, ChannelSnapshot
+from kv_store import KVStore
+
+MERCHANT = "rMerchant1111111111111111111111111"
+OTHER = "rOther11111111111111111111111111111"
+
+
+def _chan(i, dest=MERCHANT, **extra):
+    node = {"LedgerEntryType": "PayChannel", "index": f"{i:064X}", "Account": f"rBuyer{i}",
+            "Destination": dest, "Amount": "5000000", "Balance": "1000000",
+            "PublicKey": "ED" + "AA" * 32, "SettleDelay": 600}
+    node.update(extra)
+    return node
+
+
+class FakeLedger:
+    def __init__(self, objects, txs=()):
+        self.objects = objects
+        self.txs = list(txs)
+        self.calls = []
+
+    def __call__(self, method, params):
+        self.calls.append((method, dict(params)))
+        if method == "account_objects":
+            start = int(params.get("marker") or 0)
+            page = self.objects[start:start + params["limit"]]
+            res = {"account_objects": page, "ledger_index": 100}
+            if start + params["limit"] < len(self.objects):
+                res["marker"] = str(start + params["limit"])
+            return res
+        if method == "account_tx":
+            return {"transactions": self.txs, "ledger_index_max": 120}
+        raise AssertionError(method)
+
+
+def test_full_sync_paginates_and_prechecks(tmp_path):
+    kv = KVStore(str(tmp_path / "kv.log"))
+    objs = [_chan(i) for i in range(5)] + [_chan(9, dest=OTHER), _chan(7, Expiration=10)]
+    rpc = FakeLedger(objs)
+    snap = ChannelSnapshot(kv, rpc, MERCHANT, page_limit=2)
+    assert snap.sync() == 6
+    assert [c[1].get("ledger_index") for c in rpc.calls] == ["validated", 100, 100, 100]
+    assert snap.synced_ledger == 100 and snap.get(f"{9:064X}") is None
+    ch = f"{1:064X}"
+    assert snap.precheck(ch, 2_000_000) == (True, "")
+    assert snap.precheck(ch, 6_000_000) == (False, "exceeds_channel_amount")
+    assert snap.precheck(ch, 1_000_000) == (False, "already_claimed_on_ledger")
+    assert snap.precheck(f"{7:064X}", 2_000_000, now=RIPPLE_EPOCH + 11) == (False, "channel_expired")
+    assert snap.precheck("FF" * 32, 10**12) == (True, "")  # unknown channel
+    kv.close()
+
+
+def test_incremental_sync_applies_meta(tmp_path):
+    kv = KVStore(str(tmp_path / "kv.log"))
+    snap = ChannelSnapshot(kv, FakeLedger([_chan(1), _chan(2)]), MERCHANT)
+    snap.sync()
+    ch1, ch2, ch3 = (f"{i:064X}" for i in (1, 2, 3))
+    fund = dict(_chan(1, Amount="9000000"))
+    fund["LedgerIndex"] = ch1
+    created = {"LedgerEntryType": "PayChannel", "LedgerIndex": ch3,
+               "NewFields": {"Account": "rB3", "Destination": MERCHANT, "Amount": "700"}}
+    txs = [
+        {"validated": True, "ledger_index": 110,
+         "meta": {"AffectedNodes": [{"ModifiedNode": {"LedgerEntryType": "PayChannel", "LedgerIndex": ch1,
+                                                       "FinalFields": fund}}]}},
+        {"validated": True, "ledger_index": 111,
+         "meta": {"AffectedNodes": [{"CreatedNode": created},
+                                    {"DeletedNode": {"LedgerEntryType": "PayChannel", "LedgerIndex": ch2,
+                                                     "FinalFields": {}}}]}},
+    ]
+    snap._rpc = FakeLedger([], txs)
+    assert snap.sync() == 3
+    assert snap.synced_ledger == 120
+    assert snap.get(ch1)["amount"] == 9_000_000
+    assert snap.get(ch2) is None
+    assert snap.get(ch3)["balance"] == 0 and snap.get(ch3)["amount"] == 700
+    assert snap._rpc.calls[0][1]["ledger_index_min"] == 101
+    kv.close()
+
+
+def test_precheck_refreshes_before_capacity_decline(tmp_path):
+    kv = KVStore(str(tmp_path / "kv.log"))
+    ch = f"{1:064X}"
+    entries = {ch: dict(_chan(1), Amount="9000000")}  # funded since the snapshot
+    online = [True]
+
+    def rpc(method, params):
+        if method == "ledger_entry":
+            if not online[0]:
+                raise ConnectionError("offline")
+            node = entries.get(params["index"])
+            return {"node": node, "ledger_index": 130} if node else {"error": "entryNotFound"}
+        return FakeLedger([_chan(1)])(method, params)
+
+    snap = ChannelSnapshot(kv, rpc, MERCHANT)
+    snap.sync()
+    online[0] = False
+    assert snap.precheck(ch, 6_000_000, refresh=True) == (False, "exceeds_channel_amount")  # stale
+    online[0] = True
+    assert snap.precheck(ch, 6_000_000) == (False, "exceeds_channel_amount")  # no refresh asked
+    assert snap.precheck(ch, 6_000_000, refresh=True) == (True, "")
+    assert snap.get(ch)["amount"] == 9_000_000
+    del entries[ch]
+    assert snap.precheck(ch, 9_500_000, refresh=True) == (False, "channel_closed")
+    kv.close()
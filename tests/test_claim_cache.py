@@ -0,0 +1,46 @@
+import os
+
+from claim_cache import SeenFilter, VerdictCache
+
+
+class _Clock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def test_verdict_cache_size_and_age_eviction():
+    clk = _Clock()
+    c = VerdictCache(max_size=2, ttl_s=10, clock=clk)
+    k1, k2, k3 = (VerdictCache.key("ab" * 32, i, "SIG", "ED00") for i in (1, 2, 3))
+    c.put(k1, True)
+    c.put(k2, False)
+    assert c.get(k1) is True  # k1 now most recent
+    c.put(k3, True)
+    assert c.get(k2) is None and c.get(k1) is True and c.get(k3) is True
+    clk.t = 11
+    assert c.get(k1) is None and len(c) == 1
+
+
+def test_verdict_key_normalises():
+    assert VerdictCache.key("ab", " 0100 ", "sig", " ed01") == VerdictCache.key("AB", 100, "SIG", "ED01")
+
+
+def test_verdict_is_per_pubkey():
+    c = VerdictCache()
+    c.put(VerdictCache.key("AB", 100, "SIG", "ED01"), True)
+    assert c.get(VerdictCache.key("AB", 100, "SIG", "ED02")) is None
+
+
+def test_seen_filter_no_false_negatives_across_rotation():
+    f = SeenFilter(capacity=1000, fp_rate=0.01)
+    sigs = [os.urandom(64).hex() for _ in range(1500)]
+    for s in sigs:
+        f.add(s)
+    # last full generation plus the current one are always remembered
+    assert all(f.might_contain(s) for s in sigs[1000:])
+    fresh = [os.urandom(64).hex() for _ in range(2000)]
+    fp = sum(f.might_contain(s) for s in fresh)
+    assert fp < 100
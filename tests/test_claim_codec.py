@@ -0,0 +1,36 @@
+import random
+
+import pytest
+from xrpl.core.binarycodec import encode_for_signing_claim as codec_encode
+
+from claim_codec import CLAIM_MSG_LEN, encode_claim, encode_for_signing_claim
+
+
+def _codec(ch, amt):
+    return bytes.fromhex(codec_encode({"channel": ch, "amount": str(amt)}))
+
+
+def test_fast_path_matches_codec_random():
+    rng = random.Random(1234)
+    for _ in range(2000):
+        ch = rng.getrandbits(256).to_bytes(32, "big").hex()
+        ch = ch.upper() if rng.random() < 0.5 else ch
+        amt = rng.choice([0, 1, rng.getrandbits(rng.randint(1, 63)), 10**17])
+        fast = encode_claim(ch, amt)
+        assert len(fast) == CLAIM_MSG_LEN
+        assert fast == _codec(ch, amt)
+        assert encode_claim(ch, f" {amt} ") == fast  # same normalisation as the codec path
+
+
+def test_rejects_bad_input():
+    with pytest.raises(ValueError):
+        encode_claim("AB" * 31, 1)
+    with pytest.raises(ValueError):
+        encode_claim("AB" * 32, -1)
+    with pytest.raises(ValueError):
+        encode_claim("AB" * 32, 1 << 64)
+
+
+def test_codec_fallback_still_raises_on_garbage():
+    with pytest.raises(Exception):
+        encode_for_signing_claim("not-hex", 1)
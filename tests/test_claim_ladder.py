@@ -0,0 +1,46 @@
+import json
+
+import pytest
+from xrpl.constants import CryptoAlgorithm
+from xrpl.core.keypairs import is_valid_message
+from xrpl.core.keypairs import sign as xrpl_sign
+from xrpl.wallet import Wallet
+
+import buyer_claim_tool as tool
+from claim_codec import encode_for_signing_claim
+
+CH = "1B06D34C0C4A1D8DDF188D35A33A9AEB394DD01EAF03D383BEFF334F06BA0994"
+
+
+@pytest.mark.parametrize("algo", [CryptoAlgorithm.ED25519, CryptoAlgorithm.SECP256K1])
+def test_ladder_rungs_are_valid_cumulative_claims(tmp_path, algo):
+    w = Wallet.create(algorithm=algo)
+    out = tmp_path / "ladder.jsonl"
+    n = tool.make_ladder(CH, w, step_drops=100_000, max_drops=1_050_000, out=str(out), workers=2, chunk=3)
+    claims = [json.loads(line) for line in out.read_text().splitlines()]
+    assert n == len(claims) == 10
+    assert [int(c["amount_drops"]) for c in claims] == list(range(100_000, 1_000_001, 100_000))
+    for c in claims:
+        msg = encode_for_signing_claim(CH, c["amount_drops"])
+        assert is_valid_message(msg, bytes.fromhex(c["signature"]), w.public_key)
+        assert c["key_type"] == algo.value
+
+
+def test_ed25519_fast_path_matches_xrpl_sign(tmp_path):
+    w = Wallet.create(algorithm=CryptoAlgorithm.ED25519)
+    out = tmp_path / "ladder.jsonl"
+    tool.make_ladder(CH, w, step_drops=7, max_drops=21, start_drops=7, out=str(out), workers=1)
+    first = json.loads(out.read_text().splitlines()[0])
+    assert first["signature"] == xrpl_sign(encode_for_signing_claim(CH, 7), w.private_key)
+
+
+def test_secp256k1_native_signatures_are_canonical():
+    from cryptography.hazmat.primitives.asymmetric.utils import decode_dss_signature
+
+    w = Wallet.create(algorithm=CryptoAlgorithm.SECP256K1)
+    sign = tool._secp256k1_signer(w.private_key)
+    for amt in range(1, 40):
+        msg = encode_for_signing_claim(CH, amt)
+        sig = sign(msg)
+        assert is_valid_message(msg, bytes.fromhex(sig), w.public_key)
+        assert decode_dss_signature(bytes.fromhex(sig))[1] <= tool._SECP256K1_N // 2  # low-S
@@ -0,0 +1,150 @@
+import threading
+import time
+
+from claim_outbox import DROP, PARK, RETRY, SENT, ClaimOutbox
+from kv_store import KVStore
+
+
+def _claim(ch, amt):
+    return {"channel_id": ch, "amount_drops": str(amt), "signature": "S", "pubkey": "P"}
+
+
+def _wait(pred, timeout=3.0):
+    end = time.time() + timeout
+    while time.time() < end:
+        if pred():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_keeps_only_highest_claim_per_channel(tmp_path):
+    kv = KVStore(str(tmp_path / "kv.log"))
+    box = ClaimOutbox(kv, lambda batch: [RETRY] * len(batch), backoff_base_s=60)
+    for amt in (100, 300, 200):
+        box.put(_claim("AA" * 32, amt))
+    box.put(_claim("BB" * 32, 5))
+    assert sorted(int(c["amount_drops"]) for c in box.pending()) == [5, 300]
+    box.stop()
+    kv.close()
+    kv = KVStore(str(tmp_path / "kv.log"))  # survives restart
+    assert len(ClaimOutbox(kv, lambda b: [RETRY] * len(b), backoff_base_s=60).pending()) == 2
+    kv.close()
+
+
+def test_batches_backoff_and_recovery(tmp_path):
+    kv = KVStore(str(tmp_path / "kv.log"))
+    online = threading.Event()
+    calls = []
+
+    def send(batch):
+        calls.append(len(batch))
+        if not online.is_set():
+            raise ConnectionError("offline")
+        return [DROP if c["channel_id"].startswith("00") else SENT for c in batch]
+
+    box = ClaimOutbox(kv, send, batch_size=4, backoff_base_s=0.05, backoff_max_s=0.2)
+    for i in range(10):
+        box.put(_claim(f"{i:02X}" * 32, 1000 + i))
+    assert _wait(lambda: len(calls) >= 3)
+    assert box.pending()  # nothing lost while offline
+    online.set()
+    box.kick()
+    assert _wait(lambda: not box.pending())
+    assert max(calls) <= 4 and box.uploaded == 9
+    box.stop()
+    kv.close()
+
+
+def test_newer_claim_during_upload_is_kept(tmp_path):
+    kv = KVStore(str(tmp_path / "kv.log"))
+    gate = threading.Event()
+    box = None
+
+    def send(batch):
+        gate.wait(2)
+        return [SENT] * len(batch)
+
+    box = ClaimOutbox(kv, send)
+    box.put(_claim("AA" * 32, 100))
+    time.sleep(0.05)
+    box.put(_claim("AA" * 32, 200))  # arrives while 100 is in flight
+    gate.set()
+    assert _wait(lambda: box.uploaded >= 2)
+    assert not box.pending()
+    box.stop()
+    kv.close()
+
+
+def test_paused_until_kick(tmp_path):
+    kv = KVStore(str(tmp_path / "kv.log"))
+    enabled = threading.Event()
+    calls = []
+
+    def send(batch):
+        calls.append(len(batch))
+        return [SENT] * len(batch) if enabled.is_set() else None
+
+    box = ClaimOutbox(kv, send)
+    box.put(_claim("AA" * 32, 1))
+    assert _wait(lambda: calls == [1])
+    time.sleep(0.1)
+    assert calls == [1]  # no retry loop while paused
+    enabled.set()
+    box.kick()
+    assert _wait(lambda: not box.pending())
+    box.stop()
+    kv.close()
+
+
+def test_failing_channels_do_not_starve_others(tmp_path):
+    kv = KVStore(str(tmp_path / "kv.log"))
+    bad = {f"{i:02X}" * 32 for i in range(3)}  # sort first, refused every time
+
+    def send(batch):
+        return [PARK if c["channel_id"] in bad else SENT for c in batch]
+
+    box = ClaimOutbox(kv, send, batch_size=3, backoff_base_s=60, backoff_max_s=60)
+    for i in range(9):
+        box.put(_claim(f"{i:02X}" * 32, 1000 + i))
+    assert _wait(lambda: box.uploaded == 6)
+    assert {c["channel_id"] for c in box.pending()} == bad
+    box.stop()
+    kv.close()
+
+
+def test_new_claim_skips_backoff(tmp_path):
+    kv = KVStore(str(tmp_path / "kv.log"))
+    online = threading.Event()
+
+    def send(batch):
+        if not online.is_set():
+            raise ConnectionError("offline")
+        return [SENT] * len(batch)
+
+    box = ClaimOutbox(kv, send, backoff_base_s=60, backoff_max_s=60)
+    box.put(_claim("AA" * 32, 1))
+    assert _wait(lambda: box._failures == 1)  # backed off for ~60s
+    online.set()
+    box.put(_claim("BB" * 32, 1))  # newly approved claim goes out now
+    assert _wait(lambda: not box.pending())
+    box.stop()
+    kv.close()
+
+
+def test_index_avoids_store_scans(tmp_path):
+    kv = KVStore(str(tmp_path / "kv.log"))
+    for i in range(200):
+        kv.set(f"last_seen:{i:064X}", i, wait=False)  # unrelated keys in the same store
+    kv.set("outbox:" + "CC" * 32, _claim("CC" * 32, 7))  # left over from a previous run
+    scans = []
+    keys = kv.keys
+    kv.keys = lambda prefix="": scans.append(prefix) or keys(prefix)
+    sent = []
+    box = ClaimOutbox(kv, lambda batch: sent.extend(batch) or [SENT] * len(batch))
+    for i in range(5):
+        box.put(_claim(f"{i:02X}" * 32, 100 + i))
+    assert _wait(lambda: len(sent) == 6 and not box.pending())
+    assert scans == ["outbox:"]  # once, at startup
+    box.stop()
+    kv.close()
@@ -0,0 +1,55 @@
+import threading
+
+from claim_pipeline import ClaimPipeline
+
+
+def test_stages_hand_off_in_order_and_drop_on_none():
+    out, errors = [], []
+    p = ClaimPipeline(
+        [("verify", lambda j: j if j % 2 == 0 else None),
+         ("vend", lambda j: j * 10),
+         ("queue", lambda j: out.append(j))],
+        on_error=lambda stage, job, e: errors.append((stage, job)),
+    )
+    for j in range(6):
+        assert p.submit(j)
+    p.stop()
+    assert out == [0, 20, 40] and errors == []
+
+
+def test_slow_upload_does_not_block_next_verify():
+    release = threading.Event()
+    verified = []
+    p = ClaimPipeline([("verify", lambda j: verified.append(j) or j),
+                       ("queue", lambda j: release.wait(5))])
+    p.submit("first")
+    p.submit("second")
+    for _ in range(200):
+        if len(verified) == 2:
+            break
+        threading.Event().wait(0.01)
+    assert verified == ["first", "second"]  # second verified while first still uploading
+    assert p.pending()["queue"] >= 1
+    release.set()
+    p.stop()
+
+
+def test_errors_reported_and_backpressure():
+    errors = []
+    gate = threading.Event()
+
+    def boom(j):
+        gate.wait(5)
+        raise ValueError(j)
+
+    p = ClaimPipeline([("verify", boom)], on_error=lambda s, j, e: errors.append((s, j)), maxsize=1)
+    assert p.submit(1)
+    for _ in range(200):
+        if p.pending()["verify"] == 1 and p._queues[0].qsize() == 0:
+            break
+        threading.Event().wait(0.01)
+    assert p.submit(2)
+    assert not p.submit(3)  # queue full
+    gate.set()
+    p.stop()
+    assert errors == [("verify", 1), ("verify", 2)]
@@ -1,6 +1,7 @@
 import json
 from xrpl.core.binarycodec import encode_for_signing_claim
 from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
 
 def test_local_verify_roundtrip():
     sk = Ed25519PrivateKey.generate()
@@ -10,4 +11,4 @@ def test_local_verify_roundtrip():
     msg_hex = encode_for_signing_claim({"channel": ch, "amount": amt})
     sig = sk.sign(bytes.fromhex(msg_hex)).hex().upper()
     from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
-    Ed25519PublicKey.from_public_bytes(pk.public_bytes()).verify(bytes.fromhex(sig), bytes.fromhex(msg_hex))
+    Ed25519PublicKey.from_public_bytes(pk.public_bytes(Encoding.Raw, PublicFormat.Raw)).verify(bytes.fromhex(sig), bytes.fromhex(msg_hex))
@@ -0,0 +1,105 @@
+import json
+import threading
+
+import pytest
+
+from kv_store import KVStore
+
+
+def test_set_get_and_reopen(tmp_path):
+    p = str(tmp_path / "kv.log")
+    kv = KVStore(p)
+    kv.set("last_seen:AA", 100)
+    kv.set("last_seen:AA", 200)
+    kv.set("settled:AA", 50, wait=False)
+    kv.close()
+    kv = KVStore(p)
+    assert kv.get("last_seen:AA") == 200 and kv.get("settled:AA") == 50
+    assert kv.get("missing", 7) == 7
+    kv.close()
+
+
+def test_torn_tail_is_dropped(tmp_path):
+    p = str(tmp_path / "kv.log")
+    kv = KVStore(p)
+    kv.set("a", 1)
+    kv.close()
+    with open(p, "ab") as f:
+        f.write(b'deadbeef ["b",')  # crash mid-append
+    kv = KVStore(p)
+    assert kv.get("a") == 1 and kv.get("b") is None
+    kv.set("c", 3)
+    kv.close()
+    assert KVStore(p).get("c") == 3
+
+
+def test_migrates_legacy_json(tmp_path):
+    legacy = tmp_path / "kv.json"
+    legacy.write_text(json.dumps({"last_seen:BB": 42}))
+    kv = KVStore(str(tmp_path / "kv.log"), legacy_json_path=str(legacy))
+    assert kv.get("last_seen:BB") == 42
+    assert not legacy.exists() and (tmp_path / "kv.json.migrated").exists()
+    kv.close()
+
+
+def test_group_commit_and_compaction(tmp_path):
+    p = str(tmp_path / "kv.log")
+    kv = KVStore(p, commit_interval_s=0.01, compact_min_bytes=4096)
+
+    def writer(n):
+        for i in range(50):
+            kv.set(f"last_seen:{n}", i)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert kv.commits < 400  # concurrent writers shared fsyncs
+    for i in range(2000):
+        kv.set("hot", i, wait=False)
+    kv.flush()
+    kv.close()
+    with open(p, "rb") as f:
+        assert len(f.readlines()) < 2000  # rewritten as a snapshot at least once
+    kv = KVStore(p)
+    assert kv.get("hot") == 1999 and all(kv.get(f"last_seen:{n}") == 49 for n in range(8))
+    kv.close()
+
+
+def test_corrupt_middle_record_keeps_later_ones(tmp_path):
+    p = str(tmp_path / "kv.log")
+    kv = KVStore(p)
+    for k in ("a", "b", "c"):
+        kv.set(f"last_seen:{k}", 1)
+    kv.close()
+    lines = open(p, "rb").read().splitlines(keepends=True)
+    lines[1] = b"00000000" + lines[1][8:]  # bad checksum on "b"
+    open(p, "wb").write(b"".join(lines))
+    kv = KVStore(p)
+    assert kv.get("last_seen:a") == 1 and kv.get("last_seen:c") == 1 and kv.get("last_seen:b") is None
+    assert kv.corrupt_records == 1
+    kv.close()
+    assert len(open(p, "rb").read().splitlines()) == 3  # nothing truncated
+
+
+def test_failed_fsync_is_not_reported_durable(tmp_path, monkeypatch):
+    import kv_store
+
+    kv = KVStore(str(tmp_path / "kv.log"))
+    kv.set("ok", 1)
+    real_fsync = kv_store.os.fsync
+
+    def broken(fd):
+        raise OSError(5, "I/O error")
+
+    monkeypatch.setattr(kv_store.os, "fsync", broken)
+    with pytest.raises(OSError):
+        kv.set("lost", 2)
+    kv.set("later", 3, wait=False)
+    with pytest.raises(OSError):
+        kv.flush()
+    monkeypatch.setattr(kv_store.os, "fsync", real_fsync)
+    kv.set("fine", 4)
+    kv.flush()  # failure already reported
+    kv.close()
@@ -0,0 +1,34 @@
+from xrpl.core.keypairs import is_valid_message
+
+import load_gen
+from claim_codec import encode_for_signing_claim
+
+
+def test_generated_claims_verify_with_xrpl():
+    claims = load_gen.generate_claims(6, 2, secp_ratio=0.5, seed=3)
+    assert {len(c["pubkey"]) for c in claims} == {66}
+    assert any(not c["pubkey"].startswith("ED") for c in claims)
+    for c in claims:
+        msg = encode_for_signing_claim(c["channel_id"], c["amount_drops"])
+        assert is_valid_message(msg, bytes.fromhex(c["signature"]), c["pubkey"])
+
+
+def test_local_replay_reports_declines():
+    claims = load_gen.generate_claims(20, 3, secp_ratio=0.2, bad_sig_ratio=0.1, replay_ratio=0.2, seed=7)
+    target = load_gen.LocalTarget()
+    try:
+        report = load_gen.replay(claims, target, concurrency=4)
+    finally:
+        target.close()
+    bad = sum(1 for c in claims if c.get("expect") == "bad_signature")
+    assert report["requests"] == len(claims) == report["approved"] + report["declined"]
+    assert report["reasons"].get("bad_signature", 0) >= bad and report["bad_signatures_not_caught"] == 0
+    assert report["errors"] == 0 and report["latency_ms"]["p99"] >= report["latency_ms"]["p50"]
+
+
+def test_arrival_patterns():
+    assert load_gen.arrival_offsets(3, "closed") == [None] * 3
+    burst = load_gen.arrival_offsets(5, "burst", burst=2, burst_interval=0.5)
+    assert burst == [0.0, 0.0, 0.5, 0.5, 1.0]
+    poisson = load_gen.arrival_offsets(2000, "poisson", rate=100, seed=1)
+    assert poisson == sorted(poisson) and 15 < poisson[-1] < 25
@@ -0,0 +1,68 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from loop_jobs import JobRejected, LoopJobManager
+
+
+@pytest.fixture
+def loop():
+    lp = asyncio.new_event_loop()
+    t = threading.Thread(target=lp.run_forever, daemon=True)
+    t.start()
+    yield lp
+    lp.call_soon_threadsafe(lp.stop)
+    t.join(2)
+    lp.close()
+
+
+def test_result_and_callback(loop):
+    mgr = LoopJobManager(loop)
+    seen = []
+
+    async def work():
+        return 42
+
+    fut = mgr.submit(work(), on_done=lambda r, e: seen.append((r, e)))
+    assert fut.result(2) == 42
+    time.sleep(0.05)
+    assert seen == [(42, None)] and mgr.completed == 1 and mgr.in_flight == 0
+
+
+def test_deadline_cancels_hung_job(loop):
+    mgr = LoopJobManager(loop)
+    seen = []
+    fut = mgr.submit(asyncio.sleep(10), timeout=0.1, on_done=lambda r, e: seen.append(e))
+    with pytest.raises(asyncio.TimeoutError):
+        fut.result(2)
+    time.sleep(0.05)
+    assert mgr.timed_out == 1 and isinstance(seen[0], asyncio.TimeoutError)
+
+
+def test_concurrency_cap_and_pending_limit(loop):
+    mgr = LoopJobManager(loop, max_concurrent=1, max_pending=3)
+    running, peak = [0], [0]
+
+    async def work():
+        running[0] += 1
+        peak[0] = max(peak[0], running[0])
+        await asyncio.sleep(0.05)
+        running[0] -= 1
+
+    futs = [mgr.submit(work()) for _ in range(4)]
+    with pytest.raises(JobRejected):
+        futs[3].result(1)
+    assert mgr.in_flight == 3
+    for f in futs[:3]:
+        f.result(2)
+    assert peak[0] == 1 and mgr.rejected == 1
+
+
+def test_cancel_all(loop):
+    mgr = LoopJobManager(loop)
+    futs = [mgr.submit(asyncio.sleep(10)) for _ in range(3)]
+    assert mgr.cancel_all() == 3
+    time.sleep(0.05)
+    assert all(f.cancelled() for f in futs) and mgr.in_flight == 0
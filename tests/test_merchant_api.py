@@ -0,0 +1,88 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from merchant_api import AsyncMerchantApiClient, MerchantApiClient, MerchantApiError
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    connections = set()
+    tokens_seen = []
+
+    def log_message(self, *a):
+        pass
+
+    def _reply(self, status, body):
+        raw = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def do_GET(self):
+        _Handler.connections.add(self.client_address)
+        if self.path == "/health":
+            return self._reply(200, {"ok": True})
+        if self.path.startswith("/receipts"):
+            if self.headers.get("Authorization") != "Bearer fresh":
+                return self._reply(401, {"error": "Unauthorized"})
+            return self._reply(200, [{"channel_id": "AA", "amount_drops": 5}])
+        self._reply(404, {})
+
+    def do_POST(self):
+        _Handler.connections.add(self.client_address)
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])) or b"{}")
+        if self.path == "/auth/login":
+            return self._reply(200, {"token": "fresh"})
+        if self.path == "/claims/queue":
+            if "claims" in body:
+                return self._reply(200, {"results": [{"status": 200, "accepted": True} for _ in body["claims"]]})
+            return self._reply(409, {"accepted": False, "reason": "stale_or_lower_amount"})
+        self._reply(404, {})
+
+
+@pytest.fixture()
+def server():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    _Handler.connections.clear()
+    yield f"127.0.0.1:{srv.server_address[1]}"
+    srv.shutdown()
+
+
+def test_sync_calls_reuse_connection_and_relogin(server):
+    api = MerchantApiClient(server, token="expired", email="a@b.c", password="x")
+    for _ in range(5):
+        assert api.health() == {"ok": True}
+    assert api.receipts() == [{"channel_id": "AA", "amount_drops": 5}]  # 401 -> login -> retry
+    assert api.token == "fresh"
+    assert api.queue_claims([{"channel_id": "AA"}] * 3)[0]["accepted"] is True
+    with pytest.raises(MerchantApiError) as e:
+        api.queue_claim({"channel_id": "AA"})
+    assert e.value.status == 409 and e.value.body["reason"] == "stale_or_lower_amount"
+    assert len(_Handler.connections) == 1  # one keep-alive connection for every call
+    api.close()
+
+
+def test_async_interface(server):
+    async def run():
+        api = AsyncMerchantApiClient(server, max_concurrency=4)
+        out = await asyncio.gather(*(api.health() for _ in range(8)))
+        await api.aclose()
+        return out
+
+    assert asyncio.run(run()) == [{"ok": True}] * 8
+
+
+def test_on_call_reports_latency_and_status(server):
+    calls = []
+    api = MerchantApiClient(server, on_call=lambda ep, s, st: calls.append((ep, st)))
+    api.health()
+    with pytest.raises(MerchantApiError):
+        api.queue_claim({"channel_id": "AA", "amount_drops": "1"})
+    assert calls == [("health", 200), ("queue", 409)]
@@ -0,0 +1,37 @@
+import json
+
+from metrics import Registry
+
+
+def test_histogram_quantiles_and_counters():
+    reg = Registry()
+    for _ in range(90):
+        reg.observe("verify_claim", 0.0002)
+    for _ in range(10):
+        reg.observe("verify_claim", 0.02)
+    reg.inc("claims_approved", 3)
+    reg.inc("claims_declined")
+    snap = reg.snapshot()
+    h = snap["latency"]["verify_claim"]
+    assert h["count"] == 100 and h["p50_s"] == 0.00025 and h["p99_s"] == 0.025
+    assert snap["counters"] == {"claims_approved": 3, "claims_declined": 1}
+
+
+def test_timed_decorator_and_exports(tmp_path):
+    reg = Registry()
+
+    @reg.timed("encode_claim")
+    def encode(x):
+        return x * 2
+
+    assert encode(2) == 4
+    reg.set_gauge("ble_notify_dropped", 7)
+    text = reg.prometheus_text()
+    assert 'kiosk_encode_claim_seconds_bucket{le="+Inf"} 1' in text
+    assert "kiosk_encode_claim_seconds_count 1" in text
+    assert "kiosk_ble_notify_dropped 7" in text
+
+    reg.write(str(tmp_path / "m.prom"))
+    reg.write(str(tmp_path / "m.json"))
+    assert (tmp_path / "m.prom").read_text() == text
+    assert json.loads((tmp_path / "m.json").read_text())["latency"]["encode_claim"]["count"] == 1
@@ -0,0 +1,72 @@
+import threading
+
+import pytest
+from xrpl.clients import JsonRpcClient
+from xrpl.models.transactions import PaymentChannelCreate
+from xrpl.wallet import Wallet
+
+import local_rpc_standin
+from channel_id import channel_id_from_result
+from net_worker import NetWorker, submit_with_progress
+
+DEST = "ra58fbivy22z5a2q3S1QQfUz6EbY9e5DRa"
+
+
+@pytest.fixture
+def worker():
+    w = NetWorker()
+    yield w
+    w.shutdown()
+
+
+def _wait(job):
+    job.future.result(timeout=10)
+
+
+def test_open_channel_streams_progress(worker):
+    srv, url = local_rpc_standin.serve()
+    try:
+        wallet = Wallet.create()
+        stages, done = [], []
+
+        def do_open(job):
+            tx = PaymentChannelCreate(account=wallet.classic_address, destination=DEST, amount="1000000",
+                                      settle_delay=60, public_key=wallet.public_key)
+            return submit_with_progress(job, JsonRpcClient(url), wallet, tx, poll_s=0.01,
+                                        on_signed=lambda s: job.progress(
+                                            "channel_id", channel_id=channel_id_from_result({"tx_json": s.to_xrpl()})))
+
+        job = worker.submit(do_open, on_progress=lambda stage, info: stages.append((stage, info)),
+                            on_done=lambda res, err: done.append((res, err)))
+        _wait(job)
+        names = [s for s, _ in stages]
+        assert names[0] == "channel_id" and names[1] == "submitted" and names[-1] == "validated"
+        result, err = done[0]
+        assert err is None
+        assert channel_id_from_result(result) == stages[0][1]["channel_id"] in srv.state.channels
+    finally:
+        srv.shutdown()
+        srv.server_close()
+
+
+def test_cancel_drops_result(worker):
+    started, done = threading.Event(), []
+
+    def slow(job):
+        started.set()
+        job.sleep(5)
+        return "late"
+
+    job = worker.submit(slow, on_done=lambda res, err: done.append(res))
+    assert started.wait(5)
+    assert job.cancel()
+    _wait(job)
+    assert done == [] and worker.busy == 0
+    assert not job.cancel()  # already finished
+
+
+def test_errors_reach_on_done(worker):
+    done = []
+    job = worker.submit(lambda job: 1 / 0, on_done=lambda res, err: done.append(err))
+    _wait(job)
+    assert isinstance(done[0], ZeroDivisionError)
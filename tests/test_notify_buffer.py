@@ -0,0 +1,27 @@
+from notify_buffer import NotifyBuffer
+
+
+def _buffer(capacity=4):
+    scheduled, batches = [], []
+    buf = NotifyBuffer(batches.append, scheduled.append, capacity=capacity)
+    return buf, scheduled, batches
+
+
+def test_burst_is_one_callback_and_one_batch():
+    buf, scheduled, batches = _buffer(capacity=16)
+    for i in range(10):
+        buf.push(f"s{i}".encode())
+    assert len(scheduled) == 1
+    scheduled.pop()(0)
+    assert batches == [[f"s{i}".encode() for i in range(10)]]
+    buf.push(b"next")
+    assert len(scheduled) == 1  # a new frame is scheduled after a flush
+
+
+def test_overflow_keeps_newest_and_counts_drops():
+    buf, scheduled, batches = _buffer(capacity=4)
+    for i in range(7):
+        buf.push(bytes([i]))
+    scheduled[0](0)
+    assert batches == [[bytes([i]) for i in range(3, 7)]]
+    assert buf.dropped == 3 and buf.delivered == 4
@@ -0,0 +1,103 @@
+import asyncio
+import json
+
+import pytest
+from xrpl.wallet import Wallet
+
+import buyer_claim_tool as tool
+import local_rpc_standin
+
+DEST = "ra58fbivy22z5a2q3S1QQfUz6EbY9e5DRa"
+
+
+@pytest.fixture
+def rpc():
+    srv, url = local_rpc_standin.serve()
+    yield srv, url
+    srv.shutdown()
+    srv.server_close()
+
+
+def _manifest(tmp_path, seeds):
+    ops = []
+    for name in seeds:
+        for i in range(3):
+            cid = f"{name}-{i}"
+            ops.append({"id": cid, "op": "open", "account": name, "amount_xrp": 5})
+            ops.append({"id": cid + "-fund", "op": "fund", "account": name, "channel": "@" + cid, "add_xrp": 2})
+            ops.append({"id": cid + "-claim", "op": "claim", "account": name, "channel": "@" + cid,
+                        "cum_xrp": 1.5, "out": str(tmp_path / f"{cid}.json")})
+    return {"defaults": {"destination": DEST, "settle_delay": 60},
+            "accounts": {name: {"seed": seed} for name, seed in seeds.items()},
+            "operations": ops}
+
+
+@pytest.mark.parametrize("sequencing", ["local", "tickets"])
+def test_provision_manifest_against_standin(tmp_path, rpc, sequencing):
+    srv, url = rpc
+    seeds = {"a": Wallet.create().seed, "b": Wallet.create().seed}
+    path = tmp_path / "manifest.json"
+    path.write_text(json.dumps(_manifest(tmp_path, seeds)))
+
+    report = tool.provision(str(path), url, str(tmp_path / "report.json"), concurrency=4, sequencing=sequencing)
+
+    assert report["failed"] == 0, report
+    assert json.loads((tmp_path / "report.json").read_text())["ok"] == len(report["operations"]) == 18
+    assert bool(report["setup"]) == (sequencing == "tickets")
+    opened = {r["id"]: r["channel_id"] for r in report["operations"] if r["op"] == "open"}
+    assert len(set(opened.values())) == 6
+    for cid, chan in opened.items():
+        assert srv.state.channels[chan]["Amount"] == "7000000"  # 5 XRP opened + 2 XRP funded
+        claim = json.loads((tmp_path / f"{cid}.json").read_text())
+        assert claim["channel_id"] == chan and claim["amount_drops"] == "1500000"
+
+
+def test_failed_open_skips_dependents(tmp_path, rpc):
+    _, url = rpc
+    manifest = {"accounts": {"a": {"seed": Wallet.create().seed}},
+                "operations": [{"id": "x", "op": "open", "account": "a", "destination": "not-an-address",
+                                "amount_xrp": 1},
+                               {"id": "y", "op": "fund", "account": "a", "channel": "@x", "add_xrp": 1}]}
+    path = tmp_path / "m.json"
+    path.write_text(json.dumps(manifest))
+    report = tool.provision(str(path), url, str(tmp_path / "r.json"))
+    assert [r["status"] for r in report["operations"]] == ["error", "skipped"]
+
+
+def _run(manifest, url, **kw):
+    return asyncio.run(tool.provision_async(manifest, url, poll_s=0.01, **kw))
+
+
+def test_tickets_are_capped_at_250(rpc):
+    srv, url = rpc
+    w = Wallet.create()
+    srv.state._acct(w.classic_address)["tickets"] = set(range(5000, 5245))  # already owns 245
+    ops = [{"id": f"c{i}", "op": "open", "account": "a", "amount_xrp": 1} for i in range(10)]
+    manifest = {"defaults": {"destination": DEST}, "accounts": {"a": {"seed": w.seed}}, "operations": ops}
+    report = _run(manifest, url, concurrency=4, sequencing="tickets")
+    assert report["failed"] == 0, [r.get("error") for r in report["operations"]]
+    assert [(s["count"], s["result"]) for s in report["setup"]] == [(5, "tesSUCCESS")]
+    assert len(srv.state.channels) == 10  # 5 on new Tickets, 5 on plain Sequences
+
+
+def test_rejected_tx_does_not_strand_later_sequences(rpc):
+    srv, url = rpc
+    srv.state.reject = lambda tx: "temBAD_AMOUNT" if tx.get("Amount") == "1" else None
+    ops = [{"id": f"c{i}", "op": "open", "account": "a", "amount_xrp": 1} for i in range(6)]
+    ops.insert(2, {"id": "bad", "op": "open", "account": "a", "amount_drops": 1})
+    manifest = {"defaults": {"destination": DEST}, "accounts": {"a": {"seed": Wallet.create().seed}},
+                "operations": ops}
+    report = _run(manifest, url, concurrency=1)
+    status = {r["id"]: r["status"] for r in report["operations"]}
+    assert status.pop("bad") == "error" and set(status.values()) == {"ok"}
+    assert len(srv.state.channels) == 6
+    assert not any(srv.state.held.values())  # nothing stuck in terPRE_SEQ
+
+
+def test_allocator_refills_burned_sequence():
+    alloc = tool.SequenceAllocator(10)
+    a, b, c = alloc.take(), alloc.take(), alloc.take()
+    alloc.give_back(b)  # 11 was never applied
+    alloc.resync(11)    # ledger: 10 applied
+    assert alloc.take() == {"sequence": 11}
+    assert alloc.take() == {"sequence": 13}
@@ -0,0 +1,49 @@
+from kv_store import KVStore
+from receipts_cache import ReceiptsCache
+
+
+class FakeApi:
+    def __init__(self, receipts, incremental=True):
+        self.receipts = receipts
+        self.incremental = incremental
+        self.cursors = []
+
+    def receipts_since(self, cursor):
+        self.cursors.append(cursor)
+        if not self.incremental:
+            return list(self.receipts), len(self.receipts), False
+        return self.receipts[cursor:], len(self.receipts), True
+
+
+def _r(ch, amt, tx):
+    return {"channel_id": ch, "amount_drops": amt, "tx_hash": tx, "settledAt": "t"}
+
+
+def test_incremental_sync_and_totals(tmp_path):
+    kv = KVStore(str(tmp_path / "kv.log"))
+    api = FakeApi([_r("AA", 100, "T1"), _r("BB", 50, "T2")])
+    cache = ReceiptsCache(kv)
+    assert cache.sync(api) == 2
+    api.receipts.append(_r("AA", 300, "T3"))
+    assert cache.sync(api) == 1
+    assert api.cursors == [0, 2] and cache.cursor == 3
+    assert cache.last()["tx_hash"] == "T3"
+    assert cache.channel("aa") == {"settled_drops": 300, "count": 2, "last_tx": "T3", "last_at": "t"}
+    assert kv.get("settled:AA") == 300  # feeds the exposure-cap check
+    assert cache.sync(api) == 0
+    kv.close()
+
+
+def test_rebuild_when_server_resets_or_ignores_cursor(tmp_path):
+    kv = KVStore(str(tmp_path / "kv.log"))
+    api = FakeApi([_r("AA", 100, "T1"), _r("AA", 200, "T2")])
+    cache = ReceiptsCache(kv)
+    cache.sync(api)
+    api.receipts = [_r("CC", 10, "N1")]  # API restarted with fresh history
+    assert cache.sync(api) == 1
+    assert cache.channel("AA") is None and cache.channel("CC")["count"] == 1 and cache.cursor == 1
+    old = FakeApi([_r("CC", 10, "N1"), _r("CC", 20, "N2")], incremental=False)
+    cache.sync(old)
+    cache.sync(old)
+    assert cache.channel("CC")["count"] == 2  # full lists are not double counted
+    kv.close()
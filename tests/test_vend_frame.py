@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+import vend_frame as vf
+
+CH = "1B06D34C0C4A1D8DDF188D35A33A9AEB394DD01EAF03D383BEFF334F06BA0994"
+
+
+def test_round_trip_and_fixed_size():
+    frame = vf.encode_vend(CH.lower(), "2000000", slot=3, pulse_ms=750, device_id="dev-kiosk")
+    assert len(frame) == vf.FRAME_LEN == 64
+    assert vf.decode_frame(frame) == {
+        "action": "vend", "slot": 3, "pulse_ms": 750, "claim_channel": CH,
+        "claim_amount_drops": "2000000", "device_id": "dev-kiosk",
+    }
+    assert vf.decode_frame(vf.encode_status())["action"] == "status"
+
+
+def test_smaller_than_json():
+    js = json.dumps({"action": "vend", "slot": 1, "pulse_ms": 600, "claim_channel": CH,
+                     "claim_amount_drops": "2000000", "device_id": "dev-kiosk"}, separators=(",", ":"))
+    assert len(vf.encode_vend(CH, 2000000, device_id="dev-kiosk")) < len(js) / 2
+
+
+def test_checksum_catches_corruption():
+    frame = bytearray(vf.encode_vend(CH, 5))
+    frame[20] ^= 0x01
+    with pytest.raises(ValueError):
+        vf.decode_frame(bytes(frame))
+    assert vf.crc16_ccitt(b"123456789") == 0x29B1  # CCITT-FALSE check value
+
+
+def test_rejects_fields_that_do_not_fit():
+    for kwargs in ({"device_id": "x" * 17}, {"slot": 256}, {"pulse_ms": 70000}):
+        with pytest.raises(ValueError):
+            vf.encode_vend(CH, 1, **kwargs)
+    with pytest.raises(ValueError):
+        vf.encode_vend(CH[:-2], 1)
+
+
+@pytest.mark.parametrize("write_size", [20, 23, 64, 65, 182, 512])
+def test_chunking_reassembles(write_size):
+    frame = vf.encode_vend(CH, 123456789, device_id="vending-001")
+    chunks = vf.chunk_frame(frame, write_size)
+    assert all(len(c) <= write_size for c in chunks)
+    assert len(chunks) == -(-len(frame) // (write_size - 1))
+    asm = vf.FrameAssembler()
+    out = [asm.feed(c) for c in chunks]
+    assert out[:-1] == [None] * (len(chunks) - 1) and out[-1] == frame
+
+
+def test_assembler_resyncs_after_lost_chunk():
+    frame = vf.encode_vend(CH, 42)
+    chunks = vf.chunk_frame(frame, 20)
+    asm = vf.FrameAssembler()
+    asm.feed(chunks[0])
+    with pytest.raises(ValueError):
+        asm.feed(chunks[2])  # chunk 1 lost
+    assert [asm.feed(c) for c in chunks][-1] == frame
@@ -0,0 +1,38 @@
+from xrpl.constants import CryptoAlgorithm
+from xrpl.core.keypairs import sign as xrpl_sign
+from xrpl.wallet import Wallet
+
+import main_screen_clean as m
+
+CH = "1B06D34C0C4A1D8DDF188D35A33A9AEB394DD01EAF03D383BEFF334F06BA0994"
+
+
+def _signed(algo, amt="2000000"):
+    w = Wallet.create(algorithm=algo)
+    sig = xrpl_sign(m.encode_for_signing_claim(CH, amt), w.private_key)
+    return w.public_key, sig
+
+
+def test_verify_ed25519_and_secp256k1():
+    for algo in (CryptoAlgorithm.ED25519, CryptoAlgorithm.SECP256K1):
+        pk, sig = _signed(algo)
+        assert m.verify_claim(CH, "2000000", sig, pk)
+        assert not m.verify_claim(CH, "2000001", sig, pk)
+
+
+def test_pubkey_cache_reuses_parsed_key():
+    pk, sig = _signed(CryptoAlgorithm.ED25519)
+    m._parse_pubkey.cache_clear()
+    for _ in range(5):
+        assert m.verify_claim(CH, "2000000", sig, pk)
+    info = m._parse_pubkey.cache_info()
+    assert info.misses == 1 and info.hits == 4
+
+
+def test_known_claim_fixture():
+    # tools/claim.json, signed by xrpl-py on testnet
+    sig = ("21ED319F2F91B40794B2417B7179856F1A286B19A87FD541FC9FB4582D915AB5"
+           "9137305AD2CB0A19A2A8B10F95ED3ED14AB166B825C856C4F2C1388AE3709609")
+    pk = "EDE54447743D55FE20448CCD97EDCCD0D9202B04F143F54B8E2ED383F902BB34D9"
+    assert m.verify_claim(CH, "2000000", sig, pk)
+    assert m._xrpl_backend(m.encode_for_signing_claim(CH, "2000000"), sig, pk)
@@ -0,0 +1,68 @@
+import inspect
+import os
+import subprocess
+import sys
+
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+
+import main_screen_clean as m
+
+
+def _claim(sk, ch, amt):
+    pub = sk.public_key().public_bytes(Encoding.Raw, PublicFormat.Raw)
+    msg = m.encode_for_signing_claim(ch, amt)
+    return {
+        "channel_id": ch,
+        "amount_drops": str(amt),
+        "signature": sk.sign(msg).hex().upper(),
+        "pubkey": "ED" + pub.hex().upper(),
+    }
+
+
+def _claims():
+    sk = Ed25519PrivateKey.generate()
+    out = []
+    for i in range(40):
+        c = _claim(sk, f"{i:064X}", 1000 + i)
+        if i % 3 == 0:
+            c["amount_drops"] = str(999_999 + i)  # tampered amount
+        out.append(c)
+    out.append({"channel_id": "A" * 64, "amount_drops": "1", "signature": "00"})  # no pubkey
+    return out
+
+
+def test_batch_matches_sequential_order_in_process():
+    claims = _claims()
+    expected = [m._verify_claim_item(c) for c in claims]
+    results, rate = m.verify_claims_batch(claims, workers=4, use_processes=False)
+    assert results == expected
+    assert results[1] is True and results[0] is False and results[-1] is False
+    assert rate > 0
+
+
+def test_batch_processes():
+    claims = _claims()
+    results, _ = m.verify_claims_batch(claims, workers=2, use_processes=True, chunksize=8)
+    assert results == [i % 3 != 0 for i in range(40)] + [False]
+
+
+def test_default_picks_processes_only_for_large_batches(monkeypatch):
+    calls = []
+    monkeypatch.setattr(m.verify_worker, "verify_batch", lambda items, w, c: calls.append(len(items)) or [])
+    monkeypatch.setattr(m, "VERIFY_PROCESS_MIN_BATCH", 41)
+    claims = _claims()
+    m.verify_claims_batch(claims[:40], workers=2)
+    assert calls == []  # small batch: verified in this thread
+    m.verify_claims_batch(claims, workers=2)
+    assert calls == [41]
+    m.verify_claims_batch(claims, workers=1)
+    assert calls == [41]  # one worker: a pool cannot help
+
+
+def test_worker_module_skips_kivy():
+    assert inspect.signature(m.verify_claims_batch).parameters["use_processes"].default is None
+    code = "import sys, verify_worker; print('kivy' in sys.modules, 'xrpl' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], env={"PYTHONPATH": os.pathsep.join(sys.path)},
+                         capture_output=True, text=True, check=True).stdout
+    assert out.split() == ["False", "False"]
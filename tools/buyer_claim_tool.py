@@ -1,24 +1,35 @@
 #!/usr/bin/env python3
 import argparse
+import asyncio
 import json
 import os
 import sys
+import heapq
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from typing import Optional
 
 from xrpl.clients import JsonRpcClient
 from xrpl.wallet import Wallet
 from xrpl.models.transactions import PaymentChannelCreate, PaymentChannelFund
 from xrpl.transaction import autofill, sign, submit_and_wait
-from xrpl.core.binarycodec import encode_for_signing_claim
 from xrpl.core.keypairs import sign as xrpl_sign
 from xrpl.utils import xrp_to_drops
-from xrpl.models.requests.account_channels import AccountChannels
+# asyncio client, ledger helpers and request models are imported by the
+# provisioning/ladder code that needs them, keeping make-claim's startup short
 
 try:
     from xrpl.wallet import generate_faucet_wallet  # faucet helper (testnet)
 except Exception:
     generate_faucet_wallet = None
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common"))
+from claim_codec import encode_for_signing_claim  # noqa: E402  (shared struct encoder)
+from channel_id import channel_id_from_result  # noqa: E402
+from merchant_api import MerchantApiClient, MerchantApiError  # noqa: E402
+
 DEFAULT_RPC = os.environ.get("RPC_URL", "https://s.altnet.rippletest.net:51234")
 
 def eprint(*a, **k): print(*a, **k, file=sys.stderr)
@@ -43,42 +54,9 @@ def submit_tx(client: JsonRpcClient, wallet: Wallet, tx):
     result = submit_and_wait(signed, client)
     return result.result
 
-from typing import Optional
-
 def extract_channel_id_from_meta(tx_result: dict) -> Optional[str]:
-    meta = tx_result.get("meta") or tx_result.get("meta_json")
-    if not meta:
-        return None
-    nodes = meta.get("AffectedNodes") or []
-    for node in nodes:
-        created = node.get("CreatedNode")
-        if not created:
-            continue
-        if created.get("LedgerEntryType") == "PayChannel":
-            # Primary: CreatedNode.LedgerIndex (channel id)
-            cid = created.get("LedgerIndex")
-            if cid:
-                return cid
-            # Rare: NewFields.Channel
-            nf = created.get("NewFields") or {}
-            if "Channel" in nf:
-                return nf["Channel"]
-    return None
-
-def lookup_channel_via_api(client: JsonRpcClient, source: str, destination: str):
-    """Fallback using account_channels to find recent channel id."""
-    req = AccountChannels(account=source, destination_account=destination)
-    resp = client.request(req)
-    channels = (resp.result or {}).get("channels") or []
-    # Choose the most recently created (last in list)
-    if not channels:
-        return None
-    # Prefer one with nonzero "settle_delay" and matching destination
-    for ch in reversed(channels):
-        if ch.get("destination_account") == destination:
-            return ch.get("channel_id")
-    # Fallback last entry
-    return channels[-1].get("channel_id")
+    """Channel id from the CreatedNode, else derived locally from Account/Destination/Sequence."""
+    return channel_id_from_result(tx_result)
 
 def open_channel(client: JsonRpcClient, buyer_wallet: Wallet, destination: str, dest_tag: int, amount_xrp: float, settle_delay_s: int = 600):
     amount_drops = str(xrp_to_drops(amount_xrp))
@@ -93,34 +71,27 @@ def open_channel(client: JsonRpcClient, buyer_wallet: Wallet, destination: str,
     eprint("[open] Submitting PaymentChannelCreate...")
     result = submit_tx(client, buyer_wallet, tx)
 
-    # Try meta extraction
     channel_id = extract_channel_id_from_meta(result)
     if not channel_id:
-        # Fallback: ask the ledger for channels between these accounts
-        eprint("[open] Could not parse channel id from meta; falling back to account_channels...")
-        channel_id = lookup_channel_via_api(client, buyer_wallet.classic_address, destination)
-
-    if not channel_id:
-        raise RuntimeError("Could not determine channel_id from transaction or ledger.")
+        raise RuntimeError(f"Could not determine channel_id (result {(result.get('meta') or {}).get('TransactionResult')}).")
 
     eprint(f"[open] Channel created: {channel_id}")
     return result, channel_id
 
-def make_claim_json(channel_id: str, cumulative_xrp: float, buyer_wallet: Wallet, outfile: str = None):
-    amount_drops = str(xrp_to_drops(cumulative_xrp))
-    try:
-        msg = encode_for_signing_claim(channel_id, amount_drops)
-    except TypeError:
-        msg = encode_for_signing_claim({"channel": channel_id, "amount": amount_drops})
-    signature = xrpl_sign(msg, buyer_wallet.private_key)
-    claim = {
+def build_claim(channel_id: str, amount_drops, buyer_wallet: Wallet) -> dict:
+    amount_drops = str(amount_drops)
+    msg = encode_for_signing_claim(channel_id, amount_drops)
+    return {
         "channel_id": channel_id,
         "amount_drops": amount_drops,
-        "signature": signature,
+        "signature": xrpl_sign(msg, buyer_wallet.private_key),
         "pubkey": buyer_wallet.public_key,
-        "key_type": "ed25519",
+        "key_type": "ed25519" if buyer_wallet.public_key.upper().startswith("ED") else "secp256k1",
         "generated_at": datetime.utcnow().isoformat() + "Z",
     }
+
+def make_claim_json(channel_id: str, cumulative_xrp: float, buyer_wallet: Wallet, outfile: str = None):
+    claim = build_claim(channel_id, xrp_to_drops(cumulative_xrp), buyer_wallet)
     j = json.dumps(claim, indent=2)
     print(j)
     if outfile:
@@ -129,6 +100,100 @@ def make_claim_json(channel_id: str, cumulative_xrp: float, buyer_wallet: Wallet
         eprint(f"[claim] Wrote {outfile}")
     return claim
 
+# ----------- claim ladders (prepaid cards / load tests) -----------
+_ladder_key = None  # per-process (sign_fn, pubkey, key_type), set once by _ladder_init
+
+_SECP256K1_N = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+
+def _secp256k1_signer(private_key: str):
+    """Native (OpenSSL) XRPL secp256k1 signing: ECDSA over SHA-512Half(msg), low-S, DER.
+
+    Valid and canonical like xrpl-py's, but k is random rather than RFC 6979,
+    so re-signing a rung gives a different (equally valid) signature."""
+    import hashlib
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.hazmat.primitives.asymmetric.utils import (
+        Prehashed, decode_dss_signature, encode_dss_signature)
+    sk = ec.derive_private_key(int(private_key, 16), ec.SECP256K1())
+    algo = ec.ECDSA(Prehashed(hashes.SHA256()))
+
+    def sign_fn(msg: bytes) -> str:
+        r, s = decode_dss_signature(sk.sign(hashlib.sha512(msg).digest()[:32], algo))
+        if s > _SECP256K1_N // 2:
+            s = _SECP256K1_N - s  # XRPL requires the canonical (low-S) form
+        return encode_dss_signature(r, s).hex().upper()
+    return sign_fn
+
+def _ladder_init(private_key: str, public_key: str):
+    """Parse the private key once per worker instead of once per claim."""
+    global _ladder_key
+    if private_key.upper().startswith("ED"):
+        from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+        sk = Ed25519PrivateKey.from_private_bytes(bytes.fromhex(private_key[2:]))
+        _ladder_key = (lambda msg: sk.sign(msg).hex().upper(), public_key, "ed25519")
+    else:
+        _ladder_key = (_secp256k1_signer(private_key), public_key, "secp256k1")
+
+def _ladder_sign(job):
+    channel_id, amounts, generated_at = job
+    sign_fn, pubkey, key_type = _ladder_key
+    lines = []
+    for amt in amounts:
+        lines.append(json.dumps({
+            "channel_id": channel_id,
+            "amount_drops": str(amt),
+            "signature": sign_fn(encode_for_signing_claim(channel_id, amt)),
+            "pubkey": pubkey,
+            "key_type": key_type,
+            "generated_at": generated_at,
+        }, separators=(",", ":")))
+    return "\n".join(lines) + "\n"
+
+def channel_amount_drops(client: JsonRpcClient, channel_id: str) -> int:
+    from xrpl.models.requests import LedgerEntry
+    resp = client.request(LedgerEntry(payment_channel=channel_id, ledger_index="validated"))
+    node = (resp.result or {}).get("node")
+    if not node:
+        raise SystemExit(f"[ladder] Channel {channel_id} not found: {resp.result}")
+    return int(node["Amount"])
+
+def make_ladder(channel_id: str, buyer_wallet: Wallet, step_drops: int, max_drops: int, out: str = "ladder.jsonl",
+                start_drops: int = None, workers: int = None, chunk: int = 1000) -> int:
+    """Sign cumulative claims start, start+step, ... <= max into JSONL; returns how many."""
+    step_drops = int(step_drops)
+    if step_drops <= 0:
+        raise SystemExit("--step-xrp must be positive")
+    amounts = range(int(start_drops or step_drops), int(max_drops) + 1, step_drops)
+    generated_at = datetime.utcnow().isoformat() + "Z"
+    jobs = ((channel_id, amounts[i:i + chunk], generated_at) for i in range(0, len(amounts), chunk))
+    workers = workers or os.cpu_count() or 1
+    key = (buyer_wallet.private_key, buyer_wallet.public_key)
+
+    f = sys.stdout if out == "-" else open(out, "w", encoding="utf-8")
+    try:
+        if workers == 1 or len(amounts) <= chunk:
+            _ladder_init(*key)
+            for block in map(_ladder_sign, jobs):
+                f.write(block)
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_ladder_init, initargs=key) as ex:
+                # at most 2 chunks per worker queued: written in order as they finish, and a
+                # huge ladder never sits in memory (ex.map would submit every chunk up front)
+                inflight = deque()
+                for job in jobs:
+                    inflight.append(ex.submit(_ladder_sign, job))
+                    if len(inflight) >= 2 * workers:
+                        f.write(inflight.popleft().result())
+                while inflight:
+                    f.write(inflight.popleft().result())
+    finally:
+        if f is not sys.stdout:
+            f.close()
+    if out != "-":
+        eprint(f"[ladder] Wrote {len(amounts)} claims to {out}")
+    return len(amounts)
+
 def fund_channel(client: JsonRpcClient, buyer_wallet: Wallet, channel_id: str, add_xrp: float):
     amount_drops = str(xrp_to_drops(add_xrp))
     tx = PaymentChannelFund(
@@ -141,6 +206,288 @@ def fund_channel(client: JsonRpcClient, buyer_wallet: Wallet, channel_id: str, a
     eprint("[fund] Success")
     return result
 
+# ----------- manifest provisioning (concurrent) -----------
+LAST_LEDGER_OFFSET = 20
+MAX_TICKETS = 250  # rippled: an account may own at most 250 Tickets
+NOT_APPLIED = ("tem", "tef", "tel")  # prelim results that never consume a Sequence/Ticket
+
+class SequenceAllocator:
+    """Hands out Sequence (or Ticket) numbers for one account locally, so many
+    transactions can be signed and in flight at once without a round trip each."""
+
+    def __init__(self, next_seq: int, tickets=None):
+        self.next_seq = int(next_seq)
+        self.tickets = list(tickets or [])
+        self.free = []          # sequences handed out but never consumed (refilled gaps)
+        self.in_flight = set()
+
+    def take(self, tickets: bool = True) -> dict:
+        if tickets and self.tickets:
+            return {"sequence": 0, "ticket_sequence": self.tickets.pop(0)}
+        if self.free:
+            seq = heapq.heappop(self.free)
+        else:
+            seq = self.next_seq
+            self.next_seq += 1
+        self.in_flight.add(seq)
+        return {"sequence": seq}
+
+    def done(self, fields: dict):
+        self.in_flight.discard(fields.get("sequence"))
+
+    def give_back(self, fields: dict):
+        """The transaction was never applied (tem/tef/tel): its ticket is still unused."""
+        if fields.get("ticket_sequence") is not None:
+            self.tickets.insert(0, fields["ticket_sequence"])
+        else:
+            self.in_flight.discard(fields["sequence"])
+            heapq.heappush(self.free, fields["sequence"])
+
+    def resync(self, account_next_seq: int):
+        """Refill gaps below the ledger's view so later transactions are not stuck in terPRE_SEQ."""
+        account_next_seq = int(account_next_seq)
+        gaps = set(range(account_next_seq, self.next_seq)) - self.in_flight
+        self.free = sorted(gaps | {s for s in self.free if s >= account_next_seq})
+        self.next_seq = max(self.next_seq, account_next_seq)
+
+def _op_amount_drops(op: dict, xrp_key: str) -> str:
+    if op.get(xrp_key.replace("_xrp", "_drops")) is not None:
+        return str(int(op[xrp_key.replace("_xrp", "_drops")]))
+    return str(xrp_to_drops(float(op[xrp_key])))
+
+def _manifest_wallets(manifest: dict, default_seed: str = None) -> dict:
+    wallets = {}
+    for name, spec in (manifest.get("accounts") or {}).items():
+        seed = spec.get("seed") or (os.environ.get(spec["seed_env"]) if spec.get("seed_env") else None)
+        if not seed:
+            raise SystemExit(f"[provision] No seed for account '{name}' (seed or seed_env).")
+        wallets[name] = Wallet.from_seed(seed)
+    if default_seed or os.environ.get("BUYER_SEED"):
+        wallets.setdefault("buyer", Wallet.from_seed(default_seed or os.environ["BUYER_SEED"]))
+    return wallets
+
+class Provisioner:
+    def __init__(self, client, wallets: dict, concurrency: int = 8, sequencing: str = "local",
+                 poll_s: float = 1.0):
+        self.client = client
+        self.poll_s = poll_s
+        self.wallets = wallets
+        self.sem = asyncio.Semaphore(max(1, int(concurrency)))
+        self.sequencing = sequencing
+        self.alloc = {}
+        self.fee = "12"
+        self.network_id = None
+        self.setup = []
+
+    async def prepare(self, ops: list):
+        """One fee/ledger/server_info/account_info lookup per run instead of per transaction."""
+        from xrpl.asyncio.ledger import get_fee
+        from xrpl.models.requests import ServerInfo
+        from xrpl.models.transactions import TicketCreate
+        self.fee = await get_fee(self.client)
+        info = (await self.client.request(ServerInfo())).result.get("info", {})
+        if int(info.get("network_id", 0) or 0) > 1024:
+            self.network_id = int(info["network_id"])  # required field on such networks
+        owned = {}
+        for name in {op.get("account", "buyer") for op in ops if op["op"] in ("open", "fund")}:
+            data = await self._account_data(name)
+            self.alloc[name] = SequenceAllocator(data["Sequence"])
+            owned[name] = int(data.get("TicketCount", 0))
+        if self.sequencing == "tickets":
+            for name, alloc in self.alloc.items():
+                need = sum(1 for op in ops if op["op"] in ("open", "fund") and op.get("account", "buyer") == name)
+                # at most 250 owned Tickets; operations beyond that use plain Sequences
+                n = min(need, MAX_TICKETS - owned[name])
+                if n <= 0:
+                    continue
+                fields, res = await self.submit(name, TicketCreate(account=self._wallet(name).classic_address,
+                                                                   ticket_count=n), tickets=False)
+                result = res["meta"]["TransactionResult"]
+                self.setup.append({"account": name, "op": "tickets", "count": n,
+                                   "tx_hash": res.get("hash"), "result": result})
+                if result != "tesSUCCESS":
+                    eprint(f"[provision] TicketCreate for '{name}' failed ({result}); using Sequences")
+                    continue
+                # TicketCreate at Sequence s creates Tickets s+1 .. s+n
+                alloc.tickets.extend(range(fields["sequence"] + 1, fields["sequence"] + 1 + n))
+                alloc.resync(fields["sequence"] + 1 + n)
+
+    async def _account_data(self, name: str) -> dict:
+        from xrpl.models.requests import AccountInfo
+        resp = await self.client.request(AccountInfo(account=self._wallet(name).classic_address,
+                                                     ledger_index="current"))
+        if not resp.is_successful():
+            raise RuntimeError(f"account_info for '{name}': {resp.result.get('error')}")
+        return resp.result["account_data"]
+
+    def _wallet(self, name: str) -> Wallet:
+        if name not in self.wallets:
+            raise RuntimeError(f"unknown account '{name}' (add it under accounts or set BUYER_SEED)")
+        return self.wallets[name]
+
+    async def submit(self, name: str, tx, tickets: bool = True):
+        """Fill Sequence/Ticket, Fee and LastLedgerSequence locally, sign, submit, wait for validation.
+
+        Returns (sequence fields used, validated tx result)."""
+        from xrpl.asyncio.ledger import get_latest_validated_ledger_sequence
+        from xrpl.asyncio.transaction import submit as async_submit
+        wallet = self._wallet(name)
+        alloc = self.alloc[name]
+        seq_fields = alloc.take(tickets=tickets)
+        try:
+            fields = tx.to_dict()
+            fields.update(seq_fields)
+            fields["fee"] = self.fee
+            last = await get_latest_validated_ledger_sequence(self.client) + LAST_LEDGER_OFFSET
+            fields["last_ledger_sequence"] = last
+            if self.network_id is not None:
+                fields["network_id"] = self.network_id
+            signed = sign(type(tx).from_dict(fields), wallet)
+            prelim = (await async_submit(signed, self.client)).result
+        except Exception:
+            alloc.give_back(seq_fields)
+            await self._resync(name)
+            raise
+        engine = prelim.get("engine_result", "")
+        if engine.startswith(NOT_APPLIED):
+            # never applied: the Sequence is still free on the ledger; refill it or every
+            # later transaction from this account waits in terPRE_SEQ until it expires
+            alloc.give_back(seq_fields)
+            await self._resync(name)
+            raise RuntimeError(f"{engine}: {prelim.get('engine_result_message', '')}")
+        try:
+            return seq_fields, await self._wait_validated(signed.get_hash(), last)
+        finally:
+            alloc.done(seq_fields)
+
+    async def _resync(self, name: str):
+        try:
+            self.alloc[name].resync((await self._account_data(name))["Sequence"])
+        except Exception as e:
+            eprint(f"[provision] Sequence resync for '{name}' failed: {e}")
+
+    async def _wait_validated(self, tx_hash: str, last_ledger: int) -> dict:
+        from xrpl.asyncio.ledger import get_latest_validated_ledger_sequence
+        from xrpl.models.requests import Tx
+        while True:
+            await asyncio.sleep(self.poll_s)
+            current = await get_latest_validated_ledger_sequence(self.client)
+            res = (await self.client.request(Tx(transaction=tx_hash))).result
+            if res.get("validated"):
+                return res
+            if current > last_ledger:
+                raise RuntimeError(f"{tx_hash} not validated by LastLedgerSequence {last_ledger}")
+
+    async def run_op(self, i: int, op: dict, channels: dict) -> dict:
+        rec = {"index": i, "id": op.get("id"), "op": op["op"], "account": op.get("account", "buyer")}
+        t0 = time.perf_counter()
+        try:
+            chan = op.get("channel")
+            if isinstance(chan, str) and chan.startswith("@"):
+                chan = await channels[chan[1:]]  # wait for the open it refers to
+                if chan is None:
+                    rec.update(status="skipped", error=f"{op['channel']} failed")
+                    return rec
+            wallet = self._wallet(rec["account"])
+            async with self.sem:
+                if op["op"] == "open":
+                    tx = PaymentChannelCreate(account=wallet.classic_address, destination=op["destination"],
+                                              amount=_op_amount_drops(op, "amount_xrp"),
+                                              settle_delay=int(op.get("settle_delay", 600)),
+                                              public_key=wallet.public_key,
+                                              destination_tag=int(op["dest_tag"]) if op.get("dest_tag") is not None else None)
+                    _, res = await self.submit(rec["account"], tx)
+                    chan = extract_channel_id_from_meta(res)
+                    rec.update(tx_hash=res.get("hash"), result=res["meta"]["TransactionResult"],
+                               ledger_index=res.get("ledger_index"), channel_id=chan)
+                elif op["op"] == "fund":
+                    tx = PaymentChannelFund(account=wallet.classic_address, channel=chan,
+                                            amount=_op_amount_drops(op, "add_xrp"))
+                    _, res = await self.submit(rec["account"], tx)
+                    rec.update(tx_hash=res.get("hash"), result=res["meta"]["TransactionResult"],
+                               ledger_index=res.get("ledger_index"), channel_id=chan)
+                elif op["op"] == "claim":
+                    claim = build_claim(chan, _op_amount_drops(op, "cum_xrp"), wallet)
+                    if op.get("out"):
+                        with open(op["out"], "w", encoding="utf-8") as f:
+                            f.write(json.dumps(claim, indent=2) + "\n")
+                    rec.update(channel_id=chan, claim=claim)
+                else:
+                    raise ValueError(f"unknown op '{op['op']}'")
+            rec["status"] = "ok"
+        except Exception as e:
+            rec.update(status="error", error=f"{type(e).__name__}: {e}")
+        finally:
+            rec["elapsed_s"] = round(time.perf_counter() - t0, 3)
+        return rec
+
+async def provision_async(manifest: dict, rpc_url: str, concurrency: int = 8, sequencing: str = "local",
+                          default_seed: str = None, poll_s: float = 1.0) -> dict:
+    from xrpl.asyncio.clients import AsyncJsonRpcClient
+    ops = [dict(manifest.get("defaults") or {}, **op) for op in manifest.get("operations") or []]
+    client = AsyncJsonRpcClient(rpc_url)
+    prov = Provisioner(client, _manifest_wallets(manifest, default_seed), concurrency, sequencing, poll_s)
+    t0 = time.perf_counter()
+    await prov.prepare(ops)
+
+    loop = asyncio.get_running_loop()
+    channels = {op["id"]: loop.create_future() for op in ops if op["op"] == "open" and op.get("id")}
+
+    async def one(i, op):
+        rec = await prov.run_op(i, op, channels)
+        fut = channels.get(op.get("id")) if op["op"] == "open" else None
+        if fut is not None and not fut.done():
+            fut.set_result(rec.get("channel_id") if rec["status"] == "ok" else None)
+        return rec
+
+    results = await asyncio.gather(*(one(i, op) for i, op in enumerate(ops)))
+    return {
+        "rpc": rpc_url,
+        "sequencing": sequencing,
+        "concurrency": concurrency,
+        "elapsed_s": round(time.perf_counter() - t0, 3),
+        "ok": sum(1 for r in results if r["status"] == "ok"),
+        "failed": sum(1 for r in results if r["status"] != "ok"),
+        "setup": prov.setup,
+        "operations": list(results),
+    }
+
+def provision(manifest_path: str, rpc_url: str, report_path: str, concurrency: int = 8,
+              sequencing: str = "local", default_seed: str = None, poll_s: float = 1.0) -> dict:
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    report = asyncio.run(provision_async(manifest, manifest.get("rpc") or rpc_url, concurrency, sequencing,
+                                         default_seed, poll_s))
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    eprint(f"[provision] {report['ok']} ok, {report['failed']} failed in {report['elapsed_s']}s -> {report_path}")
+    return report
+
+def queue_claims(api_base: str, paths, token: str = None, device_id: str = "dev-tool"):
+    """Send claim files to /claims/queue over one pooled API session."""
+    api = MerchantApiClient(api_base, token=token)
+    claims = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            claim = json.load(f)
+        claim.setdefault("device_id", device_id)
+        claims.append(claim)
+    try:
+        results = api.queue_claims(claims)
+    except MerchantApiError as e:
+        if e.status != 501 and e.status != 400:
+            raise SystemExit(f"[queue] API error: {e}")
+        results = []  # older API without batch support: one request per claim
+        for claim in claims:
+            try:
+                results.append(dict(api.queue_claim(claim), status=200))
+            except MerchantApiError as ce:
+                results.append(dict(ce.body if isinstance(ce.body, dict) else {}, status=ce.status))
+    for path, res in zip(paths, results):
+        eprint(f"[queue] {path}: {res}")
+    print(json.dumps(results, indent=2))
+    return results
+
 def main():
     ap = argparse.ArgumentParser(description="Buyer-side tool: open XRPL Payment Channel and emit claims (Testnet).")
     sub = ap.add_subparsers(dest="cmd", required=True)
@@ -172,7 +519,42 @@ def main():
     ap_open_claim.add_argument("--out-open", default="open_channel_result.json")
     ap_open_claim.add_argument("--out-claim", default="claim.json")
 
+    ap_ladder = sub.add_parser("make-ladder", help="Pre-sign cumulative claims every --step-xrp into JSONL.")
+    ap_ladder.add_argument("--channel-id", required=True)
+    ap_ladder.add_argument("--step-xrp", type=float, default=0.1)
+    ap_ladder.add_argument("--start-xrp", type=float, help="First rung (default: one step).")
+    ap_ladder.add_argument("--max-xrp", type=float, help="Last rung (default: the channel amount, read from the ledger).")
+    ap_ladder.add_argument("--seed", help="Buyer seed if not using BUYER_SEED env.")
+    ap_ladder.add_argument("--rpc", default=DEFAULT_RPC)
+    ap_ladder.add_argument("--workers", type=int, default=None, help="Signing processes (default: CPU count).")
+    ap_ladder.add_argument("--out", default="ladder.jsonl", help="JSONL output, '-' for stdout.")
+
+    ap_prov = sub.add_parser("provision", help="Run a manifest of open/fund/claim operations concurrently.")
+    ap_prov.add_argument("--manifest", required=True, help="JSON: {accounts, defaults, operations: [...]}")
+    ap_prov.add_argument("--rpc", default=DEFAULT_RPC)
+    ap_prov.add_argument("--concurrency", type=int, default=8)
+    ap_prov.add_argument("--sequencing", choices=("local", "tickets"), default="local",
+                         help="local: consecutive Sequences tracked here; tickets: reserve Tickets first.")
+    ap_prov.add_argument("--seed", help="Seed for the default 'buyer' account (else BUYER_SEED).")
+    ap_prov.add_argument("--report", default="provision_report.json")
+
+    ap_queue = sub.add_parser("queue-claim", help="Submit claim JSON file(s) to the merchant API /claims/queue.")
+    ap_queue.add_argument("claims", nargs="+", help="Claim JSON files (as written by make-claim).")
+    ap_queue.add_argument("--api", default=os.environ.get("API_BASE_URL", "http://127.0.0.1:3000"))
+    ap_queue.add_argument("--token", default=os.environ.get("API_TOKEN"))
+    ap_queue.add_argument("--device-id", default="dev-tool")
+
     args = ap.parse_args()
+
+    if args.cmd == "queue-claim":
+        queue_claims(args.api, args.claims, token=args.token, device_id=args.device_id)
+        return
+
+    if args.cmd == "provision":
+        provision(args.manifest, args.rpc, args.report, concurrency=args.concurrency,
+                  sequencing=args.sequencing, default_seed=args.seed)
+        return
+
     client = JsonRpcClient(args.rpc)
 
     if getattr(args, "use_faucet", False):
@@ -193,6 +575,16 @@ def main():
         make_claim_json(args.channel_id, args.cum_xrp, buyer_wallet, outfile=args.out)
         return
 
+    if args.cmd == "make-ladder":
+        if args.max_xrp is not None:
+            max_drops = int(xrp_to_drops(args.max_xrp))
+        else:
+            max_drops = channel_amount_drops(client, args.channel_id)
+        start_drops = int(xrp_to_drops(args.start_xrp)) if args.start_xrp else None
+        make_ladder(args.channel_id, buyer_wallet, int(xrp_to_drops(args.step_xrp)), max_drops, out=args.out,
+                    start_drops=start_drops, workers=args.workers)
+        return
+
     if args.cmd == "open-and-claim":
         res, chan = open_channel(client, buyer_wallet, args.destination, args.dest_tag, args.amount_xrp)
         with open(args.out_open, "w", encoding="utf-8") as f:
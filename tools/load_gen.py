@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Offline synthetic load for the merchant claim path.
+
+Generates wallets, channel ids and signed cumulative claims locally (no
+faucet, no ledger), then replays them with a chosen concurrency and arrival
+pattern against either
+  - local: the kiosk's own verify_claim + _device_may_dispense + kv_set
+           (a throwaway KV store, nothing touches the real kiosk state), or
+  - api:   POST /claims/queue on a merchant API (e.g. api/server_offline_dev.js).
+
+Examples:
+  python tools/load_gen.py --wallets 2000 --claims-per-channel 5 --concurrency 8
+  python tools/load_gen.py --target api --api http://127.0.0.1:3000 --arrival poisson --rate 300
+  python tools/load_gen.py --save load.jsonl          # keep the generated claims
+  python tools/load_gen.py --load load.jsonl          # replay them again
+
+For open-loop arrivals (poisson/burst) latency is measured from the scheduled
+arrival time, so queueing behind a slow verifier shows up in p99 instead of
+being hidden (no coordinated omission).
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+from cryptography.hazmat.primitives.asymmetric.utils import (Prehashed, decode_dss_signature,
+                                                             encode_dss_signature)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "common"))
+from claim_codec import encode_for_signing_claim  # noqa: E402
+from merchant_api import MerchantApiClient, MerchantApiError  # noqa: E402
+
+def eprint(*a, **k): print(*a, **k, file=sys.stderr)
+
+# ----------- generation -----------
+_SECP256K1_N = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+_RAW = dict(encoding=serialization.Encoding.Raw, format=serialization.PublicFormat.Raw)
+
+class _Signer:
+    """Throwaway XRPL-style keypair; key generation and signing via cryptography (much
+    faster than xrpl-py's pure-Python secp256k1), same signature format as xrpl."""
+
+    def __init__(self, secp: bool = False):
+        self.secp = secp
+        if secp:
+            self._sk = ec.generate_private_key(ec.SECP256K1())
+            pub = self._sk.public_key().public_bytes(serialization.Encoding.X962,
+                                                     serialization.PublicFormat.CompressedPoint)
+        else:
+            self._sk = Ed25519PrivateKey.generate()
+            pub = b"\xED" + self._sk.public_key().public_bytes(**_RAW)
+        self.public_key = pub.hex().upper()
+
+    def sign(self, msg: bytes) -> str:
+        if not self.secp:
+            return self._sk.sign(msg).hex().upper()
+        digest = hashlib.sha512(msg).digest()[:32]  # XRPL signs SHA-512Half
+        r, s = decode_dss_signature(self._sk.sign(digest, ec.ECDSA(Prehashed(hashes.SHA256()))))
+        s = min(s, _SECP256K1_N - s)  # canonical low-S, as rippled requires
+        return encode_dss_signature(r, s).hex().upper()
+
+def generate_claims(wallets: int, claims_per_channel: int, step_drops: int = 100_000, secp_ratio: float = 0.0,
+                    bad_sig_ratio: float = 0.0, replay_ratio: float = 0.0, seed: int = None) -> list:
+    """Signed claims in arrival order: rung by rung, channels shuffled within a rung."""
+    rnd = random.Random(seed)
+    chans = []
+    for _ in range(wallets):
+        w = _Signer(secp=rnd.random() < secp_ratio)
+        chans.append((rnd.getrandbits(256).to_bytes(32, "big").hex().upper(), w))
+
+    claims = []
+    for rung in range(1, claims_per_channel + 1):
+        order = list(chans)
+        rnd.shuffle(order)
+        for ch, w in order:
+            amt = rung * step_drops
+            sig = w.sign(encode_for_signing_claim(ch, amt))
+            claim = {"channel_id": ch, "amount_drops": str(amt), "signature": sig, "pubkey": w.public_key}
+            if rnd.random() < bad_sig_ratio:
+                claim["signature"] = sig[:-2] + ("00" if sig[-2:] != "00" else "01")
+                claim["expect"] = "bad_signature"
+            claims.append(claim)
+            if rung > 1 and rnd.random() < replay_ratio:
+                claims.append(dict(claims[-1 - rnd.randrange(min(len(claims), len(chans)))],
+                                   expect="replay"))
+    return claims
+
+# ----------- targets -----------
+class LocalTarget:
+    """Kiosk verify stage in-process, on a throwaway KV store."""
+
+    def __init__(self):
+        os.environ.setdefault("KIVY_NO_ARGS", "1")
+        os.environ.setdefault("KIVY_NO_CONSOLELOG", "1")
+        sys.path.insert(0, os.path.join(ROOT, "app"))
+        import main_screen_clean as m
+        self._m = m
+        self._tmp = tempfile.TemporaryDirectory()
+        self._saved = m._kv_store
+        m._kv_store = m.KVStore(os.path.join(self._tmp.name, "kv.log"),
+                                commit_interval_s=m.KV_COMMIT_INTERVAL_MS / 1000.0)
+        self._state_lock = threading.Lock()  # the kiosk checks+sets last_seen on one thread
+
+    def __call__(self, claim: dict):
+        m = self._m
+        ch, amt = claim["channel_id"], int(claim["amount_drops"])
+        if not m.verify_claim(ch, claim["amount_drops"], claim["signature"], claim["pubkey"]):
+            return False, "bad_signature"
+        with self._state_lock:
+            ok, reason = m.MainScreen._device_may_dispense(None, ch, amt)
+            if ok:
+                m.kv_set(f"last_seen:{ch}", amt)
+        return ok, reason
+
+    def close(self):
+        self._m._kv_store.close()
+        self._m._kv_store = self._saved
+        self._tmp.cleanup()
+
+class ApiTarget:
+    def __init__(self, base_url: str, token: str = None, device_id: str = "load-gen"):
+        self._api = MerchantApiClient(base_url, token=token, pool_size=64)
+        self._device_id = device_id
+
+    def __call__(self, claim: dict):
+        body = {k: v for k, v in claim.items() if k != "expect"}
+        body["device_id"] = self._device_id
+        try:
+            res = self._api.queue_claim(body)
+            return bool(res.get("accepted", True)), res.get("reason", "")
+        except MerchantApiError as e:
+            if e.status not in (400, 402, 409):
+                raise
+            reason = e.body.get("reason") if isinstance(e.body, dict) else None
+            return False, reason or f"http_{e.status}"
+
+    def close(self):
+        self._api.close()
+
+# ----------- replay -----------
+def arrival_offsets(n: int, pattern: str, rate: float = 0.0, burst: int = 50, burst_interval: float = 1.0,
+                    seed: int = None) -> list:
+    """Seconds from start at which each request is issued (None = as soon as a worker is free)."""
+    if pattern == "closed":
+        return [None] * n
+    if pattern == "poisson":
+        if rate <= 0:
+            raise ValueError("--rate must be > 0 for poisson arrivals")
+        rnd = random.Random(seed)
+        t, out = 0.0, []
+        for _ in range(n):
+            t += rnd.expovariate(rate)
+            out.append(t)
+        return out
+    if pattern == "burst":
+        return [(i // burst) * burst_interval for i in range(n)]
+    raise ValueError(f"unknown arrival pattern {pattern}")
+
+def _pct(sorted_vals: list, q: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    return sorted_vals[min(len(sorted_vals) - 1, int(q * len(sorted_vals)))]
+
+def replay(claims: list, target, concurrency: int = 8, offsets: list = None) -> dict:
+    offsets = offsets or [None] * len(claims)
+    lat = [0.0] * len(claims)
+    verdicts = [None] * len(claims)
+    slots = threading.Semaphore(concurrency)
+
+    def one(i, due):
+        try:
+            ok, reason = target(claims[i])
+            verdicts[i] = ("approved", "") if ok else ("declined", reason or "declined")
+        except Exception as e:
+            verdicts[i] = ("error", type(e).__name__)
+        finally:
+            lat[i] = time.perf_counter() - due
+            slots.release()
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        for i, off in enumerate(offsets):
+            if off is not None:
+                wait = t0 + off - time.perf_counter()
+                if wait > 0:
+                    time.sleep(wait)
+                due = t0 + off
+                slots.acquire()
+            else:
+                slots.acquire()
+                due = time.perf_counter()
+            ex.submit(one, i, due)
+    elapsed = time.perf_counter() - t0
+
+    outcome = Counter(v[0] for v in verdicts)
+    reasons = Counter(v[1] for v in verdicts if v[0] != "approved")
+    mismatched = sum(1 for c, v in zip(claims, verdicts)
+                     if c.get("expect") == "bad_signature" and v[1] != "bad_signature")
+    lat.sort()
+    return {
+        "requests": len(claims),
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_per_s": round(len(claims) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {"p50": round(_pct(lat, 0.50) * 1000, 3), "p99": round(_pct(lat, 0.99) * 1000, 3),
+                       "max": round(lat[-1] * 1000, 3) if lat else 0.0},
+        "approved": outcome.get("approved", 0),
+        "declined": outcome.get("declined", 0),
+        "errors": outcome.get("error", 0),
+        "reasons": dict(reasons),
+        "bad_signatures_not_caught": mismatched,
+    }
+
+def main():
+    ap = argparse.ArgumentParser(description="Offline synthetic load for claim verification.")
+    ap.add_argument("--wallets", type=int, default=1000, help="Buyer wallets (one channel each).")
+    ap.add_argument("--claims-per-channel", type=int, default=5)
+    ap.add_argument("--step-drops", type=int, default=100_000, help="Increase between a channel's claims.")
+    ap.add_argument("--secp-ratio", type=float, default=0.0, help="Share of secp256k1 wallets.")
+    ap.add_argument("--bad-sig-ratio", type=float, default=0.01)
+    ap.add_argument("--replay-ratio", type=float, default=0.01, help="Share of claims re-sent later.")
+    ap.add_argument("--seed", type=int, default=None, help="RNG seed for a reproducible run.")
+    ap.add_argument("--save", help="Write generated claims to this JSONL file.")
+    ap.add_argument("--load", help="Replay claims from a JSONL file instead of generating.")
+    ap.add_argument("--target", choices=("local", "api"), default="local")
+    ap.add_argument("--api", default=os.environ.get("API_BASE_URL", "http://127.0.0.1:3000"))
+    ap.add_argument("--token", default=os.environ.get("API_TOKEN"))
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--arrival", choices=("closed", "poisson", "burst"), default="closed")
+    ap.add_argument("--rate", type=float, default=0.0, help="Mean requests/s for poisson arrivals.")
+    ap.add_argument("--burst", type=int, default=50, help="Requests per burst.")
+    ap.add_argument("--burst-interval", type=float, default=1.0, help="Seconds between bursts.")
+    ap.add_argument("--report", help="Also write the JSON report here.")
+    args = ap.parse_args()
+
+    if args.load:
+        with open(args.load, "r", encoding="utf-8") as f:
+            claims = [json.loads(line) for line in f if line.strip()]
+    else:
+        t = time.perf_counter()
+        claims = generate_claims(args.wallets, args.claims_per_channel, args.step_drops, args.secp_ratio,
+                                 args.bad_sig_ratio, args.replay_ratio, args.seed)
+        eprint(f"[gen] {len(claims)} claims for {args.wallets} channels in {time.perf_counter() - t:.1f}s")
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            for c in claims:
+                f.write(json.dumps(c, separators=(",", ":")) + "\n")
+        eprint(f"[gen] Wrote {args.save}")
+
+    target = LocalTarget() if args.target == "local" else ApiTarget(args.api, token=args.token)
+    try:
+        offsets = arrival_offsets(len(claims), args.arrival, args.rate, args.burst, args.burst_interval, args.seed)
+        report = replay(claims, target, args.concurrency, offsets)
+    finally:
+        target.close()
+    report.update(target=args.target, arrival=args.arrival)
+    out = json.dumps(report, indent=2)
+    print(out)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            f.write(out + "\n")
+
+if __name__ == "__main__":
+    main()
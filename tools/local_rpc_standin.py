@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Minimal local stand-in for a rippled JSON-RPC endpoint (dev/test only).
+
+Implements just enough for buyer_claim_tool.py to open/fund channels with
+xrpl-py without Testnet: server_info, fee, ledger, account_info, submit, tx,
+ledger_entry (payment_channel). Accounts exist on first use with 1000 XRP.
+Every `ledger` call closes a ledger; a submitted transaction is validated in
+the ledger after it was applied. Sequences are enforced like rippled: a
+future Sequence is held until the gap fills (terPRE_SEQ), a used one is
+rejected (tefPAST_SEQ), Tickets must exist. Signatures are NOT checked.
+
+  python tools/local_rpc_standin.py --port 5005
+  python tools/buyer_claim_tool.py provision --manifest m.json --rpc http://127.0.0.1:5005
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from xrpl.core.binarycodec import decode
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common"))
+from channel_id import paychannel_id, sha512_half  # noqa: E402
+
+START_BALANCE = 1_000_000_000  # drops
+MAX_TICKETS = 250
+METHODS = ("server_info", "fee", "ledger", "account_info", "submit", "tx", "ledger_entry")
+
+class LedgerState:
+    def __init__(self, start_ledger: int = 1000):
+        self.lock = threading.Lock()
+        self.ledger = start_ledger          # last validated ledger
+        self.accounts = {}                  # address -> {"Sequence", "Balance", "tickets": set()}
+        self.channels = {}                  # index -> PayChannel fields
+        self.txs = {}                       # hash -> tx record
+        self.held = {}                      # address -> {seq: (hash, tx)}
+        self.reject = None                  # reject(tx) -> prelim code (e.g. "temBAD_AMOUNT") to refuse a tx
+
+    def _acct(self, address):
+        return self.accounts.setdefault(address, {"Sequence": 1, "Balance": START_BALANCE, "tickets": set()})
+
+    # ----------- methods -----------
+    def server_info(self, p):
+        return {"info": {"build_version": "2.3.0-standin", "validated_ledger": {"seq": self.ledger}}}
+
+    def fee(self, p):
+        return {"drops": {"base_fee": "10", "median_fee": "5000", "minimum_fee": "10", "open_ledger_fee": "10"},
+                "current_ledger_size": "0", "current_queue_size": "0", "expected_ledger_size": "1000",
+                "ledger_current_index": self.ledger + 1, "max_queue_size": "2000",
+                "levels": {"median_level": "128000", "minimum_level": "256", "open_ledger_level": "256",
+                           "reference_level": "256"}}
+
+    def ledger_(self, p):
+        self.ledger += 1  # every query closes a ledger
+        return {"ledger_index": self.ledger, "validated": True}
+
+    def account_info(self, p):
+        a = self._acct(p["account"])
+        return {"account_data": {"Account": p["account"], "Sequence": a["Sequence"], "Balance": str(a["Balance"]),
+                                 "TicketCount": len(a["tickets"])},
+                "ledger_index": self.ledger, "validated": True}
+
+    def submit(self, p):
+        blob = p["tx_blob"]
+        tx = decode(blob)
+        h = sha512_half(b"TXN\x00" + bytes.fromhex(blob)).hex().upper()
+        acct = self._acct(tx["Account"])
+        seq, ticket = int(tx.get("Sequence", 0)), tx.get("TicketSequence")
+        refused = self.reject(tx) if self.reject else None
+        if refused:
+            return self._prelim(tx, blob, refused)
+        if ticket is not None:
+            if int(ticket) not in acct["tickets"]:
+                return self._prelim(tx, blob, "tefNO_TICKET")
+        elif seq < acct["Sequence"]:
+            return self._prelim(tx, blob, "tefPAST_SEQ")
+        elif seq > acct["Sequence"]:
+            self.held.setdefault(tx["Account"], {})[seq] = (h, tx)
+            return self._prelim(tx, blob, "terPRE_SEQ")
+        result = self._apply(h, tx)
+        # a filled gap releases held transactions
+        held = self.held.get(tx["Account"], {})
+        while acct["Sequence"] in held:
+            self._apply(*held.pop(acct["Sequence"]))
+        return self._prelim(tx, blob, result)
+
+    def tx(self, p):
+        rec = self.txs.get(str(p.get("transaction", "")).upper())
+        if rec is None or rec["ledger_index"] > self.ledger:
+            return {"error": "txnNotFound"}
+        return dict(rec, validated=True)
+
+    def ledger_entry(self, p):
+        idx = str(p.get("payment_channel") or p.get("index") or "").upper()
+        node = self.channels.get(idx)
+        if node is None:
+            return {"error": "entryNotFound"}
+        return {"index": idx, "node": dict(node, index=idx), "ledger_index": self.ledger, "validated": True}
+
+    # ----------- internals -----------
+    def _prelim(self, tx, blob, result):
+        return {"engine_result": result, "engine_result_message": result, "tx_blob": blob, "tx_json": tx,
+                "accepted": result in ("tesSUCCESS", "terPRE_SEQ")}
+
+    def _apply(self, h, tx) -> str:
+        acct = self._acct(tx["Account"])
+        if tx.get("TicketSequence") is not None:
+            acct["tickets"].discard(int(tx["TicketSequence"]))
+            seq = int(tx["TicketSequence"])
+        else:
+            seq = int(tx["Sequence"])
+            acct["Sequence"] += 1
+        acct["Balance"] -= int(tx.get("Fee", 0))
+        nodes, result = [], "tesSUCCESS"
+        kind = tx["TransactionType"]
+        if kind == "TicketCreate" and len(acct["tickets"]) + int(tx["TicketCount"]) > MAX_TICKETS:
+            result = "tecDIR_FULL"
+        elif kind == "TicketCreate":
+            first = acct["Sequence"]
+            acct["tickets"].update(range(first, first + int(tx["TicketCount"])))
+            acct["Sequence"] += int(tx["TicketCount"])
+        elif kind == "PaymentChannelCreate":
+            idx = paychannel_id(tx["Account"], tx["Destination"], seq)
+            fields = {"LedgerEntryType": "PayChannel", "Account": tx["Account"], "Destination": tx["Destination"],
+                      "Amount": tx["Amount"], "Balance": "0", "PublicKey": tx["PublicKey"],
+                      "SettleDelay": tx["SettleDelay"]}
+            if "DestinationTag" in tx:
+                fields["DestinationTag"] = tx["DestinationTag"]
+            self.channels[idx] = fields
+            acct["Balance"] -= int(tx["Amount"])
+            nodes.append({"CreatedNode": {"LedgerEntryType": "PayChannel", "LedgerIndex": idx,
+                                          "NewFields": {k: v for k, v in fields.items() if k != "LedgerEntryType"}}})
+        elif kind == "PaymentChannelFund":
+            ch = self.channels.get(str(tx["Channel"]).upper())
+            if ch is None or ch["Account"] != tx["Account"]:
+                result = "tecNO_ENTRY"
+            else:
+                ch["Amount"] = str(int(ch["Amount"]) + int(tx["Amount"]))
+                acct["Balance"] -= int(tx["Amount"])
+                nodes.append({"ModifiedNode": {"LedgerEntryType": "PayChannel", "LedgerIndex": tx["Channel"],
+                                               "FinalFields": dict(ch)}})
+        self.txs[h] = {"hash": h, "tx_json": tx, "ledger_index": self.ledger + 1,
+                       "meta": {"TransactionResult": result, "AffectedNodes": nodes}}
+        return result
+
+    def handle(self, method: str, params: dict) -> dict:
+        if method not in METHODS:
+            return {"error": "unknownCmd", "status": "error"}
+        fn = getattr(self, "ledger_" if method == "ledger" else method)
+        with self.lock:
+            res = fn(params or {})
+        res.setdefault("status", "error" if "error" in res else "success")
+        return res
+
+def serve(port: int = 0, host: str = "127.0.0.1", state: LedgerState = None):
+    """Start the stand-in on a background thread; returns (server, url)."""
+    state = state or LedgerState()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True  # headers and body are separate writes
+
+        def log_message(self, *a):
+            pass
+
+        def do_POST(self):
+            req = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            params = (req.get("params") or [{}])[0]
+            raw = json.dumps({"result": state.handle(req.get("method", ""), params)}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+    class Server(ThreadingHTTPServer):
+        request_queue_size = 128  # many concurrent clients in tests
+        daemon_threads = True
+
+    srv = Server((host, port), Handler)
+    srv.state = state
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv, f"http://{host}:{srv.server_address[1]}"
+
+def main():
+    ap = argparse.ArgumentParser(description="Local rippled JSON-RPC stand-in (no signatures, dev only).")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=5005)
+    args = ap.parse_args()
+    srv, url = serve(args.port, args.host)
+    print(f"[standin] JSON-RPC on {url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        srv.shutdown()
+
+if __name__ == "__main__":
+    main()